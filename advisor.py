@@ -0,0 +1,332 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import sys
+from typing import Dict, List
+import numpy as np
+from cards import CARD_VALUES, ShoeTracker
+from basic_strategy import ACTION_NAMES, HIT, DOUBLE, HARD_TABLE, SOFT_TABLE, PAIR_TABLE
+from model_registry import best_model_path, feature_spec
+from table_rules import DEFAULT_RULES
+
+# ============================================================
+# Configuration
+# ============================================================
+
+MODEL_PATH = 'betting_policy_net.pth'  # Used when the model registry holds no Hi-Lo policy
+NUM_DECKS = 8
+STATE_SIZE = 4  # The advisor's observation: Hi-Lo true count, shoe fraction, upcard, insurance
+
+# Resolution of the precomputed bet grid; states are rounded to the nearest grid point
+TRUE_COUNT_RANGE = 10.0   # True counts are clipped to +-10, like the environment observation
+TRUE_COUNT_STEP = 0.1
+REMAINING_STEPS = 100     # Shoe fraction in 1% steps
+
+# Card values 2-11 by rank, for hands that only need values
+RANK_VALUES = dict(CARD_VALUES)
+
+# ============================================================
+# Tables
+# ============================================================
+
+class TableState(ShoeTracker):
+    """
+    Running count and remaining shoe composition of one table, updated card by card,
+    plus the dealer's last upcard.
+    """
+
+    def __init__(self, num_decks: int = NUM_DECKS):
+        super().__init__(num_decks)
+        self.upcard = None
+
+    def shuffle(self) -> None:
+        """Starts a new shoe."""
+        self.reset()
+        self.upcard = None
+
+    def observe(self, rank: str) -> None:
+        """Counts one card that was dealt face up."""
+        self.observe_rank(rank)
+
+    def state(self, dealer_value: int) -> np.ndarray:
+        """The betting policy's observation for the next round."""
+        return np.array([self.true_count, self.remaining / self.shoe_size, dealer_value, 0],
+                        dtype=np.float32)
+
+
+def policy_features(num_decks: int = NUM_DECKS) -> Dict[str, object]:
+    """Feature spec of the policies the advisor can use: the Hi-Lo state under basic strategy."""
+    return feature_spec(STATE_SIZE, rules=DEFAULT_RULES.replace(num_decks=num_decks))
+
+
+def parse_rank(card: str) -> str:
+    """Normalizes a typed card ('a', '10', 'k', 'T') to a rank, raising ValueError if unknown."""
+    rank = str(card).strip().upper()
+    if rank == 'T':
+        rank = '10'
+    if rank not in RANK_VALUES:
+        raise ValueError(f"Invalid card rank: {card}")
+    return rank
+
+# ============================================================
+# Advisor Engine
+# ============================================================
+
+class AdvisorEngine:
+    """
+    Answers move and bet questions for any number of tables.
+
+    Moves come from the compiled basic strategy tables, copied to nested tuples
+    so a lookup is plain indexing. Bets come from the betting policy evaluated
+    once over a grid of (true count, shoe fraction, dealer upcard) states; the
+    network and torch are only loaded when the first bet is asked for.
+    """
+
+    def __init__(self, policy_net=None, model_path: str = None, num_decks: int = NUM_DECKS):
+        """
+        Args:
+            policy_net (PolicyNetwork): Betting policy; loaded from `model_path` when None.
+            model_path (str): Saved policy used when no network is given; defaults to
+                the best registered model of `policy_features`, else MODEL_PATH.
+            num_decks (int): Decks per shoe at every table.
+        """
+        self.policy_net = policy_net
+        self.model_path = model_path or best_model_path(policy_features(num_decks), default=MODEL_PATH)
+        self.num_decks = num_decks
+        self.tables: Dict[str, TableState] = {}
+        self.hard = tuple(map(tuple, HARD_TABLE.tolist()))
+        self.soft = tuple(map(tuple, SOFT_TABLE.tolist()))
+        self.pairs = tuple(map(tuple, PAIR_TABLE.tolist()))
+        self.bet_table = None
+
+    def table(self, name: str = 'default') -> TableState:
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = TableState(self.num_decks)
+        return table
+
+    # ------------------------------------------------------------
+    # Moves
+    # ------------------------------------------------------------
+
+    def move(self, player: List[str], dealer: str) -> Dict[str, object]:
+        """
+        Basic strategy move for a hand.
+
+        Args:
+            player (List[str]): Ranks of the player's cards.
+            dealer (str): Rank of the dealer's upcard.
+
+        Returns:
+            Dict[str, object]: 'action' ('S', 'H', 'D' or 'SP', None when busted),
+            the hand 'total' and whether it is 'soft'.
+
+        Raises:
+            ValueError: If `player` is not a non-empty list of ranks.
+        """
+        if not isinstance(player, (list, tuple)) or not player:
+            raise ValueError(f"Player cards must be a non-empty list of ranks, got {player!r}")
+        values = [RANK_VALUES[parse_rank(card)] for card in player]
+        dealer_value = RANK_VALUES[parse_rank(dealer)]
+        total = sum(values)
+        aces = values.count(11)
+        while total > 21 and aces:
+            total -= 10
+            aces -= 1
+        soft = aces > 0
+
+        if total > 21:
+            return {'action': None, 'total': total, 'soft': False}
+        if len(values) == 2 and values[0] == values[1]:
+            action = self.pairs[values[0]][dealer_value]
+        elif soft:
+            action = self.soft[min(total, 20)][dealer_value]
+        else:
+            action = self.hard[total][dealer_value]
+        if action == DOUBLE and len(values) > 2:
+            action = HIT  # A double that is not allowed is played as a hit
+        return {'action': ACTION_NAMES[action], 'total': total, 'soft': soft}
+
+    # ------------------------------------------------------------
+    # Bets
+    # ------------------------------------------------------------
+
+    def build_bet_table(self) -> None:
+        """
+        Evaluates the betting policy once over the whole state grid.
+
+        Raises:
+            ValueError: If the policy at `model_path` is missing or cannot be read.
+        """
+        from evaluation import load_policy
+        from inference import InferencePolicy
+
+        if self.policy_net is None:
+            try:
+                self.policy_net = load_policy(self.model_path)
+            except (OSError, RuntimeError, KeyError, pickle.UnpicklingError) as error:
+                raise ValueError(f"Cannot load the betting policy {self.model_path}: {error}") from error
+        true_counts = np.linspace(-TRUE_COUNT_RANGE, TRUE_COUNT_RANGE,
+                                  int(round(2 * TRUE_COUNT_RANGE / TRUE_COUNT_STEP)) + 1)
+        fractions = np.linspace(0, 1, REMAINING_STEPS + 1)
+        dealer_values = np.arange(2, 12)
+        grid = np.stack(np.meshgrid(true_counts, fractions, dealer_values, [0], indexing='ij'), axis=-1)
+        states = grid.reshape(-1, 4).astype(np.float32)
+
+        bets = InferencePolicy(self.policy_net).greedy(states).astype(np.int8) + 1
+        self.bet_table = bets.reshape(grid.shape[:3]).tolist()
+
+    def bet(self, table: TableState, dealer: str = None) -> int:
+        """
+        Suggested bet in units for the table's next round.
+
+        Args:
+            table (TableState): The table to bet at.
+            dealer (str): Dealer upcard rank; defaults to the table's last upcard.
+        """
+        if self.bet_table is None:
+            self.build_bet_table()
+        dealer_value = RANK_VALUES[parse_rank(dealer)] if dealer is not None else table.upcard
+        if dealer_value is None:
+            raise ValueError("No dealer upcard known for this table")
+        true_count = min(TRUE_COUNT_RANGE, max(-TRUE_COUNT_RANGE, table.true_count))
+        count_index = int(round((true_count + TRUE_COUNT_RANGE) / TRUE_COUNT_STEP))
+        # Clipped too: a user can enter more cards than the shoe holds
+        fraction_index = int(round(table.remaining / table.shoe_size * REMAINING_STEPS))
+        fraction_index = min(REMAINING_STEPS, max(0, fraction_index))
+        return self.bet_table[count_index][fraction_index][dealer_value - 2]
+
+    # ------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------
+
+    def handle(self, request: Dict[str, object]) -> Dict[str, object]:
+        """
+        Answers one protocol request.
+
+        Requests are JSON objects with an 'op' and an optional 'table' name (and 'id',
+        echoed back):
+            {"op": "move", "player": ["A", "7"], "dealer": "6"}
+            {"op": "cards", "cards": ["5", "K", "2"]}   count cards seen at the table
+            {"op": "bet", "dealer": "6"}                 dealer defaults to the last upcard
+            {"op": "shuffle"}                            start a new shoe
+            {"op": "state"}                              running count, true count, remaining, aces
+
+        Returns:
+            Dict[str, object]: The answer, or {'error': message}.
+        """
+        response = {'id': request['id']} if 'id' in request else {}
+        try:
+            op = request.get('op')
+            table = self.table(str(request.get('table', 'default')))
+            if op == 'move':
+                response.update(self.move(request['player'], request['dealer']))
+                table.upcard = RANK_VALUES[parse_rank(request['dealer'])]
+            elif op == 'cards':
+                for rank in [parse_rank(card) for card in request['cards']]:
+                    table.observe(rank)
+                response.update(self._table_state(table))
+            elif op == 'bet':
+                response['bet'] = self.bet(table, request.get('dealer'))
+            elif op == 'shuffle':
+                table.shuffle()
+                response.update(self._table_state(table))
+            elif op == 'state':
+                response.update(self._table_state(table))
+            else:
+                raise ValueError(f"Unknown op: {op}")
+        except (KeyError, ValueError, TypeError) as error:
+            response['error'] = str(error) if not isinstance(error, KeyError) else f"Missing field: {error}"
+        return response
+
+    def handle_line(self, line: str) -> str:
+        """Answers one JSON-lines request with one JSON line."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+        except ValueError as error:
+            return json.dumps({'error': f"Invalid request: {error}"})
+        return json.dumps(self.handle(request))
+
+    @staticmethod
+    def _table_state(table):
+        return {'running_count': table.running_count, 'true_count': round(table.true_count, 4),
+                'remaining': table.remaining, 'aces_remaining': table.aces_remaining}
+
+# ============================================================
+# Service
+# ============================================================
+
+async def handle_connection(engine: AdvisorEngine, reader, writer) -> None:
+    """Serves JSON-lines requests from one client until it disconnects."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                writer.write((engine.handle_line(line.decode('utf-8')) + '\n').encode('utf-8'))
+                await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve_unix(engine: AdvisorEngine, path: str) -> None:
+    """Serves any number of concurrent clients on a Unix socket; tables are shared by name."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_connection(engine, reader, writer), path=path)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_stdio(engine: AdvisorEngine) -> None:
+    """Serves JSON-lines requests on stdin, answering on stdout."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if line.strip():
+            sys.stdout.write(engine.handle_line(line.decode('utf-8')) + '\n')
+            sys.stdout.flush()
+
+# ============================================================
+# Entry Point
+# ============================================================
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Deck Tacticus advisor service (JSON lines).")
+    parser.add_argument('--socket', help="Serve on this Unix socket instead of stdin/stdout")
+    parser.add_argument('--model', help="Saved betting policy (default: the best registered model)")
+    parser.add_argument('--decks', type=int, default=NUM_DECKS, help="Decks per shoe")
+    parser.add_argument('--preload', action='store_true',
+                        help="Evaluate the betting policy before serving instead of on the first bet")
+    args = parser.parse_args(argv)
+
+    engine = AdvisorEngine(model_path=args.model, num_decks=args.decks)
+    if args.preload:
+        engine.build_bet_table()
+    try:
+        asyncio.run(serve_unix(engine, args.socket) if args.socket else serve_stdio(engine))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -11,15 +11,36 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import argparse
+import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
 import numpy as np
-from blackjack_env import BlackjackEnv
+from vector_env import VectorBlackjackEnv
+from rollout import RolloutWorkers, collect_rollout
+from profiler import Profiler
+from table_rules import TableRules, DEFAULT_RULES
+from model_registry import ModelRegistry
 
 # ============================================================
 # Configuration and Hyperparameters
 # ============================================================
 
+# Extra counting systems (see counting.py) whose true counts are fed to the network
+# after the Hi-Lo state, e.g. ('zen', 'aces'); the advisor only supports the Hi-Lo state
+COUNT_SYSTEMS = ()
+
+# Play the count-dependent index plays of deviations.csv instead of plain basic strategy
+PLAY_DEVIATIONS = False
+
+# Rules of the tables the policy is trained and evaluated on (see table_rules.RULE_SETS)
+TABLE_RULES = DEFAULT_RULES
+
 # State representation: [true_count, percentage_remaining, dealer_upcard_value, insurance_flag]
-STATE_SIZE = 4
+# followed by one true count per extra counting system
+STATE_SIZE = 4 + len(COUNT_SYSTEMS)
 
 # Number of possible bet actions: 5 (0-4) corresponding to bets of 1-5 units
 ACTION_SIZE = 5
@@ -30,6 +51,20 @@ LEARNING_RATE = 1e-4
 GAMMA = 1.0  # Not used as each episode is one step
 NUM_EPISODES = 300_000
 
+# Batched training parameters
+NUM_ENVS = 256          # Tables simulated in lockstep
+BATCH_SIZE = 2048       # Rounds collected per policy update and worker (a multiple of NUM_ENVS)
+MINIBATCH_SIZE = 256    # Rounds per gradient step; BATCH_SIZE means one step per update
+USE_BASELINE = True     # Subtract a running mean reward to reduce gradient variance
+BASELINE_DECAY = 0.99   # Decay of the running mean reward, per update
+NUM_WORKERS = 0         # Rollout worker processes; 0 collects rounds in the learner process
+SEED = 0                # Seed of the whole training run; None draws fresh entropy
+PROFILE = False         # Time the training phases and write a summary and a Chrome trace
+PROFILE_TRACE_PATH = 'training_trace.json'
+MODEL_PATH = 'betting_policy_net.pth'
+CHECKPOINT_PATH = 'training_checkpoint.pt'  # Used by the command line; None in TrainingConfig
+CHECKPOINT_EVERY = 25_000  # Episodes between training checkpoints
+
 # Exploration parameters for epsilon-greedy policy
 EPSILON_START = 1.0
 EPSILON_END = 0.01
@@ -37,7 +72,39 @@ EPSILON_DECAY = 0.999
 
 # Device configuration: use GPU if available
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(f"Training on device: {DEVICE}")
+
+
+@dataclass(frozen=True)
+class TrainingConfig:
+    """
+    The settings of one training run, defaulting to the constants above.
+
+    The state layout (COUNT_SYSTEMS) and the strategy played (PLAY_DEVIATIONS)
+    stay module-level, since the saved networks and the evaluation depend on them.
+    """
+    num_episodes: int = NUM_EPISODES
+    learning_rate: float = LEARNING_RATE
+    hidden_size: int = HIDDEN_SIZE
+    epsilon_start: float = EPSILON_START
+    epsilon_end: float = EPSILON_END
+    epsilon_decay: float = EPSILON_DECAY
+    num_envs: int = NUM_ENVS
+    batch_size: int = BATCH_SIZE
+    minibatch_size: int = MINIBATCH_SIZE
+    use_baseline: bool = USE_BASELINE
+    baseline_decay: float = BASELINE_DECAY
+    num_workers: int = NUM_WORKERS
+    seed: Optional[int] = SEED
+    profile: bool = PROFILE
+    table_rules: TableRules = TABLE_RULES
+    model_path: Optional[str] = MODEL_PATH  # None keeps the trained network in memory only
+    checkpoint_path: Optional[str] = None   # Training state saved periodically and at the end; None saves none
+    checkpoint_every: int = CHECKPOINT_EVERY
+    resume: bool = False  # Continue from checkpoint_path when it exists
+
+    def replace(self, **changes) -> 'TrainingConfig':
+        """A copy with some settings changed."""
+        return replace(self, **changes)
 
 # ============================================================
 # Policy Network Definition
@@ -78,70 +145,286 @@ class PolicyNetwork(nn.Module):
 # Training Function
 # ============================================================
 
-def train():
+def reinforce_update(policy_net, optimizer, batch_states, batch_actions, advantages, generator=None,
+                     minibatch_size=MINIBATCH_SIZE):
+    """
+    REINFORCE gradient steps on one batch of rounds, one step per minibatch.
+
+    Args:
+        policy_net (PolicyNetwork): Network to update.
+        optimizer (torch.optim.Optimizer): Optimizer over the network's parameters.
+        batch_states (np.ndarray): (rounds, STATE_SIZE) float32 states.
+        batch_actions (np.ndarray): (rounds,) int64 bet actions taken.
+        advantages (np.ndarray): (rounds,) float32 advantages of the actions.
+        generator (torch.Generator): Random source of the minibatch order.
+        minibatch_size (int): Rounds per gradient step.
+    """
+    batch_size = len(batch_actions)
+    states_tensor = torch.from_numpy(batch_states).to(DEVICE)
+    actions_tensor = torch.from_numpy(batch_actions).to(DEVICE)
+    advantages_tensor = torch.from_numpy(advantages).to(DEVICE)
+
+    # One gradient step per minibatch, each with a single forward pass
+    permutation = torch.randperm(batch_size, generator=generator).to(DEVICE)
+    for start in range(0, batch_size, minibatch_size):
+        indices = permutation[start:start + minibatch_size]
+        action_probs = policy_net(states_tensor[indices])
+        log_probs = torch.log(action_probs.gather(1, actions_tensor[indices].unsqueeze(1)).squeeze(1))
+
+        # Compute the loss: negative log probability weighted by the advantage
+        loss = -(log_probs * advantages_tensor[indices]).mean()
+
+        # Perform backpropagation and update the policy network
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+
+def train(config: TrainingConfig = None, verbose: bool = True, resume_from: str = None) -> Dict[str, object]:
     """
     Train the PolicyNetwork using reinforcement learning on the Blackjack environment.
     The network learns to recommend bet sizes based on the current game state.
+
+    Each update collects `batch_size` rounds from `num_envs` tables played in lockstep
+    (per rollout worker when `num_workers` > 0), then takes one REINFORCE gradient
+    step per minibatch of `minibatch_size` rounds.
+
+    Args:
+        config (TrainingConfig): Settings of the run; the module defaults when None.
+            The weight initialization, the shoes, the bet sampling and the minibatch
+            order each get an independent stream spawned from `config.seed`, so the
+            same seed replays the same run.
+        verbose (bool): Print the progress every 1000 episodes.
+        resume_from (str): Checkpoint of an earlier run of the same network to continue
+            from, up to `config.num_episodes` in total; `config.resume` resumes from
+            `config.checkpoint_path`. The weights, the Adam state, epsilon, the baseline,
+            the reward history, the shoes and every random stream carry over, so with
+            the same tables, batch size and workers the run continues bit for bit as
+            if it had never stopped. With another layout the shoes and samplers continue
+            on new streams spawned from the seed and the episode.
+
+    Returns:
+        Dict[str, object]: The trained 'policy_net', the 'curve' of average rewards
+        over the last 1000 rounds as (episode, average reward) pairs, every 1000
+        episodes, the total number of 'episodes' trained and the 'wall_time' of this call
+        in seconds.
     """
-    # Initialize environment and policy network
-    env = BlackjackEnv(num_decks=8)
-    policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, HIDDEN_SIZE).to(DEVICE)
-    optimizer = optim.Adam(policy_net.parameters(), lr=LEARNING_RATE)
+    config = config or TrainingConfig()
+    if verbose:
+        print(f"Training on device: {DEVICE}")
+    if resume_from is None and config.resume and config.checkpoint_path is not None \
+            and os.path.exists(config.checkpoint_path):
+        resume_from = config.checkpoint_path
+    checkpoint = torch.load(resume_from, map_location=DEVICE) if resume_from is not None else None
+    start_episode = checkpoint['episode'] if checkpoint is not None else 0
+    steps_per_update = max(1, config.batch_size // config.num_envs)
+    layout = (config.num_workers, config.num_envs, steps_per_update)
+    streams = checkpoint['streams'] if checkpoint is not None else None
+    exact = streams is not None and tuple(streams['layout']) == layout
+    if verbose and checkpoint is not None:
+        print(f"Resuming at episode {start_episode}" + ("" if exact else " on new random streams"))
+    # The streams are restored from the checkpoint below; a resumed run that cannot
+    # restore them continues on streams of its own, keyed by the episode it resumes at
+    init_seed, env_seed, rng_seed, shuffle_seed = np.random.SeedSequence(
+        config.seed, spawn_key=(start_episode,) if start_episode and not exact else ()).spawn(4)
 
-    total_rewards = []
-    epsilon = EPSILON_START
+    # Initialize policy network and the source of training rounds
+    with torch.random.fork_rng(devices=[]):
+        torch.manual_seed(int(init_seed.generate_state(1)[0]))
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, config.hidden_size).to(DEVICE)
+    optimizer = optim.Adam(policy_net.parameters(), lr=config.learning_rate)
+    if checkpoint is not None:
+        policy_net.load_state_dict(checkpoint['policy'])
+        optimizer.load_state_dict(checkpoint['optimizer'])
+    generator = torch.Generator().manual_seed(int(shuffle_seed.generate_state(1)[0]))
 
-    for episode in range(1, NUM_EPISODES + 1):
-        # Reset environment and get initial state
-        state = env.reset()
-        state_tensor = torch.from_numpy(state).float().to(DEVICE)
+    if config.num_workers > 0:
+        workers = RolloutWorkers(policy_net, config.num_workers, config.num_envs, steps_per_update,
+                                 seed=env_seed, rules=config.table_rules)
+        batch_size = workers.batch_size
+    else:
+        workers = None
+        env = VectorBlackjackEnv(num_envs=config.num_envs, seed=env_seed, count_systems=COUNT_SYSTEMS,
+                                 deviations=PLAY_DEVIATIONS, rules=config.table_rules)
+        rng = np.random.default_rng(rng_seed)
+        batch_size = steps_per_update * config.num_envs
+        batch_states = np.zeros((batch_size, STATE_SIZE), dtype=np.float32)
+        batch_actions = np.zeros(batch_size, dtype=np.int64)
+        batch_rewards = np.zeros(batch_size, dtype=np.float32)
 
-        # Compute action probabilities from the policy network
-        action_probs = policy_net(state_tensor)
+    # Optional per-phase timings; without profiling every phase is a no-op context
+    profiler = Profiler(trace=True) if config.profile else None
+    if profiler is not None and workers is None:
+        profiler.instrument_env(env)
+
+    def phase(name):
+        return profiler.phase(name) if profiler is not None else nullcontext()
+
+    total_rewards = []
+    curve = []
+    epsilon = config.epsilon_start
+    baseline = 0.0
+    episode = 0
+    if checkpoint is not None:
+        total_rewards = list(checkpoint['recent_rewards'])
+        curve = [tuple(point) for point in checkpoint['curve']]
+        epsilon = checkpoint['epsilon']
+        baseline = checkpoint['baseline']
+        episode = start_episode
+    start_time = time.perf_counter()
 
-        # Epsilon-greedy action selection for betting
-        if np.random.rand() < epsilon:
-            # Explore: choose a random action
-            action = torch.tensor([np.random.choice(ACTION_SIZE)], device=DEVICE)
+    def save():
+        # Workers report their shoes and streams between rollouts; NumPy arrays are
+        # stored as tensors so that the checkpoint loads with torch.load's weights_only
+        state = {'layout': layout, 'generator': generator.get_state()}
+        if workers is not None:
+            state['workers'] = _to_tensors(workers.get_state())
         else:
-            # Exploit: choose the best action based on policy
-            distribution = torch.distributions.Categorical(action_probs)
-            action = distribution.sample()
+            state['env'] = _to_tensors(env.get_state())
+            state['rng'] = rng.bit_generator.state
+        save_checkpoint({'policy': policy_net.state_dict(), 'optimizer': optimizer.state_dict(),
+                         'episode': episode, 'epsilon': epsilon, 'baseline': baseline,
+                         'recent_rewards': total_rewards, 'curve': curve, 'streams': state},
+                        config.checkpoint_path)
 
-        # Translate action index to bet amount (0-4 -> 1-5 units)
-        bet_action = action.item()
+    try:
+        if exact:
+            generator.set_state(streams['generator'])
+            if workers is not None:
+                workers.set_state(_to_arrays(streams['workers']))
+            else:
+                env.set_state(_to_arrays(streams['env']))
+                rng.bit_generator.state = streams['rng']
 
-        # Execute the action in the environment
-        next_state, reward, done, info = env.step(bet_action)
-        total_reward = reward
+        while episode < config.num_episodes:
+            # Collect a batch of rounds with the current policy
+            with phase('rollout'):
+                if workers is not None:
+                    workers.publish(policy_net)
+                    batch_states, batch_actions, batch_rewards = workers.collect(epsilon)
+                else:
+                    collect_rollout(env, policy_net, epsilon, batch_states, batch_actions,
+                                    batch_rewards, rng)
 
-        # Compute the loss: negative log probability weighted by the reward
-        log_prob = torch.log(action_probs[action])
-        loss = -log_prob * total_reward
+            # Decay epsilon to reduce exploration over time (per episode)
+            epsilon = max(config.epsilon_end, epsilon * config.epsilon_decay ** batch_size)
 
-        # Perform backpropagation and update the policy network
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
+            # Advantages relative to the running mean reward
+            advantages = batch_rewards - baseline if config.use_baseline else batch_rewards
+            if config.use_baseline:
+                baseline = (config.baseline_decay * baseline +
+                            (1 - config.baseline_decay) * float(batch_rewards.mean()))
+
+            with phase('update'):
+                reinforce_update(policy_net, optimizer, batch_states, batch_actions, advantages, generator,
+                                 config.minibatch_size)
+
+            # Record the rewards for tracking performance
+            total_rewards.extend(batch_rewards.tolist())
+            del total_rewards[:-1000]
+            previous_episode = episode
+            episode += batch_size
 
-        # Record the reward for tracking performance
-        total_rewards.append(total_reward)
+            # Record and print progress every 1000 episodes
+            if episode // 1000 > previous_episode // 1000:
+                avg_reward = float(np.mean(total_rewards))
+                curve.append((episode, avg_reward))
+                if verbose:
+                    rounds_per_sec = (episode - start_episode) / (time.perf_counter() - start_time)
+                    print(f"Episode {episode}, Average Reward: {avg_reward:.4f}, Epsilon: {epsilon:.4f}, "
+                          f"Rounds/sec: {rounds_per_sec:.0f}")
 
-        # Decay epsilon to reduce exploration over time
-        epsilon = max(EPSILON_END, epsilon * EPSILON_DECAY)
+            if config.checkpoint_path is not None and \
+                    episode // config.checkpoint_every > previous_episode // config.checkpoint_every:
+                save()
 
-        # Print progress every 1000 episodes
-        if episode % 1000 == 0:
-            avg_reward = np.mean(total_rewards[-1000:])
-            print(f"Episode {episode}, Average Reward: {avg_reward:.4f}, Epsilon: {epsilon:.4f}")
+        if config.checkpoint_path is not None:
+            save()
+    finally:
+        if workers is not None:
+            workers.close()
+
+    elapsed = time.perf_counter() - start_time
+    if verbose:
+        rounds = episode - start_episode
+        print(f"Trained on {rounds} rounds in {elapsed:.1f}s ({rounds / max(elapsed, 1e-9):.0f} rounds/sec)")
+
+    if profiler is not None:
+        profiler.uninstrument()
+        print(profiler.summary())
+        profiler.write_chrome_trace(PROFILE_TRACE_PATH)
 
     # Save the trained policy network
-    torch.save(policy_net.state_dict(), 'betting_policy_net.pth')
-    print("Training completed and model saved.")
+    if config.model_path is not None:
+        torch.save(policy_net.state_dict(), config.model_path)
+        if verbose:
+            print("Training completed and model saved.")
+    return {'policy_net': policy_net, 'curve': curve, 'episodes': episode, 'wall_time': elapsed}
+
+
+def save_checkpoint(checkpoint: Dict[str, object], path: str) -> None:
+    """Writes a checkpoint atomically: to a temporary file first, then renamed over `path`."""
+    temporary_path = f"{path}.tmp"
+    torch.save(checkpoint, temporary_path)
+    os.replace(temporary_path, path)
+
+
+def _to_tensors(state):
+    if isinstance(state, np.ndarray):
+        return torch.from_numpy(state)
+    if isinstance(state, dict):
+        return {key: _to_tensors(value) for key, value in state.items()}
+    if isinstance(state, list):
+        return [_to_tensors(value) for value in state]
+    return state
+
+
+def _to_arrays(state):
+    if isinstance(state, torch.Tensor):
+        return state.numpy()
+    if isinstance(state, dict):
+        return {key: _to_arrays(value) for key, value in state.items()}
+    if isinstance(state, list):
+        return [_to_arrays(value) for value in state]
+    return state
 
 # ============================================================
 # Entry Point
 # ============================================================
 
+def main(argv=None) -> None:
+    defaults = TrainingConfig()
+    parser = argparse.ArgumentParser(description="Train the betting policy.")
+    parser.add_argument('--num_episodes', type=int, default=defaults.num_episodes)
+    parser.add_argument('--learning_rate', type=float, default=defaults.learning_rate)
+    parser.add_argument('--hidden_size', type=int, default=defaults.hidden_size)
+    parser.add_argument('--epsilon_decay', type=float, default=defaults.epsilon_decay)
+    parser.add_argument('--workers', type=int, default=defaults.num_workers, help="Rollout worker processes")
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--model_path', default=defaults.model_path)
+    parser.add_argument('--checkpoint_path', default=CHECKPOINT_PATH, help="Training state for --resume")
+    parser.add_argument('--checkpoint_every', type=int, default=defaults.checkpoint_every,
+                        help="Episodes between checkpoints")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted run from --checkpoint_path")
+    parser.add_argument('--register', action='store_true',
+                        help="Add the trained network to the model registry and evaluate it")
+    parser.add_argument('--name', help="Registry name of the network (default: the current time)")
+    args = parser.parse_args(argv)
+
+    config = defaults.replace(num_episodes=args.num_episodes, learning_rate=args.learning_rate,
+                              hidden_size=args.hidden_size, epsilon_decay=args.epsilon_decay,
+                              num_workers=args.workers, seed=args.seed, model_path=args.model_path,
+                              checkpoint_path=args.checkpoint_path, checkpoint_every=args.checkpoint_every,
+                              resume=args.resume)
+    result = train(config)
+    if args.register:
+        registry = ModelRegistry()
+        name = registry.register(result['policy_net'], args.name, config=config,
+                                 timings={'wall_time': result['wall_time'], 'episodes': result['episodes']})
+        evaluation = registry.evaluate(name)
+        print(f"Registered {name}: {evaluation['per_round']:.4f} units/round; best model: {registry.best()}")
+
+
 if __name__ == '__main__':
-    train()
+    main()
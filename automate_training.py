@@ -7,72 +7,334 @@
 #     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
 # By Kurizaki & Sprudello
 
-import subprocess
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import asdict
+from typing import Dict, List, Sequence
+import torch
+from agent import TrainingConfig, train
+from evaluation import evaluate_policy, summarize
+from model_registry import ModelRegistry
 
 # ============================================================
 # Configuration Parameters
 # ============================================================
 
-START_EPISODES = 10_000     # Starting number of episodes
-MAX_EPISODES = 150_000      # Maximum number of episodes
-EPISODE_STEP = 10_000       # Step size for increasing the number of episodes
-LOG_FILE = "training_results.txt"
-TRAINING_SCRIPT = "agent.py"
+# Every combination of these values is trained, on top of BASE_CONFIG
+SWEEP_GRID = {
+    'num_episodes': [50_000, 100_000, 150_000],
+    'learning_rate': [1e-4, 3e-4],
+    'hidden_size': [64, 128],
+    'epsilon_decay': [0.999, 0.9999],
+}
+# Runs are single-process; the sweep itself spreads them over the cores
+BASE_CONFIG = TrainingConfig(num_workers=0, model_path=None)
+
+NUM_WORKERS = None          # Concurrent runs; None uses every CPU core
+MODEL_DIR = 'SweepModels'   # Trained networks, one file per run; None keeps none
+RESULTS_JSON = 'sweep_results.json'
+RESULTS_TSV = 'sweep_results.tsv'
+
+# Successive halving: every configuration trains for HALVING_MIN_EPISODES, then the best
+# 1/HALVING_ETA continue from their checkpoints to HALVING_ETA times as many episodes,
+# and so on up to HALVING_MAX_EPISODES
+HALVING_MIN_EPISODES = 10_000
+HALVING_MAX_EPISODES = 270_000
+HALVING_ETA = 3
+CHECKPOINT_DIR = 'SweepCheckpoints'
+
+# Every run is evaluated on the same games, so the runs compare on common shoes
+EVAL_GAMES = 200
+EVAL_ROUNDS = 250
+EVAL_SEED = 1
+
+TSV_FIELDS = ('index', 'rung', 'num_episodes', 'learning_rate', 'hidden_size', 'epsilon_start', 'epsilon_end',
+              'epsilon_decay', 'seed', 'final_reward', 'eval_per_round', 'eval_ci_low', 'eval_ci_high',
+              'wall_time')
 
 # ============================================================
-# Helper Function to Parse Average Reward
+# Sweep
 # ============================================================
 
-def parse_average_reward(output: str) -> float:
+def sweep_configs(grid: Dict[str, Sequence], base: TrainingConfig = BASE_CONFIG) -> List[TrainingConfig]:
+    """Every combination of the grid values, as copies of `base`, in grid order."""
+    names = list(grid)
+    return [base.replace(**dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def run_config(index: int, config: TrainingConfig, eval_games: int = EVAL_GAMES,
+               eval_rounds: int = EVAL_ROUNDS, eval_seed: int = EVAL_SEED,
+               resume_from: str = None) -> Dict[str, object]:
     """
-    Parse the average reward from the training script's output.
-    The script prints lines like:
-    "Episode X, Average Reward: YYYYY"
-    We find the last occurrence of "Average Reward:" and return the associated value.
+    Trains one configuration, or continues it from a checkpoint, and evaluates the trained policy.
+
+    Returns:
+        Dict[str, object]: The run 'index', its 'config', the reward 'curve', the
+        'final_reward' (mean of the last ten curve points), the 'evaluation' summary
+        of `evaluation.summarize` over 'eval_rounds' rounds per game and the 'wall_time'
+        of the training in seconds.
     """
-    avg_reward = None
-    for line in output.split("\n"):
-        if "Average Reward:" in line:
-            parts = line.split("Average Reward:")
-            if len(parts) > 1:
-                # Extract the numeric part after "Average Reward:"
-                avg_reward_str = parts[1].split(",")[0].strip()
-                avg_reward = float(avg_reward_str)
-    return avg_reward
+    result = train(config, verbose=False, resume_from=resume_from)
+    curve = result['curve']
+    final = [reward for _, reward in curve[-10:]]
+    profits = evaluate_policy(result['policy_net'], eval_games, eval_rounds, seed=eval_seed,
+                              num_workers=0, rules=config.table_rules)
+    return {
+        'index': index,
+        'config': asdict(config),
+        'curve': curve,
+        'final_reward': sum(final) / len(final) if final else None,
+        'evaluation': summarize(profits, eval_rounds),
+        'eval_rounds': eval_rounds,
+        'eval_seed': eval_seed,
+        'wall_time': result['wall_time'],
+    }
+
+
+def _init_worker():
+    # One core per run; the sweep provides the parallelism
+    torch.set_num_threads(1)
+
+
+def _register(registry, result):
+    # The sweep's model directory is a model registry, with one entry per run
+    if registry is not None:
+        registry.register(result['config']['model_path'], f"run_{result['index']:03d}", config=result['config'],
+                          evaluation=dict(result['evaluation'], rounds=result['eval_rounds'],
+                                          seed=result['eval_seed']),
+                          timings={'wall_time': result['wall_time'],
+                                   'episodes': result['config']['num_episodes']})
+
+
+def _tsv_row(result):
+    config, evaluation = result['config'], result['evaluation']
+    row = {name: config[name] for name in TSV_FIELDS if name in config}
+    row.update(index=result['index'], rung=result.get('rung', 0), final_reward=result['final_reward'],
+               eval_per_round=evaluation['per_round'],
+               eval_ci_low=evaluation['ci_low'] / result['eval_rounds'],
+               eval_ci_high=evaluation['ci_high'] / result['eval_rounds'], wall_time=round(result['wall_time'], 2))
+    return row
+
+
+def run_sweep(configs: Sequence[TrainingConfig], num_workers: int = NUM_WORKERS,
+              json_path: str = RESULTS_JSON, tsv_path: str = RESULTS_TSV,
+              model_dir: str = MODEL_DIR, eval_games: int = EVAL_GAMES,
+              eval_rounds: int = EVAL_ROUNDS) -> List[Dict[str, object]]:
+    """
+    Trains and evaluates every configuration, concurrently in a process pool.
+
+    Each run imports torch once per worker process rather than once per run, and
+    the longest runs start first so the pool drains evenly. Results are written as
+    they arrive: a TSV summary line per run, and the JSON list of every result so
+    far, reward curves included, so an interrupted sweep keeps its finished runs.
+
+    Args:
+        configs (Sequence[TrainingConfig]): Runs to train.
+        num_workers (int): Concurrent runs; defaults to the CPU count, 0 or 1 runs in-process.
+        json_path (str): Full results, in run order.
+        tsv_path (str): One summary line per run, in completion order.
+        model_dir (str): Model registry for the trained networks (see model_registry.py);
+            None saves none.
+        eval_games, eval_rounds (int): Evaluation of every trained policy.
+
+    Returns:
+        List[Dict[str, object]]: The `run_config` result of every run, in run order.
+    """
+    if model_dir is not None:
+        os.makedirs(model_dir, exist_ok=True)
+        configs = [config.replace(model_path=os.path.join(model_dir, f"run_{index:03d}.pth"))
+                   for index, config in enumerate(configs)]
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(configs))
+    order = sorted(range(len(configs)), key=lambda index: -configs[index].num_episodes)
+
+    registry = ModelRegistry(model_dir) if model_dir is not None else None
+    results = {}
+    with open(tsv_path, 'w', newline='', encoding='utf-8') as tsv_file:
+        writer = csv.DictWriter(tsv_file, TSV_FIELDS, delimiter='\t', lineterminator='\n')
+        writer.writeheader()
+
+        def record(result):
+            results[result['index']] = result
+            _register(registry, result)
+            writer.writerow(_tsv_row(result))
+            tsv_file.flush()
+            with open(json_path, 'w', encoding='utf-8') as json_file:
+                json.dump([results[index] for index in sorted(results)], json_file)
+            print(f"Run {result['index']} done ({len(results)}/{len(configs)}): "
+                  f"final reward {result['final_reward']:.4f}, "
+                  f"evaluation {result['evaluation']['per_round']:.4f}/round, {result['wall_time']:.1f}s")
+
+        with _executor(num_workers) as executor:
+            for result in _completed(executor, [(index, configs[index], eval_games, eval_rounds)
+                                                for index in order]):
+                record(result)
+
+    return [results[index] for index in sorted(results)]
+
+
+def halving_budgets(min_episodes: int, max_episodes: int, eta: int = HALVING_ETA) -> List[int]:
+    """Episode budgets of the rungs: min_episodes * eta**k, ending at max_episodes."""
+    budgets = [min_episodes]
+    while budgets[-1] * eta < max_episodes:
+        budgets.append(budgets[-1] * eta)
+    if budgets[-1] < max_episodes:
+        budgets.append(max_episodes)
+    return budgets
+
+
+def successive_halving(configs: Sequence[TrainingConfig], min_episodes: int = HALVING_MIN_EPISODES,
+                       max_episodes: int = HALVING_MAX_EPISODES, eta: int = HALVING_ETA,
+                       num_workers: int = NUM_WORKERS, json_path: str = RESULTS_JSON,
+                       tsv_path: str = RESULTS_TSV, model_dir: str = MODEL_DIR,
+                       checkpoint_dir: str = CHECKPOINT_DIR, eval_games: int = EVAL_GAMES,
+                       eval_rounds: int = EVAL_ROUNDS) -> List[Dict[str, object]]:
+    """
+    Sweeps the configurations by successive halving.
+
+    All configurations train for the first budget of `halving_budgets` and are
+    evaluated on the same fixed-seed games. Only the best 1/eta of them, by mean
+    evaluation profit, are promoted to the next rung. Each promoted run continues
+    from its checkpoint up to the next budget; it is not restarted. The
+    `num_episodes` of the configurations are replaced by the budgets, and
+    configurations that differ in nothing else are trained once.
+
+    Args:
+        configs (Sequence[TrainingConfig]): Runs to sweep.
+        min_episodes, max_episodes (int): Budget of the first and of the last rung.
+        eta (int): Promotion ratio between rungs.
+        checkpoint_dir (str): Directory for the checkpoints between rungs.
+        num_workers, json_path, tsv_path, model_dir, eval_games, eval_rounds: As for `run_sweep`.
+
+    Returns:
+        List[Dict[str, object]]: The `run_config` result of every run at the last rung it
+        reached, in run order, with its 'rung' and the mean evaluation profit per round
+        of every rung it trained in ('rung_evaluations'); 'wall_time' sums all rungs.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    if model_dir is not None:
+        os.makedirs(model_dir, exist_ok=True)
+    budgets = halving_budgets(min_episodes, max_episodes, eta)
+    configs = _distinct([config.replace(num_episodes=budgets[0]) for config in configs])
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(configs))
+
+    def checkpoint(index):
+        return os.path.join(checkpoint_dir, f"run_{index:03d}.pt")
+
+    registry = ModelRegistry(model_dir) if model_dir is not None else None
+    results = {}
+    survivors = list(range(len(configs)))
+    with open(tsv_path, 'w', newline='', encoding='utf-8') as tsv_file, _executor(num_workers) as executor:
+        writer = csv.DictWriter(tsv_file, TSV_FIELDS, delimiter='\t', lineterminator='\n')
+        writer.writeheader()
+
+        for rung, budget in enumerate(budgets):
+            tasks = []
+            for index in survivors:
+                config = configs[index].replace(
+                    num_episodes=budget, checkpoint_path=checkpoint(index),
+                    model_path=os.path.join(model_dir, f"run_{index:03d}.pth") if model_dir else None)
+                tasks.append((index, config, eval_games, eval_rounds, EVAL_SEED,
+                              checkpoint(index) if rung else None))
+
+            for result in _completed(executor, tasks):
+                previous = results.get(result['index'])
+                result['rung'] = rung
+                result['rung_evaluations'] = (previous['rung_evaluations'] if previous else []) + [
+                    result['evaluation']['per_round']]
+                if previous:
+                    result['wall_time'] += previous['wall_time']
+                results[result['index']] = result
+                _register(registry, result)
+                writer.writerow(_tsv_row(result))
+                tsv_file.flush()
+                with open(json_path, 'w', encoding='utf-8') as json_file:
+                    json.dump([results[index] for index in sorted(results)], json_file)
+
+            ranked = sorted(survivors, key=lambda index: -results[index]['evaluation']['mean'])
+            print(f"Rung {rung}: {len(survivors)} runs at {budget} episodes, best run {ranked[0]} "
+                  f"({results[ranked[0]]['evaluation']['per_round']:.4f}/round)")
+            survivors = ranked[:max(1, math.ceil(len(ranked) / eta))]
+
+    return [results[index] for index in sorted(results)]
+
+
+def _distinct(configs):
+    # Identical runs would train identically, tie in the ranking and take promotion slots
+    distinct = []
+    for config in configs:
+        if config not in distinct:
+            distinct.append(config)
+    return distinct
+
+
+def _executor(num_workers):
+    """A process pool for `num_workers` > 1 concurrent runs, otherwise None (in-process)."""
+    if num_workers <= 1:
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=num_workers, mp_context=mp.get_context('spawn'),
+                               initializer=_init_worker)
+
+
+def _completed(executor, tasks):
+    """Runs `run_config` for every argument tuple, yielding the results as they finish."""
+    if executor is None:
+        for arguments in tasks:
+            yield run_config(*arguments)
+        return
+    futures = [executor.submit(run_config, *arguments) for arguments in tasks]
+    for future in as_completed(futures):
+        yield future.result()
 
 # ============================================================
-# Main Loop
+# Entry Point
 # ============================================================
 
-# Initialize the log file with headers
-with open(LOG_FILE, "w") as log_file:
-    log_file.write("Episodes\tAverageReward\tDuration(s)\n")
-
-# Iterate over different episode counts
-for episodes in range(START_EPISODES, MAX_EPISODES + 1, EPISODE_STEP):
-    print(f"Starting training with {episodes} episodes...")
-    start_time = time.time()
-
-    # Run the training script with the current number of episodes
-    result = subprocess.run(
-        ["python3", TRAINING_SCRIPT, "--num_episodes", str(episodes)],
-        capture_output=True,
-        text=True
-    )
-
-    duration = time.time() - start_time
-
-    # Handle the results
-    if result.returncode == 0:
-        avg_reward = parse_average_reward(result.stdout.strip())
-        if avg_reward is not None:
-            # Log the successful run
-            with open(LOG_FILE, "a") as log_file:
-                log_file.write(f"{episodes}\t{avg_reward:.4f}\t{duration:.2f}\n")
-        else:
-            print(f"Warning: Could not extract Average Reward for {episodes} episodes.")
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train and evaluate every configuration of SWEEP_GRID.")
+    parser.add_argument('--workers', type=int, default=NUM_WORKERS, help="Concurrent runs (default: CPU count)")
+    parser.add_argument('--json', default=RESULTS_JSON, help="Full results with reward curves")
+    parser.add_argument('--tsv', default=RESULTS_TSV, help="One summary line per run")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Directory for the trained networks")
+    parser.add_argument('--halving', action='store_true',
+                        help="Successive halving: only the best 1/eta of the runs continue after every rung")
+    parser.add_argument('--min-episodes', type=int, default=HALVING_MIN_EPISODES,
+                        help="Episodes of the first rung (with --halving)")
+    parser.add_argument('--max-episodes', type=int, default=HALVING_MAX_EPISODES,
+                        help="Episodes of the last rung (with --halving)")
+    parser.add_argument('--eta', type=int, default=HALVING_ETA, help="Promotion ratio between rungs (with --halving)")
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR,
+                        help="Directory for the checkpoints between rungs (with --halving)")
+    args = parser.parse_args(argv)
+
+    grid = SWEEP_GRID
+    if args.halving:
+        # The rung budgets take the place of the grid's episode counts
+        grid = {**SWEEP_GRID, 'num_episodes': [args.min_episodes]}
+    configs = sweep_configs(grid)
+    print(f"Sweeping {len(configs)} configurations...")
+    start = time.perf_counter()
+    if args.halving:
+        results = successive_halving(configs, args.min_episodes, args.max_episodes, args.eta, args.workers,
+                                     args.json, args.tsv, args.model_dir, args.checkpoint_dir)
+        episodes = sum(result['config']['num_episodes'] for result in results)
+        print(f"Trained {episodes} episodes instead of {len(configs) * args.max_episodes} for the full grid")
     else:
-        print(f"Error running script for {episodes} episodes.")
-        with open(LOG_FILE, "a") as log_file:
-            log_file.write(f"{episodes}\tERROR\t{duration:.2f}\n")
+        run_sweep(configs, args.workers, args.json, args.tsv, args.model_dir)
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s; results in {args.json} and {args.tsv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import os
+import csv
+import functools
+import math
+import numpy as np
+
+# ============================================================
+# Action Codes
+# ============================================================
+
+STAND, HIT, DOUBLE, SPLIT = 0, 1, 2, 3
+ACTION_NAMES = ('S', 'H', 'D', 'SP')
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+STRATEGY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ============================================================
+# Table Compilation
+# ============================================================
+
+def compile_table(path: str, default: int) -> np.ndarray:
+    """
+    Compiles a basic strategy CSV into a dense lookup table.
+
+    The table is indexed by (player total or pair value, dealer upcard value),
+    with Aces as 11. Cells missing from the CSV get `default`, and actions the
+    simulation does not support (e.g. 'R' for surrender) become a stand.
+
+    Args:
+        path (str): Path to the strategy CSV.
+        default (int): Action code for combinations not in the CSV.
+
+    Returns:
+        np.ndarray: Read-only (32, 12) int8 table of action codes.
+    """
+    table = np.full((32, 12), default, dtype=np.int8)
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        dealer_values = [int(value) for value in header[1:]]
+        for row in reader:
+            if not row:
+                continue
+            row_index = 11 if row[0] == 'A' else int(row[0])
+            for dealer_value, action in zip(dealer_values, row[1:]):
+                table[row_index, dealer_value] = ACTION_CODES.get(action.strip(), STAND)
+    table.flags.writeable = False
+    return table
+
+
+def compile_tables(directory: str = STRATEGY_DIR):
+    """The hard, soft and pair tables of the three strategy CSVs in `directory`."""
+    return (compile_table(os.path.join(directory, 'hard_totals.csv'), STAND),
+            compile_table(os.path.join(directory, 'soft_totals.csv'), STAND),
+            compile_table(os.path.join(directory, 'pairs.csv'), HIT))
+
+
+# Compiled once at import and shared by every environment instance
+HARD_TABLE, SOFT_TABLE, PAIR_TABLE = compile_tables()
+
+
+@functools.lru_cache(maxsize=None)
+def strategy_tables(directory: str = None):
+    """
+    The compiled tables of a strategy directory (see TableRules.strategy_dir),
+    compiled once per directory; None gives the shipped tables.
+    """
+    if directory is None:
+        return HARD_TABLE, SOFT_TABLE, PAIR_TABLE
+    return compile_tables(directory)
+
+# ============================================================
+# Lookups
+# ============================================================
+
+def hard_total_action(player_total: int, dealer_value: int) -> int:
+    """Action code for a hard total against the dealer's upcard value."""
+    return HARD_TABLE.item(min(player_total, 21), dealer_value)
+
+
+def soft_total_action(player_total: int, dealer_value: int) -> int:
+    """Action code for a soft total against the dealer's upcard value."""
+    return SOFT_TABLE.item(min(player_total, 20), dealer_value)
+
+
+def pair_action(pair_value: int, dealer_value: int) -> int:
+    """Action code for a pair of cards worth `pair_value` each (Aces as 11)."""
+    return PAIR_TABLE.item(pair_value, dealer_value)
+
+# ============================================================
+# Count-Dependent Deviations
+# ============================================================
+#
+# Index plays (Illustrious 18, without insurance, which is never offered) are
+# listed in deviations.csv as (hand kind, player total or pair value, dealer
+# upcard, index, action at or above the index, action below it). They are
+# layered on the basic strategy tables and compiled into (32, 12, buckets)
+# tables whose last axis is the floored Hi-Lo true count, so playing with
+# deviations is still a single array lookup per decision.
+
+DEVIATIONS_PATH = os.path.join(STRATEGY_DIR, 'deviations.csv')
+TRUE_COUNT_MIN, TRUE_COUNT_MAX = -10, 10  # True counts beyond are clipped
+NUM_BUCKETS = TRUE_COUNT_MAX - TRUE_COUNT_MIN + 1
+
+
+def true_count_bucket(true_count: float) -> int:
+    """Bucket index of a true count: its floor, clipped to TRUE_COUNT_MIN..TRUE_COUNT_MAX."""
+    return min(max(math.floor(true_count), TRUE_COUNT_MIN), TRUE_COUNT_MAX) - TRUE_COUNT_MIN
+
+
+def true_count_buckets(true_counts: np.ndarray) -> np.ndarray:
+    """Vectorized `true_count_bucket`."""
+    return np.clip(np.floor(true_counts), TRUE_COUNT_MIN, TRUE_COUNT_MAX).astype(np.int64) - TRUE_COUNT_MIN
+
+
+def compile_deviations(path: str = DEVIATIONS_PATH, hard_table: np.ndarray = HARD_TABLE,
+                       soft_table: np.ndarray = SOFT_TABLE, pair_table: np.ndarray = PAIR_TABLE):
+    """
+    Compiles index plays on top of the basic strategy tables.
+
+    Args:
+        path (str): Path to the deviations CSV.
+        hard_table, soft_table, pair_table (np.ndarray): Basic strategy tables to start from.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Read-only (32, 12, NUM_BUCKETS) int8
+        hard, soft and pair tables, indexed like the basic tables plus `true_count_bucket`.
+    """
+    tables = {kind: np.repeat(table[:, :, None], NUM_BUCKETS, axis=2)
+              for kind, table in (('hard', hard_table), ('soft', soft_table), ('pair', pair_table))}
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            player = 11 if row['Player'] == 'A' else int(row['Player'])
+            dealer = int(row['Dealer'])
+            index = int(row['Index'])
+            if not TRUE_COUNT_MIN < index <= TRUE_COUNT_MAX:
+                raise ValueError(f"Index {index} of {row['Hand']} {row['Player']} v {row['Dealer']} "
+                                 f"is outside {TRUE_COUNT_MIN}..{TRUE_COUNT_MAX}")
+            split = index - TRUE_COUNT_MIN
+            cell = tables[row['Hand']][player, dealer]
+            cell[:split] = ACTION_CODES[row['Below']]
+            cell[split:] = ACTION_CODES[row['AtOrAbove']]
+    for table in tables.values():
+        table.flags.writeable = False
+    return tables['hard'], tables['soft'], tables['pair']
+
+
+@functools.lru_cache(maxsize=None)
+def deviation_tables(directory: str = None):
+    """The index plays of DEVIATIONS_PATH on the tables of `strategy_tables(directory)`, compiled on first use."""
+    return compile_deviations(DEVIATIONS_PATH, *strategy_tables(directory))
@@ -0,0 +1,371 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict
+import numpy as np
+import torch
+import torch.optim as optim
+from blackjack_env import BlackjackEnv, Deck, Hand, ShoeTracker, CODE_VALUES
+from counting import COUNTING_SYSTEMS, tag_matrix
+from vector_env import VectorBlackjackEnv
+from rollout import collect_rollout
+from inference import InferencePolicy
+from agent import (PolicyNetwork, STATE_SIZE, ACTION_SIZE, HIDDEN_SIZE, LEARNING_RATE,
+                   NUM_ENVS, BATCH_SIZE, DEVICE, reinforce_update)
+
+# ============================================================
+# Configuration
+# ============================================================
+
+RESULTS_PATH = 'benchmark_results.json'
+BASELINE_PATH = 'benchmark_baseline.json'
+TOLERANCE = 0.15           # Relative slowdown against the baseline reported as a regression
+REPEAT = 5                 # Timing repeats; the fastest one is kept
+INFERENCE_BATCH_SIZES = (1, 16, 256, 4096)
+INFERENCE_BACKENDS = ('numpy', 'torch', 'script')  # InferencePolicy backends timed besides the raw network
+STARTUP_TARGET_MS = 300    # Budget for starting the table-side advisor (intepret_count.py)
+
+# Units of the reported metrics; rates and correlations are better when higher, latencies when lower
+HIGHER_IS_BETTER = {'rounds/s': True, 'updates/s': True, 'corr': True, 'ms': False, 'us': False, 'ns': False}
+
+# ============================================================
+# Timing
+# ============================================================
+
+def best_time(function: Callable[[], object], number: int, repeat: int = REPEAT) -> float:
+    """Fastest time of one call of `function`, in seconds, over `repeat` runs of `number` calls."""
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=number)) / number
+
+
+def metric(value: float, unit: str) -> Dict[str, object]:
+    return {'value': float(value), 'unit': unit}
+
+# ============================================================
+# Benchmarks
+# ============================================================
+
+def bench_deck(scale: float = 1.0) -> Dict[str, dict]:
+    """Cost of building and shuffling an 8-deck shoe, and of dealing one card."""
+    deck = Deck(num_decks=8, seed=0)
+    cards_per_run = max(1, int(300 * scale))
+
+    def deal():
+        deck.cursor = 0
+        for _ in range(cards_per_run):
+            deck.deal_code()
+
+    return {
+        'deck.build_shuffle': metric(best_time(lambda: (deck.build_deck(), deck.shuffle()),
+                                               number=max(1, int(200 * scale))) * 1e6, 'us'),
+        'deck.deal': metric(best_time(deal, number=10) / cards_per_run * 1e9, 'ns'),
+    }
+
+
+def bench_env(scale: float = 1.0) -> Dict[str, dict]:
+    """Rounds per second of BlackjackEnv reset + step and of the vectorized environment, with and without deviations."""
+    rounds = max(1, int(2000 * scale))
+    results = {}
+    for suffix, deviations in (('', False), ('_deviations', True)):
+        env = BlackjackEnv(num_decks=8, seed=0, deviations=deviations)
+
+        def play_scalar():
+            for round_num in range(rounds):
+                env.reset()
+                env.step(round_num % ACTION_SIZE)
+
+        vector_env = VectorBlackjackEnv(num_envs=1024, num_decks=8, seed=0, deviations=deviations)
+        actions = np.arange(1024) % ACTION_SIZE
+
+        def play_vector():
+            vector_env.reset()
+            vector_env.step(actions)
+
+        results[f'env.scalar{suffix}'] = metric(rounds / best_time(play_scalar, number=1), 'rounds/s')
+        results[f'env.vector{suffix}'] = metric(
+            1024 / best_time(play_vector, number=max(1, int(20 * scale))), 'rounds/s')
+    return results
+
+
+def bench_counting(scale: float = 1.0) -> Dict[str, dict]:
+    """
+    Betting signal and cost of every registered counting system.
+
+    The signal is the correlation between a system's true count before the deal and
+    the result of a flat one-unit bet, over the same seeded rounds for all systems.
+    Every system is one tag column, so all of them cost the same to keep; the cost
+    metrics are the vector env with every system against Hi-Lo only, and one read of
+    all running counts from a shoe tracker.
+    """
+    names = list(COUNTING_SYSTEMS)
+    env = VectorBlackjackEnv(num_envs=1024, num_decks=8, seed=0, count_systems=names)
+    actions = np.zeros(1024, dtype=np.int64)
+    observations, rewards = [], []
+    for _ in range(max(1, int(50 * scale))):
+        observations.append(env.reset()[:, 4:])
+        rewards.append(env.step(actions)[1])
+    observations, rewards = np.concatenate(observations), np.concatenate(rewards)
+
+    results = {f'counting.{name}.signal': metric(np.corrcoef(observations[:, i], rewards)[0, 1], 'corr')
+               for i, name in enumerate(names)}
+
+    def play():
+        env.reset()
+        env.step(actions)
+
+    results['counting.vector_all_systems'] = metric(
+        1024 / best_time(play, number=max(1, int(20 * scale))), 'rounds/s')
+    tracker = ShoeTracker(num_decks=8)
+    tracker.observe_codes(range(52))
+    tags = tag_matrix(names)
+    results['counting.read_all_systems'] = metric(
+        best_time(lambda: tracker.system_counts(tags), number=max(1, int(10_000 * scale))) * 1e6, 'us')
+    return results
+
+
+def bench_strategy(scale: float = 1.0) -> Dict[str, dict]:
+    """
+    Latency of one strategy lookup as BlackjackEnv makes it on its hot path
+    (`_basic_strategy_action`, indexing the compiled tables with `.item`), averaged
+    over a hand of every table row and every dealer upcard, with and without deviations.
+    """
+    # One two- or three-card hand per row of the hard, soft and pair tables
+    hands = {}
+    for ranks in itertools.chain(itertools.combinations_with_replacement(range(13), 2),
+                                 itertools.combinations_with_replacement(range(13), 3)):
+        hand = Hand()
+        for code in ranks:
+            hand.add_code(code)
+        if hand.is_busted():
+            continue
+        if hand.can_split():
+            hands.setdefault(('pair', CODE_VALUES[hand.codes[0]]), hand)
+        else:
+            hands.setdefault(('soft' if hand.aces else 'hard', hand.value), hand)
+    dealers = []
+    for code in sorted({CODE_VALUES.index(value) for value in range(2, 12)}):
+        dealer = Hand()
+        dealer.add_code(code)
+        dealers.append(dealer)
+    number = max(1, int(20 * scale))
+
+    results = {}
+    for suffix, deviations in (('', False), ('_deviations', True)):
+        env = BlackjackEnv(num_decks=8, seed=0, deviations=deviations)
+        for kind in ('hard', 'soft', 'pair'):
+            kind_hands = [hand for (cell_kind, _), hand in hands.items() if cell_kind == kind]
+
+            def lookups():
+                for dealer in dealers:
+                    env.dealer_hand = dealer
+                    for hand in kind_hands:
+                        env._basic_strategy_action(hand)
+
+            seconds = best_time(lookups, number) / (len(kind_hands) * len(dealers))
+            results[f'strategy.{kind}{suffix}'] = metric(seconds * 1e9, 'ns')
+    return results
+
+
+def bench_inference(scale: float = 1.0) -> Dict[str, dict]:
+    """
+    PolicyNetwork forward latency without gradients, per batch size: the network
+    called directly, and every InferencePolicy backend from NumPy states to sampled bets.
+    """
+    torch.manual_seed(0)
+    policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, HIDDEN_SIZE).to(DEVICE).eval()
+    policies = {backend: InferencePolicy(policy_net, backend) for backend in INFERENCE_BACKENDS}
+    rng = np.random.default_rng(0)
+    results = {}
+    for batch_size in INFERENCE_BATCH_SIZES:
+        states = torch.rand(batch_size, STATE_SIZE, device=DEVICE)
+        number = max(1, int(200 * scale / max(1, batch_size // 64)))
+
+        def forward():
+            with torch.no_grad():
+                policy_net(states).cpu()
+
+        results[f'inference.batch_{batch_size}'] = metric(best_time(forward, number) * 1e6, 'us')
+
+        # A single decision is made on one state, as the players do
+        state_batch = states.cpu().numpy()[0] if batch_size == 1 else states.cpu().numpy()
+        uniforms = rng.random(batch_size)[0] if batch_size == 1 else rng.random(batch_size)
+        for backend, policy in policies.items():
+            results[f'inference.{backend}.batch_{batch_size}'] = metric(
+                best_time(lambda: policy.sample(state_batch, uniforms), number) * 1e6, 'us')
+    return results
+
+
+def bench_training(scale: float = 1.0) -> Dict[str, dict]:
+    """Training updates per second: one rollout of BATCH_SIZE rounds plus its REINFORCE update."""
+    torch.manual_seed(0)
+    policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, HIDDEN_SIZE).to(DEVICE)
+    optimizer = optim.Adam(policy_net.parameters(), lr=LEARNING_RATE)
+    env = VectorBlackjackEnv(num_envs=NUM_ENVS, num_decks=8, seed=0)
+    rng = np.random.default_rng(0)
+    batch_size = max(1, BATCH_SIZE // NUM_ENVS) * NUM_ENVS
+    states = np.zeros((batch_size, STATE_SIZE), dtype=np.float32)
+    actions = np.zeros(batch_size, dtype=np.int64)
+    rewards = np.zeros(batch_size, dtype=np.float32)
+
+    def update():
+        collect_rollout(env, policy_net, 0.1, states, actions, rewards, rng)
+        reinforce_update(policy_net, optimizer, states, actions, rewards - rewards.mean())
+
+    seconds = best_time(update, number=max(1, int(5 * scale)))
+    return {
+        'training.updates': metric(1 / seconds, 'updates/s'),
+        'training.rounds': metric(batch_size / seconds, 'rounds/s'),
+    }
+
+
+def bench_startup(scale: float = 1.0) -> Dict[str, dict]:
+    """Wall time of a fresh interpreter importing the advisor, i.e. its startup before the first prompt."""
+    command = [sys.executable, '-c', 'import intepret_count']
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    seconds = best_time(lambda: subprocess.run(command, cwd=cwd, check=True), number=1,
+                        repeat=max(1, int(REPEAT * scale)))
+    return {'startup.advisor': metric(seconds * 1e3, 'ms')}
+
+
+BENCHMARKS = {
+    'deck': bench_deck,
+    'env': bench_env,
+    'counting': bench_counting,
+    'strategy': bench_strategy,
+    'inference': bench_inference,
+    'training': bench_training,
+    'startup': bench_startup,
+}
+
+# ============================================================
+# Results
+# ============================================================
+
+def run_benchmarks(names=None, scale: float = 1.0) -> Dict[str, object]:
+    """
+    Runs the selected benchmarks.
+
+    Args:
+        names (List[str]): Keys of BENCHMARKS to run; all of them by default.
+        scale (float): Multiplier of the work per measurement; lower is faster but noisier.
+
+    Returns:
+        Dict[str, object]: The machine description and every metric by name.
+    """
+    metrics = {}
+    for name in names or BENCHMARKS:
+        metrics.update(BENCHMARKS[name](scale))
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'torch': torch.__version__,
+            'numpy': np.__version__,
+            'device': str(DEVICE),
+        },
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'metrics': metrics,
+    }
+
+
+def compare_results(results, baseline, tolerance: float = TOLERANCE) -> Dict[str, dict]:
+    """
+    Compares metrics against a baseline run.
+
+    Returns:
+        Dict[str, dict]: For every metric present in both runs, the baseline and
+        current value, the speedup (above 1 is faster) and a regression flag when
+        the speedup is below 1 - tolerance.
+    """
+    comparison = {}
+    for name, current in results['metrics'].items():
+        previous = baseline['metrics'].get(name)
+        if previous is None or previous['unit'] != current['unit']:
+            continue
+        if HIGHER_IS_BETTER[current['unit']]:
+            speedup = current['value'] / previous['value']
+        else:
+            speedup = previous['value'] / current['value']
+        comparison[name] = {
+            'baseline': previous['value'],
+            'current': current['value'],
+            'unit': current['unit'],
+            'speedup': speedup,
+            'regression': speedup < 1 - tolerance,
+        }
+    return comparison
+
+
+def print_results(results, comparison=None) -> None:
+    for name, current in results['metrics'].items():
+        precision = 4 if current['unit'] == 'corr' else 1
+        line = f"{name:<28} {current['value']:>14,.{precision}f} {current['unit']:<10}"
+        if comparison and name in comparison:
+            entry = comparison[name]
+            line += f" {entry['speedup']:>6.2f}x vs baseline"
+            if entry['regression']:
+                line += "  REGRESSION"
+        print(line)
+
+# ============================================================
+# Entry Point
+# ============================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure Deck Tacticus throughput.")
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f"Benchmarks to run, from {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--output', default=RESULTS_PATH, help="Where to write the JSON results")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Work per measurement; lower is faster but noisier")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(args.benchmarks, args.scale)
+
+    comparison = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            comparison = compare_results(results, json.load(baseline_file), args.tolerance)
+        results['comparison'] = comparison
+
+    with open(args.baseline if args.save_baseline else args.output, 'w', encoding='utf-8') as out:
+        json.dump(results, out, indent=2)
+    print_results(results, comparison)
+
+    startup = results['metrics'].get('startup.advisor')
+    if startup is not None and startup['value'] > STARTUP_TARGET_MS:
+        print(f"\nAdvisor startup {startup['value']:.0f} ms exceeds the {STARTUP_TARGET_MS} ms target")
+
+    regressions = [name for name, entry in (comparison or {}).items() if entry['regression']]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,12 +7,16 @@
 #     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
 # By Kurizaki & Sprudello
 
-import random
 import numpy as np
 import gym
 from gym import spaces
-import pandas as pd
 import logging
+from basic_strategy import STAND, DOUBLE, SPLIT, strategy_tables, deviation_tables, true_count_bucket
+# The card model lives in the gym-free cards module; it is re-exported here
+from cards import (CARD_VALUES, COUNT_VALUES, SUITS, RANKS, ACE_RANK, CODE_RANKS,
+                   CODE_VALUES, CODE_COUNTS, Card, Deck, Hand, ShoeTracker)
+from counting import tag_matrix
+from table_rules import TableRules
 
 # ============================================================
 # Configuration and Constants
@@ -20,116 +24,6 @@ import logging
 
 logging.basicConfig(level=logging.ERROR)  # Set to ERROR to suppress warnings
 
-CARD_VALUES = {
-    '2': 2, '3': 3, '4': 4, '5': 5,
-    '6': 6, '7': 7, '8': 8, '9': 9,
-    '10': 10, 'J': 10, 'Q': 10,
-    'K': 10, 'A': 11
-}
-
-COUNT_VALUES = {
-    '2': 1, '3': 1, '4': 1, '5': 1,
-    '6': 1, '7': 0, '8': 0, '9': 0,
-    '10': -1, 'J': -1, 'Q': -1,
-    'K': -1, 'A': -1
-}
-
-
-# ============================================================
-# Card and Deck Classes
-# ============================================================
-
-class Card:
-    """Represents a single playing card."""
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        self.value = CARD_VALUES[self.rank]
-
-    def __str__(self):
-        return f"{self.rank}{self.suit}"
-
-
-class Deck:
-    """
-    Represents a shoe containing multiple decks of cards.
-    Automatically rebuilds and shuffles when cards run out.
-    """
-    suits = ['♠', '♥', '♦', '♣']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10',
-             'J', 'Q', 'K', 'A']
-
-    def __init__(self, num_decks=8):
-        self.num_decks = num_decks
-        self.cards = []
-        self.build_deck()
-        self.shuffle()
-
-    def build_deck(self):
-        self.cards = []
-        for _ in range(self.num_decks):
-            for suit in self.suits:
-                for rank in self.ranks:
-                    self.cards.append(Card(rank, suit))
-
-    def shuffle(self):
-        random.shuffle(self.cards)
-
-    def deal_card(self):
-        if not self.cards:
-            self.build_deck()
-            self.shuffle()
-        return self.cards.pop(0)
-
-
-# ============================================================
-# Hand Class
-# ============================================================
-
-class Hand:
-    """Represents a hand of cards held by a player or the dealer."""
-    def __init__(self, is_split_aces=False):
-        self.cards = []
-        self.value = 0
-        self.aces = 0
-        self.doubled = False
-        self.is_split_aces = is_split_aces
-        self.is_split = False
-
-    def add_card(self, card):
-        self.cards.append(card)
-        self.value += card.value
-        if card.rank == 'A':
-            self.aces += 1
-        self.adjust_for_ace()
-
-    def adjust_for_ace(self):
-        """Adjust the value of Aces if the hand is over 21."""
-        while self.value > 21 and self.aces:
-            self.value -= 10
-            self.aces -= 1
-
-    def is_busted(self):
-        return self.value > 21
-
-    def has_blackjack(self):
-        return (self.value == 21 and len(self.cards) == 2 and not self.is_split)
-
-    def is_six_card_charlie(self):
-        return (len(self.cards) == 6 and not self.is_busted())
-
-    def can_double(self):
-        return (len(self.cards) == 2 and not self.is_split_aces)
-
-    def can_split(self):
-        # Split if both cards have the same Blackjack value
-        return (len(self.cards) == 2 and
-                CARD_VALUES[self.cards[0].rank] == CARD_VALUES[self.cards[1].rank])
-
-    def __str__(self):
-        return ', '.join(str(card) for card in self.cards)
-
-
 # ============================================================
 # Blackjack Environment
 # ============================================================
@@ -138,52 +32,106 @@ class BlackjackEnv(gym.Env):
     """
     A custom Blackjack environment.
 
-    Observation: [True count, Percentage remaining, Dealer's visible card value, 0(no insurance)]
-    Action: A discrete value 0-9 indicating the bet amount (bet = action+1).
+    The table may seat several players sharing the shoe: each seat is dealt
+    its two cards in seat order and plays its hands in seat order, before the
+    dealer. The seats in `policy_seats` bet by the action, every other seat
+    is a filler that bets one unit; all seats play the strategy tables.
+    `player_hands` holds the hands of the first policy seat.
+
+    Observation: [True count, Percentage remaining, Dealer's visible card value, 0(no insurance)],
+    followed by the true count of every extra counting system.
+    Action: A discrete value 0-9 indicating the bet amount (bet = action+1); with several
+    policy seats, one such value per policy seat, and the reward is an array of their rewards.
     """
 
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, num_decks=8):
+    def __init__(self, num_decks=8, seed=None, count_systems=(), deviations=False, rules=None,
+                 num_seats=1, policy_seats=(0,)):
+        """
+        Args:
+            num_decks (int): Decks per shoe, when no rules are given.
+            seed (int): Seed of the shoe; None draws fresh entropy.
+            count_systems (Sequence[str]): Extra counting systems (see counting.py) whose
+                true counts are appended to the observation, in order.
+            deviations (bool): Play the index plays of deviations.csv, by the true
+                count the bet was placed on, instead of plain basic strategy.
+            rules (TableRules): Rules of the table; the default rules with `num_decks` when None.
+            num_seats (int): Players at the table, all dealt from the same shoe.
+            policy_seats (Sequence[int]): Seats that bet by the action; the others bet one unit.
+        """
         super(BlackjackEnv, self).__init__()
 
-        self.num_decks = num_decks
-        self.deck = Deck(num_decks=self.num_decks)
+        policy_seats = tuple(policy_seats)
+        if not policy_seats or len(set(policy_seats)) != len(policy_seats) or \
+                not all(0 <= seat < num_seats for seat in policy_seats):
+            raise ValueError(f"policy_seats must be distinct seats of 0..{num_seats - 1}, got {policy_seats}")
+        self.num_seats = num_seats
+        self.policy_seats = policy_seats
+        self.seat_hands = []
+        self.seat_rewards = []
+
+        self.rules = rules if rules is not None else TableRules(num_decks=num_decks)
+        self.num_decks = self.rules.num_decks
+        # Rule values used in the hot paths, read once
+        self._minimum_cards = self.rules.minimum_cards
+        self._charlie_cards = self.rules.charlie_limit
+        self._blackjack_payout = self.rules.blackjack_payout
+        self._dealer_hits_soft_17 = self.rules.dealer_hits_soft_17
+        self._split_aces_one_card = self.rules.split_aces_one_card
+        self._double_after_split = self.rules.double_after_split
+        self.deck = Deck(num_decks=self.num_decks, seed=seed)
         self.player_hands = []
         self.dealer_hand = None
-        self.count = 0
+        # Running count and unseen composition of the current shoe, updated per card seen
+        self.shoe_tracker = ShoeTracker(num_decks=self.num_decks)
+        self._tracked_shuffles = self.deck.shuffles
         self.true_count = 0
+        self.count_systems = tuple(count_systems)
+        self.system_tags = tag_matrix(self.count_systems)
+        self.system_true_counts = np.zeros(len(self.count_systems))
+        self.strategy_tables = strategy_tables(self.rules.strategy_dir)
+        self.deviation_tables = deviation_tables(self.rules.strategy_dir) if deviations else None
+        self.count_bucket = true_count_bucket(0)
 
         # Action space: Bet amount only (0-9 -> bet 1-10)
         self.action_space = spaces.Discrete(10)
 
         # Observation space:
         # [true_count, percentage_remaining, dealer_visible_value, insurance_offered(=0)]
+        num_systems = len(self.count_systems)
         self.observation_space = spaces.Box(
-            low=np.array([-10, 0, 1, 0]),
-            high=np.array([10, 1, 11, 0]),
+            low=np.array([-10, 0, 1, 0] + [-10] * num_systems),
+            high=np.array([10, 1, 11, 0] + [10] * num_systems),
             dtype=np.float32
         )
 
-        # Load basic strategy tables
-        self.hard_totals = pd.read_csv('hard_totals.csv', index_col='PlayerTotal')
-        self.soft_totals = pd.read_csv('soft_totals.csv', index_col='PlayerTotal')
-        self.pairs = pd.read_csv('pairs.csv', index_col='Pair')
+    def minimum_deck_size(self):
+        return self._minimum_cards
 
-        self.basic_strategy_cache = {}
+    @property
+    def count(self):
+        """Hi-Lo running count of the current shoe."""
+        return self.shoe_tracker.running_count
 
-    def minimum_deck_size(self):
-        return int(0.25 * 52 * self.num_decks)
+    def reset(self, seed=None):
+        """
+        Reset the environment for a new round.
 
-    def reset(self):
-        """Reset the environment for a new round."""
-        self.player_hands = []
+        Passing a seed reseeds the shoe and starts a fresh, fully shuffled shoe,
+        so the same seed always deals the same sequence of rounds.
+        """
+        self.seat_hands = []
         self.dealer_hand = Hand()
 
-        if len(self.deck.cards) < self.minimum_deck_size():
-            self.deck = Deck(num_decks=self.num_decks)
-            self.count = 0
-            self.true_count = 0
+        if seed is not None:
+            self.deck.rng = np.random.default_rng(seed)
+            self.deck.build_deck()
+            self.deck.reshuffle()
+            self._new_shoe()
+        elif len(self.deck) < self.minimum_deck_size():
+            self.deck.reshuffle()
+            self._new_shoe()
 
         self._deal_initial_cards()
         observation = self._get_observation()
@@ -194,16 +142,21 @@ class BlackjackEnv(gym.Env):
         Execute a betting action, then simulate the player and dealer plays.
         Return the final observation, reward, done, and info.
         """
-        self.current_bet = action + 1
-        player_results = []
-
-        # Player plays for each hand
-        for hand in self.player_hands:
-            results = self._player_play(hand)
-            player_results.append(results)
+        policy_bets = [action + 1] if len(self.policy_seats) == 1 else [bet + 1 for bet in action]
+        bets = [1] * self.num_seats
+        for seat, bet in zip(self.policy_seats, policy_bets):
+            bets[seat] = bet
+        self.current_bet = policy_bets[0]
+        if self.deviation_tables is not None:
+            self.count_bucket = true_count_bucket(self.true_count)
+
+        # Seat by seat, the initial hand is played, and may turn into two split hands
+        for seat in range(self.num_seats):
+            self.seat_hands[seat] = self._player_play(self.seat_hands[seat][0])
+        self.player_hands = self.seat_hands[self.policy_seats[0]]
 
         # Reveal and count the dealer's hidden card
-        self._update_count(self.dealer_hand.cards[1])
+        self._update_count(self.dealer_hand.codes[1])
 
         dealer_blackjack = self.dealer_hand.has_blackjack()
 
@@ -212,16 +165,30 @@ class BlackjackEnv(gym.Env):
         if not dealer_blackjack:
             dealer_busted = self._dealer_play()
 
-        # Calculate total reward
-        total_reward = 0
-        for hand, player_busted, player_blackjack in player_results:
-            reward = self._calculate_reward(player_busted, dealer_busted,
-                                            self.current_bet, hand,
-                                            player_blackjack, dealer_blackjack)
-            total_reward += reward
+        # Calculate the total reward of every seat over all its hands
+        self.seat_rewards = []
+        for hands, bet in zip(self.seat_hands, bets):
+            total_reward = 0
+            for hand in hands:
+                reward = self._calculate_reward(hand.is_busted(), dealer_busted, bet, hand,
+                                                hand.has_blackjack(), dealer_blackjack)
+                total_reward += reward
+            self.seat_rewards.append(total_reward)
+        if len(self.policy_seats) == 1:
+            total_reward = self.seat_rewards[self.policy_seats[0]]
+        else:
+            total_reward = np.array([self.seat_rewards[seat] for seat in self.policy_seats])
+
+        # A shoe that ran out mid-round was replaced; count only what was seen of the new one
+        if self.deck.shuffles != self._tracked_shuffles:
+            self._new_shoe()
+            self.shoe_tracker.observe_codes(self.deck.shoe[:self.deck.cursor].tolist())
 
         # Update true count
-        self.true_count = self.count / max(1, len(self.deck.cards) / 52)
+        self.true_count = self.shoe_tracker.true_count
+        if self.count_systems:
+            self.system_true_counts = (self.shoe_tracker.system_counts(self.system_tags) /
+                                       max(1, self.shoe_tracker.decks_remaining))
 
         done = True
         observation = self._get_observation()
@@ -238,209 +205,130 @@ class BlackjackEnv(gym.Env):
     # ============================================================
 
     def _deal_initial_cards(self):
-        """Deal initial two cards to player and dealer."""
-        # Player hand
-        player_hand = Hand()
-        card = self.deck.deal_card()
-        player_hand.add_card(card)
-        self._update_count(card)
-
-        card = self.deck.deal_card()
-        player_hand.add_card(card)
-        self._update_count(card)
-        self.player_hands.append(player_hand)
+        """Deal initial two cards to every seat and the dealer."""
+        # Player hands, seat by seat
+        for seat in range(self.num_seats):
+            player_hand = Hand()
+            code = self.deck.deal_code()
+            player_hand.add_code(code)
+            self._update_count(code)
+
+            code = self.deck.deal_code()
+            player_hand.add_code(code)
+            self._update_count(code)
+            self.seat_hands.append([player_hand])
+        self.player_hands = self.seat_hands[self.policy_seats[0]]
 
         # Dealer hand
-        card = self.deck.deal_card()
-        self.dealer_hand.add_card(card)
-        self._update_count(card)
+        code = self.deck.deal_code()
+        self.dealer_hand.add_code(code)
+        self._update_count(code)
 
-        card = self.deck.deal_card()
-        self.dealer_hand.add_card(card)
+        code = self.deck.deal_code()
+        self.dealer_hand.add_code(code)
         # Dealer's second card is counted after player finishes
 
     def _player_play(self, hand):
         """
         Let the player (or hands if split) play according to basic strategy.
-        Returns (final_hand, player_busted, player_blackjack).
+        A pair may be split once; split aces receive one card each and stand.
+        Returns the list of final hands to be settled.
         """
-        player_blackjack = hand.has_blackjack()
-        player_busted = False
         hands_to_play = [hand]
         i = 0
 
         while i < len(hands_to_play):
             current_hand = hands_to_play[i]
-            iteration_count = 0
-            max_iterations = 10
-
-            # Split Aces: If two cards, forced stand
-            if current_hand.is_split_aces and len(current_hand.cards) == 2:
-                i += 1
-                continue
-
-            while iteration_count < max_iterations:
-                iteration_count += 1
 
-                if current_hand.is_six_card_charlie():
+            while not current_hand.is_busted():
+                if len(current_hand.codes) == self._charlie_cards:
                     break  # Automatic win
 
-                if current_hand.is_split_aces and len(current_hand.cards) == 2:
+                if current_hand.is_split_aces and len(current_hand.codes) == 2:
                     # Forced stand on split aces with two cards
                     break
 
                 action = self._basic_strategy_action(current_hand)
 
-                # If split aces with two cards, must stand
-                if current_hand.is_split_aces and len(current_hand.cards) == 2:
-                    action = 'S'
-
-                if action == 'H':
-                    card = self.deck.deal_card()
-                    current_hand.add_card(card)
-                    self._update_count(card)
-                    if current_hand.is_busted():
-                        player_busted = True
-                        break
-
-                elif action == 'D':
-                    if current_hand.can_double():
-                        current_hand.doubled = True
-                        card = self.deck.deal_card()
-                        current_hand.add_card(card)
-                        self._update_count(card)
-                        if current_hand.is_busted():
-                            player_busted = True
-                        break
-                    else:
-                        # If can't double, treat as hit
-                        card = self.deck.deal_card()
-                        current_hand.add_card(card)
-                        self._update_count(card)
-                        if current_hand.is_busted():
-                            player_busted = True
-                            break
-
-                elif action == 'SP':
-                    if current_hand.can_split():
-                        # Perform the split
-                        card1, card2 = current_hand.cards
-                        hand1 = Hand(is_split_aces=(card1.rank == 'A'))
-                        hand1.add_card(card1)
-                        hand1.is_split = True
-
-                        hand2 = Hand(is_split_aces=(card2.rank == 'A'))
-                        hand2.add_card(card2)
-                        hand2.is_split = True
-
-                        card = self.deck.deal_card()
-                        hand1.add_card(card)
-                        self._update_count(card)
-
-                        card = self.deck.deal_card()
-                        hand2.add_card(card)
-                        self._update_count(card)
-
-                        # Replace current hand with the two new hands
-                        hands_to_play.pop(i)
-                        hands_to_play.insert(i, hand2)
-                        hands_to_play.insert(i, hand1)
-                        break
-                    else:
-                        # Can't split, treat as hit
-                        card = self.deck.deal_card()
-                        current_hand.add_card(card)
-                        self._update_count(card)
-                        if current_hand.is_busted():
-                            player_busted = True
-                            break
-
-                elif action == 'S':
-                    # Stand
+                if action == SPLIT and current_hand.can_split():
+                    # Perform the split
+                    code1, code2 = current_hand.codes
+                    # Split aces that take a single card are marked as such
+                    one_card = self._split_aces_one_card and CODE_RANKS[code1] == ACE_RANK
+                    hand1 = Hand(is_split_aces=one_card)
+                    hand1.add_code(code1)
+                    hand1.is_split = True
+
+                    hand2 = Hand(is_split_aces=one_card)
+                    hand2.add_code(code2)
+                    hand2.is_split = True
+
+                    code = self.deck.deal_code()
+                    hand1.add_code(code)
+                    self._update_count(code)
+
+                    code = self.deck.deal_code()
+                    hand2.add_code(code)
+                    self._update_count(code)
+
+                    # Replace current hand with the two new hands and keep playing the first
+                    hands_to_play[i:i + 1] = [hand1, hand2]
+                    current_hand = hand1
+                    continue
+
+                if action == STAND:
                     break
-                else:
-                    # Unrecognized action -> stand
+
+                if (action == DOUBLE and current_hand.can_double() and
+                        (self._double_after_split or not current_hand.is_split)):
+                    current_hand.doubled = True
+                    code = self.deck.deal_code()
+                    current_hand.add_code(code)
+                    self._update_count(code)
                     break
-            else:
-                # Exceeded max iterations
-                break
+
+                # Hit (a double that is not allowed is played as a hit)
+                code = self.deck.deal_code()
+                current_hand.add_code(code)
+                self._update_count(code)
 
             i += 1
 
-        return hand, player_busted, player_blackjack
+        return hands_to_play
 
     def _basic_strategy_action(self, hand):
-        """Get the action from basic strategy tables (H, S, D, SP)."""
-        dealer_upcard = self.dealer_hand.cards[0]
-        dealer_value = CARD_VALUES[dealer_upcard.rank]
-        if dealer_upcard.rank == 'A':
-            dealer_value = 11
-
+        """Get the action code from the compiled basic strategy tables."""
+        dealer_value = CODE_VALUES[self.dealer_hand.codes[0]]
+
+        if self.deviation_tables is not None:
+            # The same lookup with the true-count bucket as a third index
+            hard_table, soft_table, pair_table = self.deviation_tables
+            if hand.can_split():
+                return pair_table.item(CODE_VALUES[hand.codes[0]], dealer_value, self.count_bucket)
+            if hand.aces >= 1 and hand.value <= 21:
+                return soft_table.item(min(hand.value, 20), dealer_value, self.count_bucket)
+            return hard_table.item(min(hand.value, 21), dealer_value, self.count_bucket)
+
+        hard_table, soft_table, pair_table = self.strategy_tables
         if hand.can_split():
-            player_pair = hand.cards[0].rank
-            action = self._get_action_from_pair(player_pair, dealer_value)
-        else:
-            is_soft = (hand.aces >= 1 and hand.value <= 21)
-            if is_soft:
-                action = self._get_action_from_soft_total(hand.value, dealer_value)
-            else:
-                action = self._get_action_from_hard_total(hand.value, dealer_value)
-
-        if action not in ['H', 'S', 'D', 'SP']:
-            action = 'S'
-        return action
-
-    def _get_action_from_hard_total(self, player_total, dealer_value):
-        key = ('hard', player_total, dealer_value)
-        if key in self.basic_strategy_cache:
-            return self.basic_strategy_cache[key]
-
-        player_total = min(player_total, 21)
-        try:
-            action = self.hard_totals.loc[player_total, str(int(dealer_value))]
-        except KeyError:
-            action = 'S'
-        self.basic_strategy_cache[key] = action
-        return action
-
-    def _get_action_from_soft_total(self, player_total, dealer_value):
-        key = ('soft', player_total, dealer_value)
-        if key in self.basic_strategy_cache:
-            return self.basic_strategy_cache[key]
-
-        player_total = min(player_total, 20)
-        try:
-            action = self.soft_totals.loc[player_total, str(int(dealer_value))]
-        except KeyError:
-            action = 'S'
-        self.basic_strategy_cache[key] = action
-        return action
-
-    def _get_action_from_pair(self, pair_rank, dealer_value):
-        key = ('pair', pair_rank, dealer_value)
-        if key in self.basic_strategy_cache:
-            return self.basic_strategy_cache[key]
-
-        rank_map = {'A': 'A', 'K': '10', 'Q': '10', 'J': '10', '10': '10'}
-        pair_rank = rank_map.get(pair_rank, pair_rank)
-
-        try:
-            action = self.pairs.loc[pair_rank, str(int(dealer_value))]
-        except KeyError:
-            action = 'H'
-        self.basic_strategy_cache[key] = action
-        return action
+            return pair_table.item(CODE_VALUES[hand.codes[0]], dealer_value)
+        if hand.aces >= 1 and hand.value <= 21:
+            return soft_table.item(min(hand.value, 20), dealer_value)
+        return hard_table.item(min(hand.value, 21), dealer_value)
 
     def _dealer_play(self):
         """
-        Dealer draws until value >= 17 (with Aces counted as 11 if possible).
+        Dealer draws until value >= 17 (with Aces counted as 11 if possible),
+        and on a soft 17 too when the rules say so.
         Returns True if dealer busts, otherwise False.
         """
-        while self.dealer_hand.value < 17:
-            card = self.deck.deal_card()
-            self.dealer_hand.add_card(card)
-            self._update_count(card)
-            if self.dealer_hand.is_busted():
+        dealer_hand = self.dealer_hand
+        while dealer_hand.value < 17 or (self._dealer_hits_soft_17 and dealer_hand.value == 17
+                                         and dealer_hand.aces):
+            code = self.deck.deal_code()
+            dealer_hand.add_code(code)
+            self._update_count(code)
+            if dealer_hand.is_busted():
                 return True
         return False
 
@@ -450,13 +338,13 @@ class BlackjackEnv(gym.Env):
         if hand.doubled:
             bet *= 2
 
-        # Six Card Charlie rule
-        if hand.is_six_card_charlie():
+        # Charlie rule
+        if len(hand.codes) == self._charlie_cards and not player_busted:
             return bet
 
         # Blackjacks
         if player_blackjack and not dealer_blackjack:
-            return 1.5 * bet
+            return self._blackjack_payout * bet
         elif dealer_blackjack and not player_blackjack:
             return -bet
         elif player_blackjack and dealer_blackjack:
@@ -474,23 +362,28 @@ class BlackjackEnv(gym.Env):
         else:
             return 0  # push
 
-    def _update_count(self, card):
-        self.count += COUNT_VALUES[card.rank]
+    def _update_count(self, code):
+        self.shoe_tracker.observe_code(code)
+
+    def _new_shoe(self):
+        """Start tracking a freshly shuffled shoe."""
+        self.shoe_tracker.reset()
+        self._tracked_shuffles = self.deck.shuffles
+        self.true_count = 0
+        self.system_true_counts = np.zeros(len(self.count_systems))
 
     def _get_observation(self):
         """Return the current observation as a state vector."""
         true_count = self.true_count
-        percentage_remaining = len(self.deck.cards) / (52 * self.num_decks)
-        dealer_upcard = self.dealer_hand.cards[0]
-        dealer_visible_value = CARD_VALUES[dealer_upcard.rank]
-        if dealer_upcard.rank == 'A':
-            dealer_visible_value = 11
+        percentage_remaining = len(self.deck) / (52 * self.num_decks)
+        dealer_visible_value = CODE_VALUES[self.dealer_hand.codes[0]]
         insurance_offered = 0  # Always 0 in this environment
 
         state = np.array([
             true_count,
             percentage_remaining,
             dealer_visible_value,
-            insurance_offered
+            insurance_offered,
+            *self.system_true_counts
         ], dtype=np.float32)
         return state
@@ -8,144 +8,125 @@
 # By Kurizaki & Sprudello
 
 import os
-import csv
-import torch
+import sys
+import time
 import numpy as np
 from blackjack_env import BlackjackEnv, Hand
-from agent import PolicyNetwork, state_size, action_size, hidden_size, device
+from evaluation import evaluate_policy, summarize, ShoeReplay, compare_policies, load_policy
+from inference import InferencePolicy
+from sim_log import SimulationLogWriter
+from model_registry import best_model_path, feature_spec
+from agent import STATE_SIZE, DEVICE, COUNT_SYSTEMS, PLAY_DEVIATIONS, TABLE_RULES
 
-LOGGING = False  # Set to False to disable logging to CSV files
+LOGGING = False  # Set to True to log every round to a simulation log in SimulationLogs
+SEED = 0          # Evaluation seed; the same seed replays the same games
+NUM_WORKERS = None  # Evaluation processes; None uses every CPU core
 
 class Player:
     """Represents a player in the game."""
-    def __init__(self, name="Player", policy_net=None):
+    def __init__(self, name="Player", policy_net=None, seed=None):
         self.name = name
         self.policy_net = policy_net
+        self.policy = InferencePolicy(policy_net) if policy_net is not None else None
+        self.rng = np.random.default_rng(seed)
 
     def make_bet_decision(self, state):
         """Makes a bet decision using the policy network based on current state."""
-        state = torch.from_numpy(state).float().to(device)
-        with torch.no_grad():
-            action_probs = self.policy_net(state)
-        m = torch.distributions.Categorical(action_probs)
-        action = m.sample().item()  # action in [0..9]
-        return action  # 0->bet=1 unit, 9->bet=10 units
-
-def save_shoe_state(env, game_number, round_number):
-    """Saves the current shoe (remaining cards) to a CSV file."""
-    if not LOGGING:
-        return
-    # File name for the shoe state at the start of this round
-    shoe_filename = f"SimulationLogs/game_{game_number}_round_{round_number}_shoe.csv"
-    with open(shoe_filename, mode='w', newline='', encoding='utf-8') as shoe_file:
-        writer = csv.writer(shoe_file)
-        writer.writerow(["Card"])
-        for card in env.deck.cards:
-            writer.writerow([str(card)])
+        action = int(self.policy.sample(state, self.rng.random()))  # action in [0..4]
+        return action  # 0->bet=1 unit, 4->bet=5 units
+
+def play_logged_games(player, num_games, rounds_per_game, log_path, seed=None):
+    """Plays the games one round at a time, streaming every round and shoe into one simulation log."""
+    env = BlackjackEnv(seed=seed, count_systems=COUNT_SYSTEMS, deviations=PLAY_DEVIATIONS,
+                       rules=TABLE_RULES)
+    game_profits = []
+
+    with SimulationLogWriter(log_path) as log:
+        for game in range(num_games):
+            total_profit = 0
+
+            for round_num in range(rounds_per_game):
+                # Reset the environment for a new round
+                state = env.reset()
+
+                # Record the current shoe before making a decision
+                log.log_shoe(env.deck)
+
+                # The agent decides how much to bet based on the current state
+                bet_action = player.make_bet_decision(state)
+                bet = bet_action + 1
+
+                # Step through the environment
+                next_state, reward, done, info = env.step(bet_action)
+                total_profit += reward
+
+                log.log_round(game+1, round_num+1, bet, reward, env)
+
+            game_profits.append(total_profit)
+
+    return game_profits
 
 def main():
     # Ensure SimulationLogs directory exists if logging is active
     if LOGGING and not os.path.exists('SimulationLogs'):
         os.makedirs('SimulationLogs')
 
-    # Load the trained policy network
-    policy_net = PolicyNetwork(state_size, action_size, hidden_size).to(device)
-    policy_net.load_state_dict(torch.load('betting_policy_net.pth', map_location=device))
-    policy_net.eval()
-
-    env = BlackjackEnv(num_decks=8)
-    player = Player(policy_net=policy_net)
+    # Load the best registered policy network trained with these settings, or betting_policy_net.pth without one
+    model_path = best_model_path(feature_spec(STATE_SIZE, COUNT_SYSTEMS, PLAY_DEVIATIONS, TABLE_RULES))
+    print(f"Evaluating {model_path}")
+    policy_net = load_policy(model_path, DEVICE)
 
     num_games = 1000       # Number of separate "games" (sessions)
     rounds_per_game = 250  # Rounds per game session
-    game_profits = []
 
-    for game in range(num_games):
-        total_profit = 0
-
-        # Only open a CSV log if LOGGING is True
-        if LOGGING:
-            log_filename = f"SimulationLogs/game_{game+1}.csv"
-            logfile = open(log_filename, mode='w', newline='', encoding='utf-8')
-            writer = csv.writer(logfile)
-            # Write header row
-            writer.writerow([
-                "Game", "Round", "Bet", "Reward", 
-                "PlayerCards", "PlayerValue",
-                "DealerCards", "DealerValue", 
-                "TrueCount", "Outcome"
-            ])
-
-        for round_num in range(rounds_per_game):
-            # Reset the environment for a new round
-            state = env.reset()
-
-            # Save the current shoe before making a decision if logging is active
-            save_shoe_state(env, game+1, round_num+1)
-
-            # The agent decides how much to bet based on the current state
-            bet_action = player.make_bet_decision(state)
-            bet = bet_action + 1
-
-            # Step through the environment
-            next_state, reward, done, info = env.step(bet_action)
-            total_profit += reward
-
-            # Gather details after the round finishes
-            player_cards = [str(card) for card in env.player_hands[0].cards]
-            dealer_cards = [str(card) for card in env.dealer_hand.cards]
-            player_value = env.player_hands[0].value
-            dealer_value = env.dealer_hand.value
-
-            # Determine outcome from reward
-            if reward > 0:
-                outcome = "Win"
-            elif reward < 0:
-                outcome = "Loss"
-            else:
-                outcome = "Push"
-
-            current_true_count = env.true_count
-
-            # Write this round's details to the game's CSV if logging is active
-            if LOGGING:
-                writer.writerow([
-                    game+1, 
-                    round_num+1, 
-                    bet, 
-                    reward,
-                    ";".join(player_cards), 
-                    player_value,
-                    ";".join(dealer_cards), 
-                    dealer_value, 
-                    f"{current_true_count:.2f}",
-                    outcome
-                ])
-
-        if LOGGING:
-            logfile.close()
-
-        game_profits.append(total_profit)
-        
-        if (game + 1) % 100 == 0:
-            # Print results every game
-            print(f"Game {game+1}: Profit/Loss = {total_profit} units")
+    # The parallel evaluator plays the games in batches; per-round logging needs the scalar env
+    if LOGGING:
+        log_path = os.path.join('SimulationLogs', f"simulation_{time.strftime('%Y%m%d_%H%M%S')}.dtlog")
+        shoe_seed, bet_seed = np.random.SeedSequence(SEED).spawn(2)
+        game_profits = play_logged_games(Player(policy_net=policy_net, seed=bet_seed),
+                                         num_games, rounds_per_game, log_path, seed=shoe_seed)
+    else:
+        game_profits = evaluate_policy(policy_net, num_games, rounds_per_game,
+                                       seed=SEED, num_workers=NUM_WORKERS)
+
+    for game in range(99, num_games, 100):
+        # Print results every 100 games
+        print(f"Game {game+1}: Profit/Loss = {game_profits[game]} units")
 
     # After all games, print some statistics
-    average_profit = sum(game_profits) / num_games
-    median_profit = np.median(game_profits)
-    highest_profit = max(game_profits)
-    lowest_profit = min(game_profits)
-    volatility = np.std(game_profits)
+    summary = summarize(game_profits, rounds_per_game)
 
     print("\n--- Summary ---")
-    print(f"Average profit/loss per game: {average_profit:.2f} units")
-    print(f"Median profit: {median_profit:.2f} units")
-    print(f"Highest profit: {highest_profit} units")
-    print(f"Lowest profit: {lowest_profit} units")
-    print(f"Volatility (Std. Dev.): {volatility:.2f} units")
+    print(f"Average profit/loss per game: {summary['mean']:.2f} units "
+          f"(95% CI {summary['ci_low']:.2f} to {summary['ci_high']:.2f})")
+    print(f"Average profit/loss per round: {summary['per_round']:.4f} units")
+    print(f"Median profit: {summary['median']:.2f} units")
+    print(f"Highest profit: {summary['max']} units")
+    print(f"Lowest profit: {summary['min']} units")
+    print(f"Volatility (Std. Dev.): {summary['std']:.2f} units")
     
-    return average_profit  # Return average profit for compatibility with auto_train_and_test
+    return summary['mean']  # Return average profit for compatibility with auto_train_and_test
+
+def compare_models(model_paths, num_games=1000, rounds_per_game=250):
+    """
+    Compares saved betting policies on the same replayed shoes.
+
+    The first model is the reference: every other model is reported with the mean
+    and 95% CI of its per-game profit difference to it, which is far tighter than
+    the difference of two independent evaluations.
+    """
+    replay = ShoeReplay.record(num_games, rounds_per_game, seed=SEED)
+    policies = {path: load_policy(path, DEVICE) for path in model_paths}
+    results = compare_policies(policies, replay)
+
+    print(f"--- {num_games} games of {rounds_per_game} rounds, reference {model_paths[0]} ---")
+    for path, result in results.items():
+        profit, difference = result['profit'], result['difference']
+        print(f"{path}: {profit['mean']:.2f} units/game "
+              f"(95% CI {profit['ci_low']:.2f} to {profit['ci_high']:.2f}), "
+              f"paired difference {difference['mean']:+.2f} "
+              f"(95% CI {difference['ci_low']:+.2f} to {difference['ci_high']:+.2f})")
+    return results
 
 
 # ============================================================
@@ -153,5 +134,9 @@ def main():
 # ============================================================
 
 if __name__ == '__main__':
-    main()
+    # With checkpoint paths as arguments, compare them on common shoes instead
+    if len(sys.argv) > 1:
+        compare_models(sys.argv[1:])
+    else:
+        main()
 
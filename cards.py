@@ -0,0 +1,274 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import numpy as np
+
+# ============================================================
+# Configuration and Constants
+# ============================================================
+
+CARD_VALUES = {
+    '2': 2, '3': 3, '4': 4, '5': 5,
+    '6': 6, '7': 7, '8': 8, '9': 9,
+    '10': 10, 'J': 10, 'Q': 10,
+    'K': 10, 'A': 11
+}
+
+COUNT_VALUES = {
+    '2': 1, '3': 1, '4': 1, '5': 1,
+    '6': 1, '7': 0, '8': 0, '9': 0,
+    '10': -1, 'J': -1, 'Q': -1,
+    'K': -1, 'A': -1
+}
+
+SUITS = ['♠', '♥', '♦', '♣']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10',
+         'J', 'Q', 'K', 'A']
+ACE_RANK = RANKS.index('A')
+RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+
+# Cards are encoded as small integers: code = suit_index * 13 + rank_index.
+# The lookup tuples below map a code straight to its rank index, blackjack
+# value and Hi-Lo count so the hot path never touches Card objects.
+CODE_RANKS = tuple(code % 13 for code in range(52))
+CODE_VALUES = tuple(CARD_VALUES[RANKS[rank]] for rank in CODE_RANKS)
+CODE_COUNTS = tuple(COUNT_VALUES[RANKS[rank]] for rank in CODE_RANKS)
+
+
+# ============================================================
+# Card and Deck Classes
+# ============================================================
+
+class Card:
+    """Represents a single playing card."""
+    def __init__(self, rank, suit):
+        self.rank = rank
+        self.suit = suit
+        self.value = CARD_VALUES[self.rank]
+        # Cards without a known suit (e.g. typed in by hand) encode as the first suit
+        suit_index = SUITS.index(suit) if suit in SUITS else 0
+        self.code = suit_index * 13 + RANKS.index(rank)
+
+    @classmethod
+    def from_code(cls, code):
+        """Materialize a Card from its integer code."""
+        return cls(RANKS[code % 13], SUITS[code // 13])
+
+    def __str__(self):
+        return f"{self.rank}{self.suit}"
+
+
+class Deck:
+    """
+    Represents a shoe containing multiple decks of cards.
+
+    The shoe is stored as a NumPy int8 array of card codes plus a cursor
+    pointing at the next card to deal, so dealing is O(1) and reshuffling
+    is a single in-place permutation. Card objects are only built on demand
+    through the `cards` property.
+    Automatically rebuilds and shuffles when cards run out.
+    """
+    suits = SUITS
+    ranks = RANKS
+
+    def __init__(self, num_decks=8, seed=None):
+        self.num_decks = num_decks
+        self.rng = np.random.default_rng(seed)
+        self.shoe = np.empty(0, dtype=np.int8)
+        self.cursor = 0
+        self.shuffles = 0  # Incremented whenever the card order changes
+        self.build_deck()
+        self.shuffle()
+
+    def __len__(self):
+        """Number of cards left to deal."""
+        return self.shoe.size - self.cursor
+
+    @property
+    def cards(self):
+        """The undealt cards as Card objects, in dealing order."""
+        return [Card.from_code(code) for code in self.shoe[self.cursor:].tolist()]
+
+    @cards.setter
+    def cards(self, cards):
+        self.shoe = np.array([card.code for card in cards], dtype=np.int8)
+        self.cursor = 0
+        self.shuffles += 1
+
+    def build_deck(self):
+        self.shoe = np.tile(np.arange(52, dtype=np.int8), self.num_decks)
+        self.cursor = 0
+
+    def shuffle(self):
+        """Shuffle the undealt part of the shoe in place."""
+        self.rng.shuffle(self.shoe[self.cursor:])
+        self.shuffles += 1
+
+    def reshuffle(self):
+        """Return every card to the shoe and shuffle it."""
+        if self.shoe.size != 52 * self.num_decks:
+            self.build_deck()
+        self.cursor = 0
+        self.rng.shuffle(self.shoe)
+        self.shuffles += 1
+
+    def deal_code(self):
+        """Deal the next card as its integer code."""
+        if self.cursor >= self.shoe.size:
+            self.reshuffle()
+        code = self.shoe.item(self.cursor)
+        self.cursor += 1
+        if self.cursor == self.shoe.size:
+            self.reshuffle()
+        return code
+
+    def deal_card(self):
+        return Card.from_code(self.deal_code())
+
+
+# ============================================================
+# Hand Class
+# ============================================================
+
+class Hand:
+    """Represents a hand of cards held by a player or the dealer."""
+    def __init__(self, is_split_aces=False):
+        self.codes = []
+        self.value = 0
+        self.aces = 0
+        self.doubled = False
+        self.is_split_aces = is_split_aces
+        self.is_split = False
+
+    @property
+    def cards(self):
+        """The hand's cards as Card objects, built on demand for display and logging."""
+        return [Card.from_code(code) for code in self.codes]
+
+    def add_card(self, card):
+        self.add_code(card.code)
+
+    def add_code(self, code):
+        self.codes.append(code)
+        self.value += CODE_VALUES[code]
+        if CODE_RANKS[code] == ACE_RANK:
+            self.aces += 1
+        self.adjust_for_ace()
+
+    def adjust_for_ace(self):
+        """Adjust the value of Aces if the hand is over 21."""
+        while self.value > 21 and self.aces:
+            self.value -= 10
+            self.aces -= 1
+
+    def is_busted(self):
+        return self.value > 21
+
+    def has_blackjack(self):
+        return (self.value == 21 and len(self.codes) == 2 and not self.is_split)
+
+    def is_six_card_charlie(self):
+        return (len(self.codes) == 6 and not self.is_busted())
+
+    def can_double(self):
+        return (len(self.codes) == 2 and not self.is_split_aces)
+
+    def can_split(self):
+        # Split if both cards have the same Blackjack value (no resplitting)
+        return (len(self.codes) == 2 and not self.is_split and
+                CODE_VALUES[self.codes[0]] == CODE_VALUES[self.codes[1]])
+
+    def __str__(self):
+        return ', '.join(str(card) for card in self.cards)
+
+
+# ============================================================
+# Shoe Tracking
+# ============================================================
+
+class ShoeTracker:
+    """
+    Incremental composition of the unseen part of a shoe.
+
+    Every card seen updates the remaining count of its rank, the number of
+    cards seen and the Hi-Lo running count in O(1), so the true count, the
+    decks remaining and the full composition are always exact without
+    rescanning the shoe. Shared by the environments, the advisor and the
+    simulation log.
+    """
+
+    def __init__(self, num_decks=8):
+        self.num_decks = num_decks
+        self.shoe_size = 52 * num_decks
+        self.reset()
+
+    def reset(self):
+        """Starts a new, full shoe."""
+        self.rank_counts = [4 * self.num_decks] * 13  # Unseen cards per rank index
+        self.cards_seen = 0
+        self.running_count = 0
+
+    def observe_code(self, code):
+        """Removes one seen card, given as its integer code."""
+        self.rank_counts[CODE_RANKS[code]] -= 1
+        self.cards_seen += 1
+        self.running_count += CODE_COUNTS[code]
+
+    def observe_rank(self, rank):
+        """Removes one seen card, given as its rank ('2'-'10', 'J', 'Q', 'K', 'A')."""
+        self.observe_code(RANK_INDEX[rank])
+
+    def observe_codes(self, codes):
+        for code in codes:
+            self.observe_code(code)
+
+    @property
+    def remaining(self):
+        """Cards not seen yet."""
+        return self.shoe_size - self.cards_seen
+
+    @property
+    def decks_remaining(self):
+        return self.remaining / 52
+
+    @property
+    def true_count(self):
+        # Decks remaining are floored at one, like the environment's true count
+        return self.running_count / max(1, self.decks_remaining)
+
+    @property
+    def aces_remaining(self):
+        return self.rank_counts[ACE_RANK]
+
+    def system_counts(self, tags):
+        """
+        Running counts of several counting systems at once.
+
+        Args:
+            tags (np.ndarray): (13, systems) tag matrix, see counting.tag_matrix.
+
+        Returns:
+            np.ndarray: One running count per system.
+        """
+        seen = 4 * self.num_decks - np.array(self.rank_counts)
+        return seen @ tags
+
+    def penetration(self):
+        """Fraction of the shoe seen so far."""
+        return self.cards_seen / self.shoe_size
+
+    def composition(self):
+        """
+        The unseen cards per blackjack value, in the EVEngine layout.
+
+        Returns:
+            tuple: 10 counts for values 2-11 (tens, jacks, queens and kings share value 10).
+        """
+        counts = self.rank_counts
+        return tuple(counts[:8]) + (sum(counts[8:12]), counts[ACE_RANK])
@@ -0,0 +1,101 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+from typing import Dict, Sequence
+import numpy as np
+from cards import RANKS, CODE_RANKS, COUNT_VALUES
+
+# ============================================================
+# Counting Systems
+# ============================================================
+#
+# A counting system is a tag vector over the 13 ranks. Because every system is
+# just a vector, any number of them can be kept at once: the running counts of
+# k systems are the seen cards per rank times a (13, k) tag matrix, or, card by
+# card, one row of a (52, k) matrix indexed by the card code.
+
+class CountingSystem:
+    """A card counting system, defined by the tag of every rank."""
+
+    def __init__(self, name: str, tags: Dict[str, float], description: str = ''):
+        """
+        Args:
+            name (str): Registry key.
+            tags (Dict[str, float]): Tag of every rank in RANKS.
+            description (str): One-line description.
+        """
+        self.name = name
+        self.description = description
+        self.tags = np.array([tags[rank] for rank in RANKS], dtype=np.float64)
+
+    @property
+    def balanced(self) -> bool:
+        """A balanced system sums to zero over a deck, so its true count is meaningful."""
+        return bool(np.isclose(4 * self.tags.sum(), 0))
+
+    @property
+    def code_tags(self) -> np.ndarray:
+        """Tags indexed by card code."""
+        return self.tags[list(CODE_RANKS)]
+
+    def __repr__(self):
+        return f"CountingSystem({self.name!r})"
+
+
+def _tags(two, three, four, five, six, seven, eight, nine, ten, ace) -> Dict[str, float]:
+    """Tags by blackjack value, expanded to ranks (10, J, Q and K share the ten tag)."""
+    values = [two, three, four, five, six, seven, eight, nine, ten, ten, ten, ten, ace]
+    return dict(zip(RANKS, values))
+
+
+COUNTING_SYSTEMS: Dict[str, CountingSystem] = {}
+
+
+def register_counting_system(system: CountingSystem) -> CountingSystem:
+    COUNTING_SYSTEMS[system.name] = system
+    return system
+
+
+def get_counting_system(name: str) -> CountingSystem:
+    system = COUNTING_SYSTEMS.get(name)
+    if system is None:
+        raise ValueError(f"Unknown counting system {name!r}; known: {', '.join(COUNTING_SYSTEMS)}")
+    return system
+
+
+register_counting_system(CountingSystem('hi_lo', COUNT_VALUES, "Hi-Lo, the environment's own count"))
+register_counting_system(CountingSystem('ko', _tags(1, 1, 1, 1, 1, 1, 0, 0, -1, -1),
+                                        "Knock-Out, unbalanced (7 counts +1)"))
+register_counting_system(CountingSystem('omega_ii', _tags(1, 1, 2, 2, 2, 1, 0, -1, -2, 0),
+                                        "Omega II, level 2, aces neutral"))
+register_counting_system(CountingSystem('zen', _tags(1, 1, 2, 2, 2, 1, 0, 0, -2, -1),
+                                        "Zen Count, level 2"))
+register_counting_system(CountingSystem('wong_halves', _tags(0.5, 1, 1, 1.5, 1, 0.5, 0, -0.5, -1, -1),
+                                        "Wong Halves, level 3 with half-point tags"))
+register_counting_system(CountingSystem('aces', _tags(*[1 / 13] * 9, -12 / 13),
+                                        "Ace side count: surplus of unseen aces per deck"))
+
+
+def tag_matrix(names: Sequence[str], by_code: bool = False) -> np.ndarray:
+    """
+    The tags of several systems side by side.
+
+    Args:
+        names (Sequence[str]): Registered system names.
+        by_code (bool): Index rows by card code (52 rows) instead of rank (13 rows).
+
+    Returns:
+        np.ndarray: (13, len(names)) or (52, len(names)) float64 tags.
+    """
+    rows = 52 if by_code else 13
+    if not names:
+        return np.zeros((rows, 0), dtype=np.float64)
+    systems = [get_counting_system(name) for name in names]
+    return np.stack([system.code_tags if by_code else system.tags for system in systems], axis=1)
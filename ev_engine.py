@@ -0,0 +1,343 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import numpy as np
+from typing import Sequence, Tuple
+from cards import CODE_VALUES
+from basic_strategy import STAND, DOUBLE, SPLIT, strategy_tables
+from table_rules import DEFAULT_RULES
+
+# ============================================================
+# Compositions
+# ============================================================
+
+# A composition is a tuple of 10 card counts indexed by blackjack value - 2,
+# i.e. (2s, 3s, ..., 9s, ten-valued cards, Aces).
+VALUES = tuple(range(2, 12))
+
+# Dealer outcome slots returned by EVEngine.dealer_probabilities
+DEALER_OUTCOMES = ('17', '18', '19', '20', '21', 'bust', 'blackjack')
+BUST, BLACKJACK = 5, 6
+
+VALUE_TABLE = np.array(CODE_VALUES, dtype=np.int64)
+
+
+def composition_from_codes(codes: Sequence[int]) -> Tuple[int, ...]:
+    """
+    Counts the cards of a sequence of card codes by blackjack value.
+
+    Args:
+        codes (Sequence[int]): Card codes, e.g. the undealt part of `Deck.shoe`.
+
+    Returns:
+        Tuple[int, ...]: The composition as 10 counts for values 2-11.
+    """
+    values = VALUE_TABLE[np.asarray(codes, dtype=np.int64)]
+    return tuple(np.bincount(values - 2, minlength=10).tolist())
+
+
+def full_shoe_composition(num_decks: int = 8) -> Tuple[int, ...]:
+    """Composition of a complete shoe of `num_decks` decks."""
+    return tuple([4 * num_decks] * 8 + [16 * num_decks, 4 * num_decks])
+
+
+def _remove(composition, index):
+    composition = list(composition)
+    composition[index] -= 1
+    return tuple(composition)
+
+
+def _add_card(total, soft, value):
+    """Add a card to a (total, soft) hand, counting one Ace as 11 while it fits."""
+    total += value
+    if value == 11:
+        if soft:
+            total -= 10
+        else:
+            soft = True
+    if total > 21 and soft:
+        total -= 10
+        soft = False
+    return total, soft
+
+
+# ============================================================
+# Expectation Engine
+# ============================================================
+
+class EVEngine:
+    """
+    Exact expected values for one round of Blackjack played by basic strategy.
+
+    The rules are the `TableRules` of `BlackjackEnv`: the dealer has no
+    hole-card peek (a dealer blackjack takes every bet on the table, doubles
+    included) and a pair may be split once; whether the dealer hits soft 17,
+    the blackjack payout, the charlie, split aces and doubling after a split
+    follow the rules given.
+
+    All results are computed by memoized recursion over shoe compositions, so
+    card removal is accounted for exactly. Cards nobody has seen yet (the
+    dealer's hole card, the other hand of a split) are exchangeable with the
+    rest of the shoe, which lets each hand be valued against the composition
+    left after its own cards.
+    """
+
+    def __init__(self, hard_table=None, soft_table=None, pair_table=None, rules=DEFAULT_RULES):
+        """
+        Args:
+            hard_table, soft_table, pair_table (np.ndarray): Strategy played; each defaults
+                to the table of `rules.strategy_dir`.
+            rules (TableRules): Rules of the table.
+        """
+        tables = strategy_tables(rules.strategy_dir)
+        self.hard_table = tables[0] if hard_table is None else hard_table
+        self.soft_table = tables[1] if soft_table is None else soft_table
+        self.pair_table = tables[2] if pair_table is None else pair_table
+        self.rules = rules
+        self._charlie_cards = rules.charlie_limit
+        self._dealer_hits_soft_17 = rules.dealer_hits_soft_17
+        self._dealer_cache = {}
+        self._draw_cache = {}
+        self._play_cache = {}
+
+    def clear_cache(self):
+        """Drop all memoized results."""
+        self._dealer_cache.clear()
+        self._draw_cache.clear()
+        self._play_cache.clear()
+
+    # ------------------------------------------------------------
+    # Dealer
+    # ------------------------------------------------------------
+
+    def dealer_probabilities(self, composition, upcard: int) -> Tuple[float, ...]:
+        """
+        Probabilities of the dealer's final result.
+
+        Args:
+            composition: Unseen cards, including the dealer's hole card.
+            upcard (int): Value of the dealer's upcard (2-11).
+
+        Returns:
+            Tuple[float, ...]: Probabilities ordered as `DEALER_OUTCOMES`.
+        """
+        key = (composition, upcard)
+        result = self._dealer_cache.get(key)
+        if result is None:
+            result = [0.0] * 7
+            remaining = sum(composition)
+            for index, count in enumerate(composition):
+                if not count:
+                    continue
+                p = count / remaining
+                total, soft = _add_card(*_add_card(0, False, upcard), VALUES[index])
+                if total == 21:
+                    result[BLACKJACK] += p
+                    continue
+                drawn = self._dealer_draw(_remove(composition, index), total, soft)
+                for outcome in range(6):
+                    result[outcome] += p * drawn[outcome]
+            result = tuple(result)
+            self._dealer_cache[key] = result
+        return result
+
+    def _dealer_draw(self, composition, total, soft):
+        """Final-result probabilities of a dealer hand that is not a blackjack."""
+        if total > 21:
+            return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+        if total >= 17 and not (total == 17 and soft and self._dealer_hits_soft_17):
+            result = [0.0] * 6
+            result[total - 17] = 1.0
+            return tuple(result)
+
+        key = (composition, total, soft)
+        result = self._draw_cache.get(key)
+        if result is None:
+            result = [0.0] * 6
+            remaining = sum(composition)
+            for index, count in enumerate(composition):
+                if not count:
+                    continue
+                p = count / remaining
+                drawn = self._dealer_draw(_remove(composition, index),
+                                          *_add_card(total, soft, VALUES[index]))
+                for outcome in range(6):
+                    result[outcome] += p * drawn[outcome]
+            result = tuple(result)
+            self._draw_cache[key] = result
+        return result
+
+    # ------------------------------------------------------------
+    # Player
+    # ------------------------------------------------------------
+
+    def stand_ev(self, composition, upcard: int, total: int) -> float:
+        """EV per unit bet of standing on `total` (not a blackjack)."""
+        dealer = self.dealer_probabilities(composition, upcard)
+        ev = dealer[BUST] - dealer[BLACKJACK]
+        for outcome in range(5):
+            dealer_total = 17 + outcome
+            if total > dealer_total:
+                ev += dealer[outcome]
+            elif total < dealer_total:
+                ev -= dealer[outcome]
+        return ev
+
+    def _play_ev(self, composition, upcard, total, soft, num_cards, split_aces, split=False):
+        """EV per unit bet of a non-pair hand played out by the strategy tables."""
+        if total > 21:
+            return -1.0
+        if num_cards == self._charlie_cards:
+            return 1.0  # Charlie
+        if split_aces:
+            return self.stand_ev(composition, upcard, total)
+
+        # A split hand only differs from any other hand when it may not double
+        no_double = split and not self.rules.double_after_split
+        key = (composition, upcard, total, soft, num_cards, no_double)
+        ev = self._play_cache.get(key)
+        if ev is not None:
+            return ev
+
+        if soft:
+            action = self.soft_table.item(min(total, 20), upcard)
+        else:
+            action = self.hard_table.item(min(total, 21), upcard)
+
+        if action == STAND:
+            ev = self.stand_ev(composition, upcard, total)
+        else:
+            double = action == DOUBLE and num_cards == 2 and not no_double
+            ev = 0.0
+            remaining = sum(composition)
+            for index, count in enumerate(composition):
+                if not count:
+                    continue
+                p = count / remaining
+                next_composition = _remove(composition, index)
+                next_total, next_soft = _add_card(total, soft, VALUES[index])
+                if double:
+                    if next_total > 21:
+                        ev -= 2 * p
+                    elif num_cards + 1 == self._charlie_cards:
+                        ev += 2 * p
+                    else:
+                        ev += 2 * p * self.stand_ev(next_composition, upcard, next_total)
+                else:
+                    ev += p * self._play_ev(next_composition, upcard, next_total,
+                                            next_soft, num_cards + 1, False, split)
+        self._play_cache[key] = ev
+        return ev
+
+    def hand_ev(self, composition, first: int, second: int, upcard: int) -> float:
+        """
+        EV per unit bet of a starting hand played by basic strategy.
+
+        Args:
+            composition: Unseen cards, i.e. the shoe without the player's two
+                cards and the dealer's upcard (the hole card is still included).
+            first (int): Value of the player's first card (2-11).
+            second (int): Value of the player's second card (2-11).
+            upcard (int): Value of the dealer's upcard (2-11).
+
+        Returns:
+            float: Expected reward for a bet of one unit.
+        """
+        total, soft = _add_card(*_add_card(0, False, first), second)
+
+        if total == 21:
+            # Player blackjack pays the payout unless the dealer has one too
+            return self.rules.blackjack_payout * (
+                1 - self.dealer_probabilities(composition, upcard)[BLACKJACK])
+
+        if first == second:
+            action = self.pair_table.item(first, upcard)
+            if action == SPLIT:
+                return 2 * self._split_hand_ev(composition, first, upcard)
+            if action == STAND:
+                return self.stand_ev(composition, upcard, total)
+            if action == DOUBLE:
+                ev = 0.0
+                remaining = sum(composition)
+                for index, count in enumerate(composition):
+                    if not count:
+                        continue
+                    next_total, _ = _add_card(total, soft, VALUES[index])
+                    if next_total > 21:
+                        ev -= 2 * count / remaining
+                    elif self._charlie_cards == 3:
+                        ev += 2 * count / remaining
+                    else:
+                        ev += 2 * count / remaining * self.stand_ev(
+                            _remove(composition, index), upcard, next_total)
+                return ev
+            # Hitting a pair: the next decision is no longer a pair decision
+            ev = 0.0
+            remaining = sum(composition)
+            for index, count in enumerate(composition):
+                if not count:
+                    continue
+                next_total, next_soft = _add_card(total, soft, VALUES[index])
+                ev += count / remaining * self._play_ev(
+                    _remove(composition, index), upcard, next_total, next_soft, 3, False)
+            return ev
+
+        return self._play_ev(composition, upcard, total, soft, 2, False)
+
+    def _split_hand_ev(self, composition, pair_value, upcard):
+        """EV of one hand of a split; both hands are exchangeable, so the split is worth twice this."""
+        ev = 0.0
+        remaining = sum(composition)
+        split_aces = pair_value == 11 and self.rules.split_aces_one_card
+        for index, count in enumerate(composition):
+            if not count:
+                continue
+            total, soft = _add_card(*_add_card(0, False, pair_value), VALUES[index])
+            ev += count / remaining * self._play_ev(
+                _remove(composition, index), upcard, total, soft, 2, split_aces, True)
+        return ev
+
+    # ------------------------------------------------------------
+    # Round
+    # ------------------------------------------------------------
+
+    def upcard_ev(self, composition, upcard: int) -> float:
+        """
+        EV per unit bet of a round once the dealer's upcard is known.
+
+        Args:
+            composition: Unseen cards, i.e. the shoe without the dealer's upcard.
+            upcard (int): Value of the dealer's upcard (2-11).
+
+        Returns:
+            float: Expected reward for a bet of one unit.
+        """
+        ev = 0.0
+        remaining = sum(composition)
+        for i, count_i in enumerate(composition):
+            if not count_i:
+                continue
+            after_first = _remove(composition, i)
+            for j in range(i, 10):
+                count_j = after_first[j]
+                if not count_j:
+                    continue
+                # Both orders of two different cards have the same value
+                p = count_i / remaining * count_j / (remaining - 1) * (1 if i == j else 2)
+                ev += p * self.hand_ev(_remove(after_first, j), VALUES[i], VALUES[j], upcard)
+        return ev
+
+    def round_ev(self, composition) -> float:
+        """EV per unit bet of a round dealt from `composition`, before any card is seen."""
+        ev = 0.0
+        remaining = sum(composition)
+        for index, count in enumerate(composition):
+            if count:
+                ev += count / remaining * self.upcard_ev(_remove(composition, index), VALUES[index])
+        return ev
@@ -0,0 +1,324 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+import torch
+from vector_env import VectorBlackjackEnv
+from inference import InferencePolicy, sample_actions
+
+# ============================================================
+# Configuration
+# ============================================================
+
+BLOCK_SIZE = 50  # Games evaluated together in one batch; fixed so results do not depend on the worker count
+Z_95 = 1.959964  # Two-sided 95% normal quantile
+
+# ============================================================
+# Game Blocks
+# ============================================================
+
+def game_seeds(seed: int, num_games: int) -> List[np.random.SeedSequence]:
+    """One independent seed sequence per game, derived only from `seed` and the game index."""
+    return np.random.SeedSequence(seed).spawn(num_games)
+
+
+def game_streams(seeds, rounds_per_game: int, rules=None):
+    """
+    The tables and bet uniforms of a set of games, dealt under `rules`
+    (agent.TABLE_RULES when None).
+
+    Each game seed spawns a shoe stream and a bet stream, so a game deals the
+    same cards and draws the same uniforms whichever policy plays it.
+
+    Returns:
+        Tuple[VectorBlackjackEnv, np.ndarray]: One table per game, and a
+        (games, rounds_per_game) array of uniforms used to sample the bets.
+    """
+    # The tables produce the same features and play the same strategy the policies are trained on
+    from agent import COUNT_SYSTEMS, PLAY_DEVIATIONS, TABLE_RULES
+
+    shoe_seeds, bet_seeds = zip(*(game_seed.spawn(2) for game_seed in seeds))
+    env = VectorBlackjackEnv(num_envs=len(seeds), seed=list(shoe_seeds), count_systems=COUNT_SYSTEMS,
+                             deviations=PLAY_DEVIATIONS, rules=rules or TABLE_RULES)
+    uniforms = np.stack([np.random.default_rng(bet_seed).random(rounds_per_game)
+                         for bet_seed in bet_seeds])
+    return env, uniforms
+
+
+def play_block(policy_net, seeds, rounds_per_game: int, rules=None) -> np.ndarray:
+    """
+    Plays one block of games in lockstep, one table per game.
+
+    Args:
+        policy_net (PolicyNetwork): Policy used to choose the bets.
+        seeds (List[np.random.SeedSequence]): Seed of every game in the block.
+        rounds_per_game (int): Rounds played per game.
+        rules (TableRules): Rules of the tables; agent.TABLE_RULES when None.
+
+    Returns:
+        np.ndarray: Profit of every game in the block.
+    """
+    env, uniforms = game_streams(seeds, rounds_per_game, rules)
+    policy = InferencePolicy(policy_net)
+    profits = np.zeros(len(seeds))
+
+    for round_num in range(rounds_per_game):
+        states = env.reset()
+        bet_actions = policy.sample(states, uniforms[:, round_num])
+        next_states, rewards, dones, infos = env.step(bet_actions)
+        profits += rewards
+
+    return profits
+
+
+_worker_policy = None
+
+
+def _init_worker(state_dict):
+    """Loads the evaluated policy once per worker process."""
+    global _worker_policy
+
+    torch.set_num_threads(1)
+    _worker_policy = policy_from_state_dict(state_dict)
+
+
+def _play_worker_block(seeds, rounds_per_game, rules):
+    return play_block(_worker_policy, seeds, rounds_per_game, rules)
+
+# ============================================================
+# Evaluation
+# ============================================================
+
+def summarize(game_profits, rounds_per_game: int) -> Dict[str, float]:
+    """
+    Summary statistics of a set of game profits.
+
+    Returns:
+        Dict[str, float]: mean, median, min, max and std of the profit per game,
+        a 95% confidence interval for the mean, and the mean profit per round.
+    """
+    profits = np.asarray(game_profits, dtype=np.float64)
+    mean = profits.mean()
+    std = profits.std()
+    half_width = Z_95 * profits.std(ddof=1) / np.sqrt(profits.size) if profits.size > 1 else 0.0
+    return {
+        'games': int(profits.size),
+        'mean': float(mean),
+        'median': float(np.median(profits)),
+        'min': float(profits.min()),
+        'max': float(profits.max()),
+        'std': float(std),
+        'ci_low': float(mean - half_width),
+        'ci_high': float(mean + half_width),
+        'per_round': float(mean / rounds_per_game),
+    }
+
+
+def evaluate_policy(policy_net, num_games: int = 1000, rounds_per_game: int = 250,
+                    seed: int = 0, num_workers: int = None, rules=None) -> np.ndarray:
+    """
+    Evaluates a betting policy over many independent games, in parallel.
+
+    Games are grouped into blocks of BLOCK_SIZE and the blocks are spread over a
+    process pool. Every game draws its shoe and its bets from its own seed, and the
+    blocks never change, so the profits are identical for any number of workers.
+
+    Args:
+        policy_net (PolicyNetwork): Policy to evaluate.
+        num_games (int): Number of separate games (sessions).
+        rounds_per_game (int): Rounds per game.
+        seed (int): Seed of the whole evaluation.
+        num_workers (int): Worker processes; defaults to the CPU count, 0 or 1 runs in-process.
+        rules (TableRules): Rules of the tables; agent.TABLE_RULES when None.
+
+    Returns:
+        np.ndarray: Profit of every game, in game order.
+    """
+    seeds = game_seeds(seed, num_games)
+    blocks = [seeds[start:start + BLOCK_SIZE] for start in range(0, num_games, BLOCK_SIZE)]
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(blocks))
+
+    if num_workers <= 1:
+        profits = [play_block(policy_net, block, rounds_per_game, rules) for block in blocks]
+    else:
+        state_dict = {key: value.cpu() for key, value in policy_net.state_dict().items()}
+        with ProcessPoolExecutor(max_workers=num_workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(state_dict,)) as executor:
+            profits = list(executor.map(_play_worker_block, blocks,
+                                        [rounds_per_game] * len(blocks),
+                                        [rules] * len(blocks)))
+
+    return np.concatenate(profits)
+
+
+def evaluate_rule_sets(policy_net, rule_sets=None, num_games: int = 1000, rounds_per_game: int = 250,
+                       seed: int = 0, num_workers: int = None) -> Dict[str, Dict[str, float]]:
+    """
+    Evaluates one betting policy under several rule sets.
+
+    Every rule set plays the games of the same seeds, so rule sets with the same
+    number of decks are dealt the same shoes and their differences are not
+    blurred by shoe-to-shoe noise.
+
+    Args:
+        policy_net (PolicyNetwork): Policy to evaluate.
+        rule_sets (Dict[str, TableRules]): Rule sets by name; table_rules.RULE_SETS when None.
+        num_games, rounds_per_game, seed, num_workers: As for `evaluate_policy`.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The `summarize` of the profits under every rule set.
+    """
+    if rule_sets is None:
+        from table_rules import RULE_SETS as rule_sets
+    return {name: summarize(evaluate_policy(policy_net, num_games, rounds_per_game, seed,
+                                            num_workers, rules), rounds_per_game)
+            for name, rules in rule_sets.items()}
+
+# ============================================================
+# Common Random Numbers
+# ============================================================
+#
+# The bet never changes how a round is played, so the cards, the states the
+# policy sees and the reward per unit bet of every round are fixed by the shoe
+# alone. A ShoeReplay records them once; replaying it costs a single batched
+# forward pass per policy, and every policy is scored on identical rounds, so
+# paired differences between policies are free of shoe-to-shoe noise.
+
+class ShoeReplay:
+    """
+    Pre-dealt games that can be replayed for any number of betting policies.
+
+    Attributes:
+        states (np.ndarray): (games, rounds, state_size) observations before each bet.
+        unit_rewards (np.ndarray): (games, rounds) reward of each round for a bet of one unit.
+        uniforms (np.ndarray): (games, rounds) uniforms used to sample the bets.
+    """
+
+    def __init__(self, states, unit_rewards, uniforms):
+        self.states = states
+        self.unit_rewards = unit_rewards
+        self.uniforms = uniforms
+
+    @property
+    def num_games(self) -> int:
+        return self.unit_rewards.shape[0]
+
+    @property
+    def rounds_per_game(self) -> int:
+        return self.unit_rewards.shape[1]
+
+    @classmethod
+    def record(cls, num_games: int = 1000, rounds_per_game: int = 250, seed: int = 0,
+               rules=None) -> 'ShoeReplay':
+        """
+        Deals the games of an evaluation with the given seed, with unit bets.
+
+        Replaying a policy gives the same profits as `evaluate_policy` with the same seed.
+        """
+        env, uniforms = game_streams(game_seeds(seed, num_games), rounds_per_game, rules)
+        states = np.zeros((num_games, rounds_per_game, env.single_observation_space.shape[0]),
+                          dtype=np.float32)
+        unit_rewards = np.zeros((num_games, rounds_per_game), dtype=np.float32)
+        unit_bets = np.zeros(num_games, dtype=np.int64)
+
+        for round_num in range(rounds_per_game):
+            states[:, round_num] = env.reset()
+            next_states, rewards, dones, infos = env.step(unit_bets)
+            unit_rewards[:, round_num] = rewards
+
+        return cls(states, unit_rewards, uniforms)
+
+    def save(self, path: str) -> None:
+        """
+        Stores the replay compressed; rewards are kept as int8 half units when the
+        payouts allow it (a 6:5 blackjack does not) and as float32 otherwise.
+        """
+        half_rewards = self.unit_rewards * 2
+        if np.array_equal(half_rewards, np.round(half_rewards)):
+            rewards = {'half_rewards': half_rewards.astype(np.int8)}
+        else:
+            rewards = {'unit_rewards': self.unit_rewards}
+        np.savez_compressed(path, states=self.states, uniforms=self.uniforms, **rewards)
+
+    @classmethod
+    def load(cls, path: str) -> 'ShoeReplay':
+        with np.load(path) as data:
+            if 'unit_rewards' in data:
+                unit_rewards = data['unit_rewards']
+            else:
+                unit_rewards = data['half_rewards'].astype(np.float32) / 2
+            return cls(data['states'], unit_rewards, data['uniforms'])
+
+
+def replay_policy(policy_net, replay: ShoeReplay) -> np.ndarray:
+    """
+    Profit of every game of a replay when bet by `policy_net`.
+
+    Returns:
+        np.ndarray: Profit of every game, in game order.
+    """
+    states = replay.states.reshape(-1, replay.states.shape[-1])
+    actions = InferencePolicy(policy_net).sample(states, replay.uniforms.reshape(-1))
+    bets = actions.reshape(replay.unit_rewards.shape) + 1
+    return (bets * replay.unit_rewards.astype(np.float64)).sum(axis=1)
+
+
+def compare_policies(policies, replay: ShoeReplay) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Scores several betting policies on the same replayed games.
+
+    Args:
+        policies (Dict[str, PolicyNetwork]): Policies by name; the first is the reference.
+        replay (ShoeReplay): Games every policy is replayed on.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: For every policy, the `summarize` of its
+        profits ('profit') and of its paired per-game differences to the reference
+        ('difference').
+    """
+    results = {}
+    reference = None
+    for name, policy_net in policies.items():
+        profits = replay_policy(policy_net, replay)
+        if reference is None:
+            reference = profits
+        results[name] = {
+            'profit': summarize(profits, replay.rounds_per_game),
+            'difference': summarize(profits - reference, replay.rounds_per_game),
+        }
+    return results
+
+
+def load_policy(path: str, device=None):
+    """
+    Loads a saved PolicyNetwork, taking its layer sizes from the checkpoint.
+
+    The file is memory-mapped rather than read and unpickled in full, and only
+    the tensors are copied into the network.
+    """
+    state_dict = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    return policy_from_state_dict(state_dict, device)
+
+
+def policy_from_state_dict(state_dict, device=None):
+    """An evaluation-mode PolicyNetwork with the layer sizes and weights of a state dict."""
+    from agent import PolicyNetwork
+
+    hidden_size, state_size = state_dict['fc1.weight'].shape
+    action_size = state_dict['action_head.weight'].shape[0]
+    policy_net = PolicyNetwork(state_size, action_size, hidden_size)
+    policy_net.load_state_dict(state_dict)
+    policy_net.to(device or 'cpu').eval()
+    return policy_net
@@ -0,0 +1,382 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import argparse
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Optional, Sequence
+from table_rules import TableRules, DEFAULT_RULES, RULE_SETS
+
+# ============================================================
+# Configuration
+# ============================================================
+
+REGISTRY_DIR = 'Models'
+INDEX_FILE = 'index.json'
+DEFAULT_MODEL_PATH = 'betting_policy_net.pth'  # Used when the registry holds no suitable model
+
+# Fixed evaluation of registered models, so their scores are comparable
+EVAL_GAMES = 1000
+EVAL_ROUNDS = 250
+EVAL_SEED = 0
+
+# ============================================================
+# Layout
+# ============================================================
+#
+# Every model is a weights file (a PolicyNetwork state dict) with a JSON sidecar,
+# <name>.json, holding its architecture, training config, table rules, seed,
+# evaluation and timings, and the count systems and deviations it was trained
+# with. These, with the state size and the rules, are the model's feature spec:
+# what its observations mean (see `feature_spec`). Only models of the same spec
+# are interchangeable. index.json summarizes the sidecars: per name the files,
+# the architecture, the feature key and the score (evaluation profit per round),
+# and per feature key the name of the best-scoring model. Looking up a model, or
+# the best one, reads that one small file and never a sidecar or the weights.
+# The sidecars are authoritative; `rebuild_index` regenerates the index.
+
+# ============================================================
+# Feature Specs
+# ============================================================
+
+def feature_spec(state_size: int, count_systems: Sequence[str] = (), deviations: bool = False,
+                 rules: TableRules = DEFAULT_RULES) -> Dict[str, object]:
+    """
+    What the observations of a network mean.
+
+    Args:
+        state_size (int): Observation size.
+        count_systems (Sequence[str]): Extra counting systems appended to the Hi-Lo state.
+        deviations (bool): Whether the index plays were played instead of basic strategy.
+        rules (TableRules): Table rules, as a dataclass or a dict.
+    """
+    return {'state_size': int(state_size), 'count_systems': list(count_systems), 'deviations': bool(deviations),
+            'rules': asdict(rules) if is_dataclass(rules) else dict(rules)}
+
+
+def feature_key(features: Dict[str, object]) -> str:
+    """The index key of a feature spec."""
+    return json.dumps(features, sort_keys=True, separators=(',', ':'))
+
+
+def _metadata_features(metadata):
+    # None for sidecars that do not record what the observations meant
+    if metadata.get('rules') is None or 'count_systems' not in metadata:
+        return None
+    return feature_spec(metadata['architecture']['state_size'], metadata['count_systems'],
+                        metadata.get('deviations', False), metadata['rules'])
+
+# ============================================================
+# Registry
+# ============================================================
+
+class ModelRegistry:
+    """
+    A directory of saved betting policies with their metadata.
+
+    Only registering, evaluating and loading a model import torch, so tools
+    can query the registry at startup without paying for it.
+    """
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        """
+        Args:
+            root (str): Directory of the weights, the sidecars and the index.
+        """
+        self.root = root
+        self._index = None
+
+    @property
+    def index(self) -> Dict[str, Dict]:
+        """The index, read once from disk: {'models': {name: entry}, 'best': {feature key: name}}."""
+        if self._index is None:
+            path = os.path.join(self.root, INDEX_FILE)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as index_file:
+                    self._index = json.load(index_file)
+            else:
+                self._index = {'models': {}, 'best': {}}
+        return self._index
+
+    # ------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------
+
+    def names(self) -> List[str]:
+        return sorted(self.index['models'])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index['models']
+
+    def entry(self, name: str) -> Dict[str, object]:
+        """The index entry of a model: files, architecture, feature key and score."""
+        try:
+            return self.index['models'][name]
+        except KeyError:
+            raise ValueError(f"No model named {name} in {self.root}") from None
+
+    def weights_path(self, name: str) -> str:
+        return os.path.join(self.root, self.entry(name)['weights'])
+
+    def metadata(self, name: str) -> Dict[str, object]:
+        """The full sidecar of a model."""
+        with open(os.path.join(self.root, self.entry(name)['metadata']), encoding='utf-8') as sidecar:
+            return json.load(sidecar)
+
+    def features(self, name: str) -> Optional[Dict[str, object]]:
+        """The feature spec of a model, or None if its sidecar does not record it."""
+        return _metadata_features(self.metadata(name))
+
+    def best(self, features: Dict[str, object] = None) -> Optional[str]:
+        """
+        The best-scoring evaluated model, or None if none is evaluated.
+
+        Args:
+            features (Dict): Only consider models of this feature spec (see `feature_spec`);
+                None considers every model.
+        """
+        best = self.index['best']
+        if features is not None:
+            return best.get(feature_key(features))
+        return max(best.values(), key=lambda name: self.entry(name)['score'], default=None)
+
+    # ------------------------------------------------------------
+    # Registering
+    # ------------------------------------------------------------
+
+    def register(self, policy, name: str = None, config=None, rules=None, evaluation: Dict = None,
+                 timings: Dict = None, notes: str = None, count_systems: Sequence[str] = None,
+                 deviations: bool = None) -> str:
+        """
+        Adds a model, or replaces the model of the same name.
+
+        Args:
+            policy: A PolicyNetwork, its state dict, or the path of a saved state dict.
+                A file inside the registry directory is kept in place; anything
+                else is saved, or copied, to <name>.pth.
+            name (str): Name of the model; defaults to the registration time.
+            config (TrainingConfig): Training settings, as a dataclass or a dict.
+            rules (TableRules): Table rules trained on; defaults to those of `config`.
+            evaluation (Dict): Evaluation summary (see evaluation.summarize), with the
+                'seed' and 'rounds' it was played with.
+            timings (Dict): E.g. the training 'wall_time' and 'episodes'.
+            notes (str): Free text.
+            count_systems (Sequence[str]): Extra counting systems of the observations;
+                agent.COUNT_SYSTEMS when None.
+            deviations (bool): Whether index plays were played; agent.PLAY_DEVIATIONS when None.
+
+        Returns:
+            str: The name of the model.
+        """
+        import torch
+        from agent import COUNT_SYSTEMS, PLAY_DEVIATIONS
+
+        os.makedirs(self.root, exist_ok=True)
+        registered = time.strftime('%Y-%m-%dT%H:%M:%S')
+        name = name or time.strftime('model_%Y%m%d_%H%M%S')
+
+        if isinstance(policy, str):
+            if os.path.dirname(os.path.abspath(policy)) == os.path.abspath(self.root):
+                weights = os.path.basename(policy)
+            else:
+                weights = f"{name}.pth"
+                shutil.copyfile(policy, os.path.join(self.root, weights))
+            state_dict = torch.load(os.path.join(self.root, weights), map_location='cpu', mmap=True)
+        else:
+            state_dict = policy.state_dict() if hasattr(policy, 'state_dict') else policy
+            weights = f"{name}.pth"
+            torch.save({key: value.cpu() for key, value in state_dict.items()},
+                       os.path.join(self.root, weights))
+
+        hidden_size, state_size = state_dict['fc1.weight'].shape
+        config = asdict(config) if is_dataclass(config) else config
+        if rules is None and config is not None:
+            rules = config.get('table_rules')
+        count_systems = COUNT_SYSTEMS if count_systems is None else count_systems
+        deviations = PLAY_DEVIATIONS if deviations is None else deviations
+        metadata = {
+            'name': name,
+            'weights': weights,
+            'registered': registered,
+            'architecture': {'state_size': int(state_size), 'hidden_size': int(hidden_size),
+                             'action_size': int(state_dict['action_head.weight'].shape[0])},
+            'config': config,
+            'rules': asdict(rules) if is_dataclass(rules) else rules,
+            'count_systems': list(count_systems),
+            'deviations': bool(deviations),
+            'seed': config.get('seed') if config is not None else None,
+            'evaluation': evaluation,
+            'timings': timings,
+            'notes': notes,
+        }
+        self._write_json(f"{name}.json", metadata)
+        self.index['models'][name] = self._entry(metadata, f"{name}.json")
+        self._write_index()
+        return name
+
+    def set_evaluation(self, name: str, evaluation: Dict) -> None:
+        """Stores the evaluation of a registered model and updates the best models."""
+        metadata = self.metadata(name)
+        metadata['evaluation'] = evaluation
+        self._write_json(self.entry(name)['metadata'], metadata)
+        self.index['models'][name] = self._entry(metadata, self.entry(name)['metadata'])
+        self._write_index()
+
+    def evaluate(self, name: str, num_games: int = EVAL_GAMES, rounds_per_game: int = EVAL_ROUNDS,
+                 seed: int = EVAL_SEED, num_workers: int = None) -> Dict[str, float]:
+        """
+        Evaluates a registered model on the fixed evaluation games and stores the result.
+
+        The games are played under the table rules of the model's sidecar. The
+        evaluation observes and plays with the count systems and deviations of
+        agent.py, so a model recorded with others, or with no rules at all, is
+        refused rather than scored on observations it was not trained on.
+        """
+        from agent import COUNT_SYSTEMS, PLAY_DEVIATIONS
+        from evaluation import evaluate_policy, summarize
+
+        features = self.features(name)
+        if features is None:
+            raise ValueError(f"{name} records no table rules or count systems; register it with them first")
+        current = feature_spec(features['state_size'], COUNT_SYSTEMS, PLAY_DEVIATIONS, features['rules'])
+        if features != current:
+            raise ValueError(f"{name} was trained with count systems {features['count_systems']} and "
+                             f"deviations {features['deviations']}, but agent.py plays {list(COUNT_SYSTEMS)} "
+                             f"and {bool(PLAY_DEVIATIONS)}")
+        profits = evaluate_policy(self.load(name), num_games, rounds_per_game, seed=seed,
+                                  num_workers=num_workers, rules=TableRules(**features['rules']))
+        evaluation = dict(summarize(profits, rounds_per_game), rounds=rounds_per_game, seed=seed)
+        self.set_evaluation(name, evaluation)
+        return evaluation
+
+    def rebuild_index(self) -> None:
+        """Regenerates the index from the sidecars in the registry directory."""
+        self._index = {'models': {}, 'best': {}}
+        for file_name in sorted(os.listdir(self.root)):
+            if file_name.endswith('.json') and file_name != INDEX_FILE:
+                with open(os.path.join(self.root, file_name), encoding='utf-8') as sidecar:
+                    metadata = json.load(sidecar)
+                self._index['models'][metadata['name']] = self._entry(metadata, file_name)
+        self._write_index()
+
+    # ------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------
+
+    def load(self, name: str = None, device=None, features: Dict[str, object] = None):
+        """
+        Loads a registered model as an evaluation-mode PolicyNetwork.
+
+        Args:
+            name (str): Model to load; defaults to the best one (see `best`).
+            device: Device of the network; the CPU when None.
+            features (Dict): Feature spec the best model must have.
+        """
+        from evaluation import load_policy
+
+        name = name or self.best(features)
+        if name is None:
+            raise ValueError(f"No evaluated model in {self.root}")
+        return load_policy(self.weights_path(name), device)
+
+    # ------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _entry(metadata, sidecar):
+        evaluation = metadata.get('evaluation')
+        features = _metadata_features(metadata)
+        return dict(metadata['architecture'], weights=metadata['weights'], metadata=sidecar,
+                    features=feature_key(features) if features is not None else None,
+                    score=evaluation['per_round'] if evaluation else None,
+                    registered=metadata['registered'])
+
+    def _write_index(self):
+        # A model whose feature spec is unknown is never the best of any spec
+        best = {}
+        for name, entry in sorted(self.index['models'].items()):
+            if entry['score'] is None or entry.get('features') is None:
+                continue
+            key = entry['features']
+            if key not in best or entry['score'] > self.index['models'][best[key]]['score']:
+                best[key] = name
+        self.index['best'] = best
+        self._write_json(INDEX_FILE, self.index)
+
+    def _write_json(self, file_name, data):
+        # Written to a temporary file first, so a reader never sees half a file
+        path = os.path.join(self.root, file_name)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file, indent=2)
+            json_file.write('\n')
+        os.replace(f"{path}.tmp", path)
+
+
+def best_model_path(features: Dict[str, object] = None, root: str = REGISTRY_DIR,
+                    default: str = DEFAULT_MODEL_PATH) -> str:
+    """The weights of the best registered model of the feature spec `features`, else `default`."""
+    registry = ModelRegistry(root)
+    name = registry.best(features)
+    return registry.weights_path(name) if name is not None else default
+
+# ============================================================
+# Entry Point
+# ============================================================
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="List, add and evaluate registered betting policies.")
+    parser.add_argument('--root', default=REGISTRY_DIR, help="Registry directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Registered models, best first")
+    best_parser = commands.add_parser('best', help="Print the weights of the best model for the default rules")
+    best_parser.add_argument('--count-systems', nargs='*', default=[],
+                             help="Extra counting systems of the observations (default: Hi-Lo only)")
+    best_parser.add_argument('--deviations', action='store_true', help="Trained playing the index plays")
+    add_parser = commands.add_parser('add', help="Register a saved state dict")
+    add_parser.add_argument('path')
+    add_parser.add_argument('--name')
+    add_parser.add_argument('--notes')
+    add_parser.add_argument('--rules', choices=sorted(RULE_SETS), default='default',
+                            help="Rule set the network was trained on")
+    add_parser.add_argument('--evaluate', action='store_true', help="Evaluate it on the fixed games")
+    evaluate_parser = commands.add_parser('evaluate', help="Evaluate models on the fixed games")
+    evaluate_parser.add_argument('names', nargs='+')
+    commands.add_parser('reindex', help="Rebuild the index from the sidecars")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        entries = sorted(registry.index['models'].items(),
+                         key=lambda item: (item[1]['score'] is None, -(item[1]['score'] or 0)))
+        print(f"{'name':<32}{'state':>6}{'hidden':>8}{'actions':>8}{'units/round':>13}")
+        for name, entry in entries:
+            score = f"{entry['score']:.4f}" if entry['score'] is not None else '-'
+            print(f"{name:<32}{entry['state_size']:>6}{entry['hidden_size']:>8}{entry['action_size']:>8}"
+                  f"{score:>13}")
+    elif args.command == 'best':
+        features = feature_spec(4 + len(args.count_systems), args.count_systems, args.deviations)
+        print(best_model_path(features, args.root))
+    elif args.command == 'add':
+        name = registry.register(args.path, args.name, rules=RULE_SETS[args.rules], notes=args.notes)
+        print(f"Registered {name}")
+        if args.evaluate:
+            print(f"{name}: {registry.evaluate(name)['per_round']:.4f} units/round")
+    elif args.command == 'evaluate':
+        for name in args.names:
+            print(f"{name}: {registry.evaluate(name)['per_round']:.4f} units/round")
+    else:
+        registry.rebuild_index()
+
+
+if __name__ == '__main__':
+    main()
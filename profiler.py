@@ -0,0 +1,251 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Dict
+
+# ============================================================
+# Instrumented Phases
+# ============================================================
+#
+# Instrumentation wraps the bound methods of one environment instance, so an
+# environment that is not instrumented runs the unmodified class methods and
+# pays nothing. Phases nest (player_play includes its strategy lookups); the
+# summary reports both the inclusive time and the self time of every phase.
+
+ENV_PHASES = {
+    'reset': 'reset',
+    'step': 'step',
+    '_deal_initial_cards': 'deal',
+    '_player_play': 'player_play',
+    '_basic_strategy_action': 'strategy',
+    '_dealer_play': 'dealer_play',
+    '_calculate_reward': 'reward',
+    '_get_observation': 'observation',
+}
+
+VECTOR_ENV_PHASES = {
+    'reset_wait': 'reset',
+    'step_wait': 'step',
+    '_reshuffle': 'reshuffle',
+    '_play_slot': 'player_play',
+    '_split': 'split',
+    '_settle': 'reward',
+    '_get_observations': 'observation',
+}
+
+MAX_TRACE_EVENTS = 1_000_000  # Trace events kept; timings and counters are always complete
+
+_MISSING = object()
+
+# ============================================================
+# Profiler
+# ============================================================
+
+class Profiler:
+    """
+    Per-phase timings and event counters for the simulation hot paths.
+
+    Timings are recorded by wrapping methods (`instrument`, `instrument_env`) or
+    with the `phase` context manager, and can be exported as a summary table
+    or as a Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, trace: bool = False, max_events: int = MAX_TRACE_EVENTS):
+        """
+        Args:
+            trace (bool): Keep every timed call for `write_chrome_trace`.
+            max_events (int): Trace events kept before tracing stops.
+        """
+        self.trace = trace
+        self.max_events = max_events
+        self.timings: Dict[str, list] = {}   # name -> [calls, inclusive ns, self ns]
+        self.counters: Dict[str, int] = {}
+        self.events = []
+        self._stack = []
+        self._originals = []
+        self._origin = perf_counter_ns()
+
+    # ------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _enter(self):
+        self._stack.append(0)
+        return perf_counter_ns()
+
+    def _exit(self, name, start):
+        end = perf_counter_ns()
+        elapsed = end - start
+        children = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += elapsed
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [0, 0, 0]
+        timing[0] += 1
+        timing[1] += elapsed
+        timing[2] += elapsed - children
+        if self.trace and len(self.events) < self.max_events:
+            self.events.append((name, start, elapsed))
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the enclosed block as one call of phase `name`."""
+        start = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(name, start)
+
+    def timed(self, name: str, function):
+        """Wraps `function` so that every call is timed as phase `name`."""
+        def wrapper(*args, **kwargs):
+            start = self._enter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit(name, start)
+        return wrapper
+
+    # ------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------
+
+    def instrument(self, obj, phases: Dict[str, str]) -> None:
+        """Times the given methods of one object, as {method name: phase name}."""
+        for method, name in phases.items():
+            self._wrap(obj, method, self.timed(name, getattr(obj, method)))
+
+    def instrument_env(self, env) -> None:
+        """
+        Instruments a BlackjackEnv or VectorBlackjackEnv.
+
+        Besides the phase timings of ENV_PHASES / VECTOR_ENV_PHASES this counts rounds,
+        cards dealt, reshuffles, splits, doubles and strategy lookups per table.
+        """
+        if hasattr(env, 'deck'):
+            self._instrument_scalar_env(env)
+        else:
+            self._instrument_vector_env(env)
+
+    def _instrument_scalar_env(self, env):
+        self.instrument(env, ENV_PHASES)
+        deck = env.deck
+        deal_code, reshuffle, lookup = deck.deal_code, deck.reshuffle, env._basic_strategy_action
+
+        def counted_deal():
+            self.count('cards_dealt')
+            return deal_code()
+
+        def counted_lookup(hand):
+            if hand.can_split():
+                self.count('strategy_lookups.pair')
+            elif hand.aces >= 1 and hand.value <= 21:
+                self.count('strategy_lookups.soft')
+            else:
+                self.count('strategy_lookups.hard')
+            return lookup(hand)
+
+        step = env.step
+
+        def counted_step(action):
+            result = step(action)
+            self.count('rounds')
+            if len(env.player_hands) > 1:
+                self.count('splits')
+            self.count('doubles', sum(hand.doubled for hand in env.player_hands))
+            return result
+
+        self._wrap(deck, 'deal_code', counted_deal)
+        self._wrap(deck, 'reshuffle', self.timed('reshuffle', self._counted('reshuffles', reshuffle)))
+        self._wrap(env, '_basic_strategy_action', counted_lookup)
+        self._wrap(env, 'step', counted_step)
+
+    def _instrument_vector_env(self, env):
+        self.instrument(env, VECTOR_ENV_PHASES)
+        draw, reshuffle, step_wait = env._draw, env._reshuffle, env.step_wait
+
+        def counted_draw(idx, counted=True):
+            self.count('cards_dealt', len(idx))
+            return draw(idx, counted)
+
+        def counted_reshuffle(mask):
+            self.count('reshuffles', int(mask.sum()))
+            return reshuffle(mask)
+
+        def counted_step_wait():
+            result = step_wait()
+            self.count('rounds', env.num_envs)
+            self.count('splits', int(env.split.sum()))
+            self.count('doubles', int(env.doubled.sum()))
+            return result
+
+        self._wrap(env, '_draw', counted_draw)
+        self._wrap(env, '_reshuffle', counted_reshuffle)
+        self._wrap(env, 'step_wait', counted_step_wait)
+
+    def _counted(self, name, function):
+        def wrapper(*args, **kwargs):
+            self.count(name)
+            return function(*args, **kwargs)
+        return wrapper
+
+    def _wrap(self, obj, method, wrapper):
+        # Remember what the instance held, so wrapping twice still unwinds correctly
+        self._originals.append((obj, method, vars(obj).get(method, _MISSING)))
+        setattr(obj, method, wrapper)
+
+    def uninstrument(self) -> None:
+        """Restores every instrumented object to its unmodified methods."""
+        for obj, method, previous in reversed(self._originals):
+            if previous is _MISSING:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, previous)
+        self._originals = []
+
+    # ------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------
+
+    def summary(self) -> str:
+        """The timings, slowest self time first, followed by the counters, as a text table."""
+        lines = [f"{'phase':<16}{'calls':>12}{'total ms':>12}{'self ms':>12}{'mean us':>12}{'self %':>9}"]
+        total_self = sum(timing[2] for timing in self.timings.values()) or 1
+        for name, (calls, inclusive, exclusive) in sorted(self.timings.items(),
+                                                          key=lambda item: -item[1][2]):
+            lines.append(f"{name:<16}{calls:>12,}{inclusive / 1e6:>12.1f}{exclusive / 1e6:>12.1f}"
+                         f"{inclusive / calls / 1e3:>12.2f}{100 * exclusive / total_self:>8.1f}%")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<28}{'value':>14}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<28}{value:>14,}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Writes the traced calls and final counters in the Chrome trace event format."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self._origin) / 1e3, 'dur': elapsed / 1e3}
+                  for name, start, elapsed in self.events]
+        end = max([event['ts'] + event['dur'] for event in events], default=0.0)
+        events.extend({'name': name, 'ph': 'C', 'pid': pid, 'tid': tid, 'ts': end, 'args': {name: value}}
+                      for name, value in self.counters.items())
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
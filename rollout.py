@@ -0,0 +1,230 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from vector_env import VectorBlackjackEnv
+from inference import sample_actions
+
+# ============================================================
+# Experience Collection
+# ============================================================
+
+def collect_rollout(env, policy_net, epsilon, states, actions, rewards, rng):
+    """
+    Plays rounds on a vector environment and writes them into preallocated buffers.
+
+    Args:
+        env (VectorBlackjackEnv): Environment to play on.
+        policy_net (PolicyNetwork): Policy used to sample bets.
+        epsilon (float): Probability of a uniformly random bet, per table.
+        states (np.ndarray): (rounds, state_size) float32 buffer.
+        actions (np.ndarray): (rounds,) int64 buffer.
+        rewards (np.ndarray): (rounds,) float32 buffer.
+        rng (np.random.Generator): Random source for bet sampling and exploration.
+
+    The number of rounds must be a multiple of `env.num_envs`.
+    """
+    num_envs = env.num_envs
+    device = next(policy_net.parameters()).device
+
+    for start in range(0, len(rewards), num_envs):
+        rows = slice(start, start + num_envs)
+        observations = env.reset()
+
+        with torch.no_grad():
+            action_probs = policy_net(torch.from_numpy(observations).to(device)).cpu().numpy()
+        # Bets are drawn from `rng` rather than torch's global generator, so a seeded rng replays the rollout
+        sampled_actions = sample_actions(action_probs, rng.random(num_envs))
+
+        # Epsilon-greedy action selection for betting, independently per table
+        explore = rng.random(num_envs) < epsilon
+        random_actions = rng.integers(action_probs.shape[1], size=num_envs)
+        bet_actions = np.where(explore, random_actions, sampled_actions)
+
+        next_observations, round_rewards, dones, info = env.step(bet_actions)
+
+        states[rows] = observations
+        actions[rows] = bet_actions
+        rewards[rows] = round_rewards
+
+
+# ============================================================
+# Rollout Workers
+# ============================================================
+
+def _attach(name, shape, dtype):
+    """Open an existing shared memory block as a NumPy array."""
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker_main(conn, layout, worker_index, num_envs, rounds, hidden_size, seed_sequence, rules):
+    """Worker process: owns one vector env and a policy copy, fills its slice of the buffers."""
+    from agent import (PolicyNetwork, STATE_SIZE, ACTION_SIZE, COUNT_SYSTEMS, PLAY_DEVIATIONS,
+                       TABLE_RULES)
+
+    torch.set_num_threads(1)
+    env_seed, rng_seed = seed_sequence.spawn(2)
+    env = VectorBlackjackEnv(num_envs=num_envs, seed=env_seed, count_systems=COUNT_SYSTEMS,
+                             deviations=PLAY_DEVIATIONS, rules=rules or TABLE_RULES)
+    rng = np.random.default_rng(rng_seed)
+    policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, hidden_size)
+
+    blocks = {key: _attach(*spec) for key, spec in layout.items()}
+    weights = blocks['weights'][1]
+    rows = slice(worker_index * rounds, (worker_index + 1) * rounds)
+    states = blocks['states'][1][rows]
+    actions = blocks['actions'][1][rows]
+    rewards = blocks['rewards'][1][rows]
+
+    try:
+        while True:
+            command, argument = conn.recv()
+            if command == 'close':
+                break
+            if command == 'get_state':
+                conn.send({'env': env.get_state(), 'rng': rng.bit_generator.state})
+                continue
+            if command == 'set_state':
+                env.set_state(argument['env'])
+                rng.bit_generator.state = argument['rng']
+                conn.send('done')
+                continue
+            epsilon = argument
+            # Load the latest weight snapshot published by the learner
+            vector_to_parameters(torch.from_numpy(weights.copy()), policy_net.parameters())
+            collect_rollout(env, policy_net, epsilon, states, actions, rewards, rng)
+            conn.send('done')
+    finally:
+        del weights, states, actions, rewards
+        for shm, _ in blocks.values():
+            shm.close()
+
+
+class RolloutWorkers:
+    """
+    A pool of processes that collect training rounds in parallel.
+
+    Each worker owns its own VectorBlackjackEnv and policy copy, seeded from an
+    independent stream of `seed`. The learner publishes weight snapshots into a
+    shared memory block, and the workers write their rounds straight into
+    shared experience buffers, so a collected batch is never pickled.
+    """
+
+    def __init__(self, policy_net, num_workers, num_envs, steps_per_rollout, seed=None, rules=None):
+        """
+        Starts the worker processes.
+
+        Args:
+            policy_net (PolicyNetwork): The learner's network; defines the weight layout.
+            num_workers (int): Number of worker processes.
+            num_envs (int): Tables per worker.
+            steps_per_rollout (int): Rounds per table in each rollout.
+            seed (int | SeedSequence): Seed from which every worker's streams are spawned.
+            rules (TableRules): Rules of the workers' tables; agent.TABLE_RULES when None.
+        """
+        self.num_workers = num_workers
+        self.rounds_per_worker = num_envs * steps_per_rollout
+        self.batch_size = num_workers * self.rounds_per_worker
+        state_size = policy_net.fc1.in_features
+        hidden_size = policy_net.fc1.out_features
+        num_params = parameters_to_vector(policy_net.parameters()).numel()
+
+        specs = {
+            'weights': ((num_params,), np.float32),
+            'states': ((self.batch_size, state_size), np.float32),
+            'actions': ((self.batch_size,), np.int64),
+            'rewards': ((self.batch_size,), np.float32),
+        }
+        self._blocks = {}
+        layout = {}
+        for key, (shape, dtype) in specs.items():
+            shm = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            self._blocks[key] = shm
+            layout[key] = (shm.name, shape, dtype)
+            setattr(self, key, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+        context = mp.get_context('spawn')
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seed_sequences = seed.spawn(num_workers)
+        self._connections = []
+        self._processes = []
+        for worker_index in range(num_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, layout, worker_index, num_envs, self.rounds_per_worker,
+                      hidden_size, seed_sequences[worker_index], rules),
+                daemon=True
+            )
+            process.start()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def publish(self, policy_net):
+        """Copies the learner's current weights into the shared snapshot."""
+        with torch.no_grad():
+            self.weights[:] = parameters_to_vector(policy_net.parameters()).cpu().numpy()
+
+    def collect(self, epsilon):
+        """
+        Runs one rollout on every worker with the last published weights.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Views of the shared states,
+            actions and rewards; they are overwritten by the next call.
+        """
+        for conn in self._connections:
+            conn.send(('rollout', epsilon))
+        for conn in self._connections:
+            conn.recv()
+        return self.states, self.actions, self.rewards
+
+    def get_state(self):
+        """The shoes and sampling stream of every worker, for `set_state` (training checkpoints)."""
+        for conn in self._connections:
+            conn.send(('get_state', None))
+        return [conn.recv() for conn in self._connections]
+
+    def set_state(self, states):
+        """Restores a `get_state` snapshot taken from workers with the same layout."""
+        if len(states) != self.num_workers:
+            raise ValueError(f"Expected the state of {self.num_workers} workers, got {len(states)}")
+        for conn, state in zip(self._connections, states):
+            conn.send(('set_state', state))
+        for conn in self._connections:
+            conn.recv()
+
+    def close(self):
+        """Stops the workers and releases the shared memory."""
+        for conn in self._connections:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=10)
+        self._connections = []
+        self._processes = []
+        self.weights = self.states = self.actions = self.rewards = None
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,250 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import os
+import numpy as np
+from typing import Dict, List
+from cards import Card
+
+# ============================================================
+# File Layout
+# ============================================================
+#
+# A simulation log is a single binary file made of NumPy .npy arrays written
+# back to back. It starts with MAGIC, followed by batches. Every batch is a
+# one-element int64 array holding the batch kind, then one array per column
+# in the order listed below.
+#
+# Shoes are not copied for every round: the card order of a shoe is written
+# once when it is shuffled, and each round stores the shoe id and the cursor,
+# so the remaining shoe at the start of a round is shoe[cursor:].
+#
+# The player columns hold one entry per hand: `hands` entries per round, so a
+# round that was split keeps the cards and the value of both hands.
+
+MAGIC = np.frombuffer(b'DTSIMLOG3', dtype=np.uint8)
+
+ROUND_BATCH, SHOE_BATCH = 0, 1
+
+ROUND_COLUMNS = {
+    'game': np.int32,
+    'round': np.int32,
+    'bet': np.int16,
+    'reward': np.float32,
+    'player_value': np.int8,     # One per hand, split by hands
+    'dealer_value': np.int8,
+    'true_count': np.float32,
+    'running_count': np.int16,
+    'aces_remaining': np.int16,   # Unseen aces after the round
+    'outcome': np.int8,          # 1 win, 0 push, -1 loss
+    'hands': np.int8,            # 2 after a split
+    'shoe_id': np.int32,
+    'cursor': np.int16,
+    'player_card_counts': np.int8,  # One per hand, split by hands
+    'dealer_card_counts': np.int8,
+    'player_cards': np.int8,     # Flat card codes, split by player_card_counts
+    'dealer_cards': np.int8,     # Flat card codes, split by dealer_card_counts
+}
+
+SHOE_COLUMNS = {
+    'shoe_id': np.int32,
+    'shoe_sizes': np.int16,
+    'shoe_cards': np.int8,       # Flat card codes, split by shoe_sizes
+}
+
+OUTCOME_NAMES = {1: "Win", 0: "Push", -1: "Loss"}
+
+# ============================================================
+# Writer
+# ============================================================
+
+class SimulationLogWriter:
+    """
+    Appends simulated rounds and shoe snapshots to a single columnar log file.
+
+    Records are buffered in memory and written in bulk every `flush_every` rounds,
+    so logging a long evaluation costs one file and a few large writes.
+    """
+
+    def __init__(self, path: str, flush_every: int = 50_000):
+        """
+        Opens the log file and writes its header.
+
+        Args:
+            path (str): File to create; an existing file is overwritten.
+            flush_every (int): Rounds buffered before a batch is written.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, 'wb')
+        np.lib.format.write_array(self._file, MAGIC)
+        self._rounds = {name: [] for name in ROUND_COLUMNS}
+        self._shoes = {name: [] for name in SHOE_COLUMNS}
+        self._num_rounds = 0
+        self._num_shoes = 0
+        self._last_shoe = None
+        self._shoe_id = -1
+        self._cursor = 0
+
+    def log_shoe(self, deck) -> None:
+        """
+        Records the state of the shoe at the start of a round.
+
+        The card order is stored only if the deck was shuffled since the last call;
+        otherwise just the cursor is kept for the next `log_round`.
+        """
+        key = (id(deck), deck.shuffles)
+        if key != self._last_shoe:
+            self._last_shoe = key
+            self._shoe_id = self._num_shoes
+            self._num_shoes += 1
+            self._shoes['shoe_id'].append(self._shoe_id)
+            self._shoes['shoe_sizes'].append(deck.shoe.size)
+            self._shoes['shoe_cards'].extend(deck.shoe.tolist())
+        self._cursor = deck.cursor
+
+    def log_round(self, game: int, round_num: int, bet: int, reward: float, env) -> None:
+        """
+        Records a finished round of a BlackjackEnv.
+
+        Args:
+            game (int): Game number.
+            round_num (int): Round number within the game.
+            bet (int): Units bet.
+            reward (float): Reward of the round.
+            env (BlackjackEnv): Environment right after `step`.
+        """
+        player_hands = env.player_hands
+        dealer_hand = env.dealer_hand
+        rounds = self._rounds
+        rounds['game'].append(game)
+        rounds['round'].append(round_num)
+        rounds['bet'].append(bet)
+        rounds['reward'].append(reward)
+        rounds['player_value'].extend(hand.value for hand in player_hands)
+        rounds['dealer_value'].append(dealer_hand.value)
+        rounds['true_count'].append(env.true_count)
+        rounds['running_count'].append(env.shoe_tracker.running_count)
+        rounds['aces_remaining'].append(env.shoe_tracker.aces_remaining)
+        rounds['outcome'].append((reward > 0) - (reward < 0))
+        rounds['hands'].append(len(player_hands))
+        rounds['shoe_id'].append(self._shoe_id)
+        rounds['cursor'].append(self._cursor)
+        rounds['player_card_counts'].extend(len(hand.codes) for hand in player_hands)
+        rounds['dealer_card_counts'].append(len(dealer_hand.codes))
+        for hand in player_hands:
+            rounds['player_cards'].extend(hand.codes)
+        rounds['dealer_cards'].extend(dealer_hand.codes)
+
+        self._num_rounds += 1
+        if self._num_rounds >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered shoes and rounds as one batch each."""
+        # Shoes first, so every round on disk refers to a shoe that is already written
+        if self._shoes['shoe_id']:
+            self._write_batch(SHOE_BATCH, SHOE_COLUMNS, self._shoes)
+        if self._num_rounds:
+            self._write_batch(ROUND_BATCH, ROUND_COLUMNS, self._rounds)
+            self._num_rounds = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_batch(self, kind, columns, buffers):
+        np.lib.format.write_array(self._file, np.array([kind], dtype=np.int64))
+        for name, dtype in columns.items():
+            np.lib.format.write_array(self._file, np.asarray(buffers[name], dtype=dtype))
+            buffers[name].clear()
+
+# ============================================================
+# Reader
+# ============================================================
+
+def read_simulation_log(path: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Loads a simulation log.
+
+    Returns:
+        Dict[str, Dict[str, np.ndarray]]: {'rounds': columns, 'shoes': columns}, each
+        column concatenated over all batches.
+    """
+    batches = {ROUND_BATCH: {name: [] for name in ROUND_COLUMNS},
+               SHOE_BATCH: {name: [] for name in SHOE_COLUMNS}}
+    layouts = {ROUND_BATCH: ROUND_COLUMNS, SHOE_BATCH: SHOE_COLUMNS}
+
+    with open(path, 'rb') as log_file:
+        size = os.fstat(log_file.fileno()).st_size
+        magic = np.lib.format.read_array(log_file)
+        if not np.array_equal(magic, MAGIC):
+            raise ValueError(f"{path} is not a simulation log")
+        while log_file.tell() < size:
+            kind = int(np.lib.format.read_array(log_file)[0])
+            for name in layouts[kind]:
+                batches[kind][name].append(np.lib.format.read_array(log_file))
+
+    def concatenate(kind):
+        return {name: (np.concatenate(parts) if parts else np.zeros(0, dtype=layouts[kind][name]))
+                for name, parts in batches[kind].items()}
+
+    return {'rounds': concatenate(ROUND_BATCH), 'shoes': concatenate(SHOE_BATCH)}
+
+
+def _split(flat, counts):
+    return np.split(flat, np.cumsum(counts.astype(np.int64))[:-1])
+
+
+def remaining_shoe(log, round_index: int) -> np.ndarray:
+    """Card codes left in the shoe at the start of a logged round (after the initial deal)."""
+    rounds, shoes = log['rounds'], log['shoes']
+    shoe_index = int(np.searchsorted(shoes['shoe_id'], rounds['shoe_id'][round_index]))
+    offsets = np.concatenate([[0], np.cumsum(shoes['shoe_sizes'].astype(np.int64))])
+    shoe = shoes['shoe_cards'][offsets[shoe_index]:offsets[shoe_index + 1]]
+    return shoe[int(rounds['cursor'][round_index]):]
+
+
+def round_rows(log) -> List[list]:
+    """
+    The logged rounds as rows in the layout of the former per-game CSV files,
+    with cards materialized as strings. The cards and values of split hands
+    are separated by '|'.
+    """
+    rounds = log['rounds']
+    hand_cards = _split(rounds['player_cards'], rounds['player_card_counts'])
+    hand_offsets = np.concatenate([[0], np.cumsum(rounds['hands'].astype(np.int64))])
+    dealer_cards = _split(rounds['dealer_cards'], rounds['dealer_card_counts'])
+    rows = []
+    for i in range(len(rounds['game'])):
+        hands = range(hand_offsets[i], hand_offsets[i + 1])
+        player_values = [int(rounds['player_value'][hand]) for hand in hands]
+        rows.append([
+            int(rounds['game'][i]),
+            int(rounds['round'][i]),
+            int(rounds['bet'][i]),
+            float(rounds['reward'][i]),
+            "|".join(";".join(str(Card.from_code(int(code))) for code in hand_cards[hand])
+                     for hand in hands),
+            player_values[0] if len(player_values) == 1 else "|".join(map(str, player_values)),
+            ";".join(str(Card.from_code(int(code))) for code in dealer_cards[i]),
+            int(rounds['dealer_value'][i]),
+            f"{rounds['true_count'][i]:.2f}",
+            OUTCOME_NAMES[int(rounds['outcome'][i])],
+        ])
+    return rows
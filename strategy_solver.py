@@ -0,0 +1,266 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+from basic_strategy import STAND, HIT, DOUBLE, SPLIT, ACTION_NAMES
+from ev_engine import EVEngine, VALUES, full_shoe_composition, _remove, _add_card
+from table_rules import TableRules, DEFAULT_RULES
+
+# ============================================================
+# Configuration
+# ============================================================
+
+OUTPUT_DIR = 'SolvedStrategies'
+HARD_ROWS = tuple(range(5, 22))     # Rows of hard_totals.csv
+SOFT_ROWS = tuple(range(13, 21))    # Rows of soft_totals.csv
+PAIR_ROWS = tuple(range(2, 12))     # Rows of pairs.csv, Aces as 11
+UPCARDS = tuple(range(2, 12))
+
+# ============================================================
+# Solver
+# ============================================================
+
+class StrategySolver(EVEngine):
+    """
+    Optimal total-dependent strategy for one rule set.
+
+    Every decision is valued exactly against the composition left after the
+    cards involved, with optimal play afterwards, by the same memoized recursion
+    over compositions as EVEngine (whose dealer probabilities and stand values
+    are reused). A table cell then takes the action with the best EV averaged
+    over the two-card hands that make its total, weighted by their probability,
+    as in the usual total-dependent charts.
+    """
+
+    def __init__(self, rules: TableRules = DEFAULT_RULES):
+        """
+        Args:
+            rules (TableRules): Rules to solve for; the strategy tables it names are not used.
+        """
+        super().__init__(rules=rules)
+        self._best_cache = {}
+
+    def clear_cache(self):
+        super().clear_cache()
+        self._best_cache.clear()
+
+    # ------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------
+
+    def best_ev(self, composition, upcard: int, total: int, soft: bool, num_cards: int) -> float:
+        """EV of a hand that may only stand or hit from here on, played optimally."""
+        if total > 21:
+            return -1.0
+        if num_cards == self._charlie_cards:
+            return 1.0
+        key = (composition, upcard, total, soft, num_cards)
+        ev = self._best_cache.get(key)
+        if ev is None:
+            ev = max(self.stand_ev(composition, upcard, total),
+                     self._hit_ev(composition, upcard, total, soft, num_cards))
+            self._best_cache[key] = ev
+        return ev
+
+    def _hit_ev(self, composition, upcard, total, soft, num_cards):
+        ev = 0.0
+        remaining = sum(composition)
+        for index, count in enumerate(composition):
+            if count:
+                next_total, next_soft = _add_card(total, soft, VALUES[index])
+                ev += count / remaining * self.best_ev(_remove(composition, index), upcard,
+                                                       next_total, next_soft, num_cards + 1)
+        return ev
+
+    def _double_ev(self, composition, upcard, total, soft):
+        ev = 0.0
+        remaining = sum(composition)
+        for index, count in enumerate(composition):
+            if count:
+                next_total, _ = _add_card(total, soft, VALUES[index])
+                if next_total > 21:
+                    ev -= 2 * count / remaining
+                elif self._charlie_cards == 3:
+                    ev += 2 * count / remaining
+                else:
+                    ev += 2 * count / remaining * self.stand_ev(_remove(composition, index),
+                                                                upcard, next_total)
+        return ev
+
+    def action_evs(self, composition, upcard: int, total: int, soft: bool,
+                   double: bool = True) -> Dict[int, float]:
+        """EV of standing, hitting and (unless `double` is False) doubling a two-card hand."""
+        evs = {STAND: self.stand_ev(composition, upcard, total),
+               HIT: self._hit_ev(composition, upcard, total, soft, 2)}
+        if double:
+            evs[DOUBLE] = self._double_ev(composition, upcard, total, soft)
+        return evs
+
+    def _split_hand_ev(self, composition, pair_value, upcard):
+        """EV of one hand of a split, played optimally (no resplit)."""
+        ev = 0.0
+        remaining = sum(composition)
+        for index, count in enumerate(composition):
+            if not count:
+                continue
+            total, soft = _add_card(*_add_card(0, False, pair_value), VALUES[index])
+            after = _remove(composition, index)
+            if pair_value == 11 and self.rules.split_aces_one_card:
+                hand_ev = self.stand_ev(after, upcard, total)
+            else:
+                hand_ev = max(self.action_evs(after, upcard, total, soft,
+                                              self.rules.double_after_split).values())
+            ev += count / remaining * hand_ev
+        return ev
+
+    def pair_evs(self, composition, pair_value: int, upcard: int) -> Dict[int, float]:
+        """EV of every action on a pair, splitting included."""
+        total, soft = _add_card(*_add_card(0, False, pair_value), pair_value)
+        evs = self.action_evs(composition, upcard, total, soft)
+        evs[SPLIT] = 2 * self._split_hand_ev(composition, pair_value, upcard)
+        return evs
+
+    # ------------------------------------------------------------
+    # Tables
+    # ------------------------------------------------------------
+
+    def solve_upcard(self, upcard: int) -> Dict[str, Dict[int, int]]:
+        """
+        The strategy against one upcard.
+
+        Returns:
+            Dict[str, Dict[int, int]]: {'hard': {total: action}, 'soft': {...}, 'pair': {value: action}}.
+        """
+        base = list(full_shoe_composition(self.rules.num_decks))
+        base[upcard - 2] -= 1
+        base = tuple(base)
+        remaining = sum(base)
+
+        rows = {'hard': {}, 'soft': {}}
+        pair_hands = {}
+        strategy = {'hard': {}, 'soft': {}, 'pair': {}}
+        for i in range(10):
+            for j in range(i, 10):
+                first, second = VALUES[i], VALUES[j]
+                weight = base[i] / remaining * (base[j] - (i == j)) / (remaining - 1) * (1 if i == j else 2)
+                if weight <= 0:
+                    continue
+                composition = _remove(_remove(base, i), j)
+                total, soft = _add_card(*_add_card(0, False, first), second)
+                if total == 21:
+                    continue  # A natural is not a decision
+                if i == j:
+                    evs = self.pair_evs(composition, first, upcard)
+                    strategy['pair'][first] = max(evs, key=evs.get)
+                    pair_hands.setdefault(('soft' if soft else 'hard', total), []).append(
+                        (weight, {action: evs[action] for action in (STAND, HIT, DOUBLE)}))
+                    continue
+                evs = self.action_evs(composition, upcard, total, soft)
+                rows['soft' if soft else 'hard'].setdefault(total, []).append((weight, evs))
+
+        # Totals only made by a pair (hard 4, hard 20) still need a cell for hands
+        # that reach them by hitting, or for a pair that is not split
+        for (kind, total), hands in pair_hands.items():
+            rows[kind].setdefault(total, hands)
+
+        for kind, totals in rows.items():
+            for total, hands in totals.items():
+                averaged = {action: sum(weight * evs[action] for weight, evs in hands)
+                            for action in (STAND, HIT, DOUBLE)}
+                strategy[kind][total] = max(averaged, key=averaged.get)
+        return strategy
+
+
+def _solve_upcard(upcard, rules):
+    return StrategySolver(rules).solve_upcard(upcard)
+
+
+def solve(rules: TableRules = DEFAULT_RULES,
+          num_workers: int = None) -> Dict[str, Dict[int, Dict[int, int]]]:
+    """
+    Solves the strategy against every upcard, one upcard per worker process.
+
+    Args:
+        rules (TableRules): Rules to solve for.
+        num_workers (int): Worker processes; defaults to the CPU count, 0 or 1 solves in-process.
+
+    Returns:
+        Dict[str, Dict[int, Dict[int, int]]]: {'hard' | 'soft' | 'pair': {row: {upcard: action}}}.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    arguments = [UPCARDS, [rules] * len(UPCARDS)]
+    if num_workers <= 1:
+        solved = list(map(_solve_upcard, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=min(num_workers, len(UPCARDS)),
+                                 mp_context=mp.get_context('spawn')) as executor:
+            solved = list(executor.map(_solve_upcard, *arguments))
+
+    tables = {'hard': {}, 'soft': {}, 'pair': {}}
+    for upcard, strategy in zip(UPCARDS, solved):
+        for kind, cells in strategy.items():
+            for row, action in cells.items():
+                tables[kind].setdefault(row, {})[upcard] = action
+    return tables
+
+# ============================================================
+# CSV Output
+# ============================================================
+
+def write_strategy_csvs(tables, directory: str) -> None:
+    """Writes hard_totals.csv, soft_totals.csv and pairs.csv in the layout of the shipped tables."""
+    os.makedirs(directory, exist_ok=True)
+    layouts = (('hard_totals.csv', 'PlayerTotal', 'hard', HARD_ROWS),
+               ('soft_totals.csv', 'PlayerTotal', 'soft', SOFT_ROWS),
+               ('pairs.csv', 'Pair', 'pair', PAIR_ROWS))
+    for filename, first_column, kind, rows in layouts:
+        with open(os.path.join(directory, filename), 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file, lineterminator='\n')
+            writer.writerow([first_column] + list(UPCARDS))
+            for row in rows:
+                label = 'A' if kind == 'pair' and row == 11 else row
+                cells = tables[kind].get(row, {})
+                writer.writerow([label] + [ACTION_NAMES[cells.get(upcard, STAND)] for upcard in UPCARDS])
+
+# ============================================================
+# Entry Point
+# ============================================================
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Solve the optimal basic strategy tables for a rule set.")
+    parser.add_argument('--decks', type=int, default=8, help="Decks per shoe")
+    parser.add_argument('--charlie', type=int, default=6,
+                        help="Cards of an unbusted hand that win outright; 0 disables it")
+    parser.add_argument('--split-aces-draw', action='store_true',
+                        help="Split aces are played on instead of receiving one card")
+    parser.add_argument('--h17', action='store_true', help="Dealer hits soft 17")
+    parser.add_argument('--no-das', action='store_true', help="No doubling after a split")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for the three CSV files")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rules = TableRules(num_decks=args.decks, charlie_cards=args.charlie,
+                       split_aces_one_card=not args.split_aces_draw,
+                       dealer_hits_soft_17=args.h17, double_after_split=not args.no_das)
+    tables = solve(rules, args.workers)
+    write_strategy_csvs(tables, args.output_dir)
+    print(f"Solved in {time.perf_counter() - start:.1f} s; tables written to {args.output_dir}/")
+
+
+if __name__ == '__main__':
+    main()
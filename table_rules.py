@@ -0,0 +1,80 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+# ============================================================
+# Table Rules
+# ============================================================
+
+@dataclass(frozen=True)
+class TableRules:
+    """
+    The rules a table is played under.
+
+    The defaults are the house rules the simulation was built for: eight decks
+    dealt to 75%, dealer stands on all 17s without peeking, blackjack pays 3:2,
+    six-card charlie, one split per round with a single card to split aces and
+    doubling after a split. Resplitting, surrender and insurance are not offered.
+
+    Instances are frozen, so one rule set can be shared by any number of
+    environments and used as a cache key. Environments read the rules once
+    when they are built and keep the values as plain attributes.
+    """
+    num_decks: int = 8
+    penetration: float = 0.75           # Fraction of the shoe dealt before it is reshuffled
+    blackjack_payout: float = 1.5
+    dealer_hits_soft_17: bool = False
+    charlie_cards: int = 6              # Unbusted hands of this many cards win; 0 disables it
+    split_aces_one_card: bool = True
+    double_after_split: bool = True
+    strategy_dir: Optional[str] = None  # Directory of strategy CSVs; None uses the shipped ones
+
+    def __post_init__(self):
+        if self.num_decks < 1:
+            raise ValueError(f"num_decks must be at least 1, got {self.num_decks}")
+        if not 0 < self.penetration < 1:
+            raise ValueError(f"penetration must be between 0 and 1, got {self.penetration}")
+        if self.charlie_cards and self.charlie_cards < 3:
+            raise ValueError(f"charlie_cards must be 0 or at least 3, got {self.charlie_cards}")
+
+    @property
+    def shoe_size(self) -> int:
+        return 52 * self.num_decks
+
+    @property
+    def minimum_cards(self) -> int:
+        """Cards left below which the shoe is reshuffled before a round."""
+        return int(round((1 - self.penetration) * self.shoe_size))
+
+    @property
+    def charlie_limit(self) -> int:
+        """Card count of a charlie; without the rule, a count no hand can reach."""
+        return self.charlie_cards or 99
+
+    def replace(self, **changes) -> 'TableRules':
+        """A copy with some rules changed."""
+        return replace(self, **changes)
+
+
+DEFAULT_RULES = TableRules()
+
+# Common casino variants, for sweeps of a policy over rule sets. All of them play
+# the shipped strategy tables; set strategy_dir to the tables strategy_solver.py
+# writes for a variant to play it optimally.
+RULE_SETS: Dict[str, TableRules] = {
+    'default': DEFAULT_RULES,
+    'h17': DEFAULT_RULES.replace(dealer_hits_soft_17=True),
+    'six_to_five': DEFAULT_RULES.replace(blackjack_payout=1.2),
+    'no_charlie': DEFAULT_RULES.replace(charlie_cards=0),
+    'six_deck': DEFAULT_RULES.replace(num_decks=6, penetration=0.8),
+    'double_deck': DEFAULT_RULES.replace(num_decks=2, penetration=0.65, double_after_split=False),
+}
@@ -0,0 +1,140 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import argparse
+from typing import Dict, Sequence
+import numpy as np
+from vector_env import VectorBlackjackEnv
+from inference import InferencePolicy
+
+# ============================================================
+# Configuration
+# ============================================================
+
+NUM_TABLES = 1024
+NUM_ROUNDS = 500      # Rounds simulated per table
+SEAT_COUNTS = (1, 2, 3, 4, 5, 6, 7)
+
+# Dealing-time model, in seconds. With the default rules it gives about 200
+# rounds per hour heads-up and 50 at a full table of seven, in line with the
+# usual published hands-per-hour figures for a hand-dealt shoe game.
+SECONDS_PER_ROUND = 5.7      # Fixed work of a round: upcard, hole card, clearing the table
+SECONDS_PER_HAND = 6.0       # Per hand played: taking the bet, the decision, paying it
+SECONDS_PER_CARD = 1.0       # Per card dealt, the dealer's included
+SECONDS_PER_SHUFFLE = 90.0   # Per shoe shuffled
+
+# ============================================================
+# Simulation
+# ============================================================
+
+def round_seconds(hands: float, cards: float, shuffles: float) -> float:
+    """Dealing time of a round with the given mean hands, cards and shuffles per round."""
+    return (SECONDS_PER_ROUND + SECONDS_PER_HAND * hands + SECONDS_PER_CARD * cards +
+            SECONDS_PER_SHUFFLE * shuffles)
+
+
+def simulate_table(policy_net=None, num_seats: int = 1, policy_seats: Sequence[int] = (0,),
+                   num_tables: int = NUM_TABLES, num_rounds: int = NUM_ROUNDS, rules=None,
+                   seed: int = 0) -> Dict[str, float]:
+    """
+    Plays tables of `num_seats` players sharing a shoe and measures the pace and
+    the result of the policy seats.
+
+    The bets of every policy seat at every table are chosen in one batched
+    forward pass per round; the other seats are basic strategy fillers.
+
+    Args:
+        policy_net (PolicyNetwork): Betting policy of the policy seats; None bets one unit.
+        num_seats (int): Players per table.
+        policy_seats (Sequence[int]): Seats betting by the policy.
+        num_tables (int): Tables simulated in lockstep.
+        num_rounds (int): Rounds per table.
+        rules (TableRules): Rules of the tables; agent.TABLE_RULES when None.
+        seed (int): Seed of the shoes and the bet sampling.
+
+    Returns:
+        Dict[str, float]: Per round: 'cards', 'hands' (all seats, split hands included) and
+        'shuffles'; 'rounds_per_hour' and, per policy seat, 'hands_per_hour', 'mean_bet',
+        'ev_per_round' and 'ev_per_hour' in units.
+    """
+    from agent import COUNT_SYSTEMS, PLAY_DEVIATIONS, TABLE_RULES
+
+    shoe_seed, bet_seed = np.random.SeedSequence(seed).spawn(2)
+    env = VectorBlackjackEnv(num_envs=num_tables, seed=shoe_seed, count_systems=COUNT_SYSTEMS,
+                             deviations=PLAY_DEVIATIONS, rules=rules or TABLE_RULES,
+                             num_seats=num_seats, policy_seats=policy_seats)
+    rng = np.random.default_rng(bet_seed)
+    batch_size = num_tables * len(env.policy_seats)
+    policy_rows = (np.arange(num_tables)[:, None] * num_seats + np.array(env.policy_seats)).reshape(-1)
+    policy = InferencePolicy(policy_net) if policy_net is not None else None
+
+    cards = hands = policy_hands = bets = profit = 0.0
+    shuffles = env.shuffles.sum()
+    for _ in range(num_rounds):
+        states = env.reset()
+        if policy is None:
+            actions = np.zeros(batch_size, dtype=np.int64)
+        else:
+            actions = policy.sample(states, rng.random(batch_size))
+        rewards = env.step(actions)[1]
+
+        cards += env.num_cards.sum() + env.dealer_num_cards.sum()
+        hands += env.num_rows + env.split.sum()
+        policy_hands += batch_size + env.split[policy_rows].sum()
+        bets += actions.sum() + batch_size
+        profit += rewards.sum()
+
+    rounds = num_tables * num_rounds
+    shuffles = env.shuffles.sum() - shuffles
+    seconds = round_seconds(hands / rounds, cards / rounds, shuffles / rounds)
+    rounds_per_hour = 3600 / seconds
+    ev_per_round = profit / (rounds * len(env.policy_seats))
+    return {
+        'cards': cards / rounds,
+        'hands': hands / rounds,
+        'shuffles': shuffles / rounds,
+        'rounds_per_hour': rounds_per_hour,
+        'hands_per_hour': rounds_per_hour * policy_hands / (rounds * len(env.policy_seats)),
+        'mean_bet': bets / (rounds * len(env.policy_seats)),
+        'ev_per_round': ev_per_round,
+        'ev_per_hour': ev_per_round * rounds_per_hour,
+    }
+
+# ============================================================
+# Entry Point
+# ============================================================
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Hands and EV per hour of a policy seat at tables of several players.")
+    parser.add_argument('--seats', type=int, nargs='+', default=list(SEAT_COUNTS),
+                        help="Players per table to simulate")
+    parser.add_argument('--model', help="Saved betting policy; flat one-unit bets when omitted")
+    parser.add_argument('--tables', type=int, default=NUM_TABLES, help="Tables simulated in lockstep")
+    parser.add_argument('--rounds', type=int, default=NUM_ROUNDS, help="Rounds per table")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    policy_net = None
+    if args.model:
+        from evaluation import load_policy
+        policy_net = load_policy(args.model)
+
+    print(f"{'seats':>5}{'cards/rd':>10}{'rounds/h':>10}{'hands/h':>10}{'mean bet':>10}"
+          f"{'EV/rd':>10}{'EV/h':>10}")
+    for num_seats in args.seats:
+        # The policy plays the first seat, taking its cards first
+        result = simulate_table(policy_net, num_seats, (0,), args.tables, args.rounds, seed=args.seed)
+        print(f"{num_seats:>5}{result['cards']:>10.2f}{result['rounds_per_hour']:>10.1f}"
+              f"{result['hands_per_hour']:>10.1f}{result['mean_bet']:>10.2f}"
+              f"{result['ev_per_round']:>10.4f}{result['ev_per_hour']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
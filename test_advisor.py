@@ -0,0 +1,118 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import torch
+from agent import PolicyNetwork, STATE_SIZE, ACTION_SIZE
+from advisor import AdvisorEngine, TableState, REMAINING_STEPS, serve_unix
+from basic_strategy import ACTION_NAMES, hard_total_action, soft_total_action, pair_action
+
+class TestAdvisor(unittest.TestCase):
+    """Tests for the advisor engine and service."""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.engine = AdvisorEngine(policy_net=PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16))
+
+    def test_moves_follow_basic_strategy(self):
+        """Two-card moves match the compiled strategy tables."""
+        move = self.engine.move
+        self.assertEqual(move(['8', '8'], '10')['action'], ACTION_NAMES[pair_action(8, 10)])
+        self.assertEqual(move(['A', '7'], '6')['action'], ACTION_NAMES[soft_total_action(18, 6)])
+        self.assertEqual(move(['10', '6'], 'A')['action'], ACTION_NAMES[hard_total_action(16, 11)])
+        # Three cards cannot double any more, and a bust has no move
+        self.assertEqual(move(['2', '3', '6'], '6')['action'], 'H')
+        self.assertIsNone(move(['K', 'Q', '5'], '6')['action'])
+
+    def test_count_is_incremental(self):
+        """Cards are counted once each, and a shuffle starts a new shoe."""
+        table = TableState(num_decks=2)
+        for rank in ['2', '5', 'K', '7']:
+            table.observe(rank)
+        self.assertEqual(table.running_count, 1)
+        self.assertEqual(table.remaining, 100)
+        self.assertEqual(table.composition()[10 - 2], 31)
+        self.assertAlmostEqual(table.true_count, 1 / (100 / 52))
+        table.shuffle()
+        self.assertEqual((table.running_count, table.remaining), (0, 104))
+
+    def test_bet_after_more_cards_than_the_shoe_holds(self):
+        """An over-dealt shoe bets like an empty one instead of indexing past the table."""
+        # A bet table whose bet is the shoe fraction index, so every fraction bets differently
+        self.engine.bet_table = [[[fraction] * 10 for fraction in range(REMAINING_STEPS + 1)]
+                                 for _ in range(201)]
+        table = TableState(num_decks=1)
+        for _ in range(60):
+            table.observe('7')
+        self.assertLess(table.remaining, 0)
+        self.assertEqual(self.engine.bet(table, '10'), 0)
+
+    def test_protocol(self):
+        """Requests are answered per table, and bad requests get an error instead of an exception."""
+        handle = self.engine.handle
+        self.assertEqual(handle({'id': 7, 'op': 'move', 'player': ['A', '7'], 'dealer': '6'})['id'], 7)
+        self.assertEqual(handle({'op': 'cards', 'cards': ['2', '3'], 'table': 'a'})['running_count'], 2)
+        self.assertEqual(handle({'op': 'state', 'table': 'b'})['running_count'], 0)
+        self.assertIn(handle({'op': 'bet', 'table': 'a', 'dealer': '10'})['bet'], range(1, ACTION_SIZE + 1))
+        self.assertIn('error', handle({'op': 'bet', 'table': 'c'}))
+        self.assertIn('error', handle({'op': 'move', 'player': ['Z'], 'dealer': '6'}))
+        self.assertIn('error', handle({'op': 'move', 'player': [], 'dealer': '6'}))
+        self.assertIn('error', handle({'op': 'move', 'player': 'A7', 'dealer': '6'}))
+        self.assertIn('error', json.loads(self.engine.handle_line('not json')))
+
+    def test_missing_or_corrupt_policy_is_an_error(self):
+        """A policy that cannot be loaded answers bets with an error, and the engine keeps serving."""
+        with tempfile.TemporaryDirectory() as directory:
+            corrupt = os.path.join(directory, 'corrupt.pth')
+            with open(corrupt, 'w', encoding='utf-8') as corrupt_file:
+                corrupt_file.write('not a network')
+            for path in (os.path.join(directory, 'missing.pth'), corrupt):
+                engine = AdvisorEngine(model_path=path)
+                response = engine.handle({'id': 1, 'op': 'bet', 'dealer': '10'})
+                self.assertEqual(response['id'], 1)
+                self.assertIn(path, response['error'])
+                self.assertEqual(engine.handle({'op': 'move', 'player': ['10', '6'], 'dealer': '10'})['action'],
+                                 ACTION_NAMES[hard_total_action(16, 10)])
+
+    def test_unix_socket_serves_concurrent_clients(self):
+        """Two clients on the socket are served concurrently and share tables by name."""
+        async def scenario(path):
+            server = asyncio.create_task(serve_unix(self.engine, path))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+            clients = [await asyncio.open_unix_connection(path) for _ in range(2)]
+
+            async def ask(client, request):
+                reader, writer = client
+                writer.write((json.dumps(request) + '\n').encode())
+                await writer.drain()
+                return json.loads(await reader.readline())
+
+            answers = await asyncio.gather(
+                ask(clients[0], {'op': 'cards', 'cards': ['2', '2'], 'table': 'x'}),
+                ask(clients[1], {'op': 'move', 'player': ['10', '6'], 'dealer': '10'}))
+            shared = await ask(clients[1], {'op': 'state', 'table': 'x'})
+            for _, writer in clients:
+                writer.close()
+            server.cancel()
+            return answers, shared
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            answers, shared = asyncio.run(scenario(os.path.join(tmpdir, 'advisor.sock')))
+        self.assertEqual(answers[0]['running_count'], 2)
+        self.assertEqual(answers[1]['total'], 16)
+        self.assertEqual(shared['running_count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
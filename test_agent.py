@@ -0,0 +1,103 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+import agent
+from agent import PolicyNetwork, TrainingConfig, STATE_SIZE, ACTION_SIZE, reinforce_update, train
+
+CONFIG = TrainingConfig(num_episodes=2048, hidden_size=16, num_envs=128, batch_size=256, num_workers=0,
+                        model_path=None, checkpoint_every=512)
+
+class TestCheckpoints(unittest.TestCase):
+    """Tests for training checkpoints and resuming."""
+
+    def test_resume_after_a_crash_is_bit_for_bit(self):
+        """A run that crashes and resumes from its last checkpoint ends exactly like an uninterrupted run."""
+        uninterrupted = train(CONFIG, verbose=False)
+
+        reinforce_update = agent.reinforce_update
+        calls = []
+
+        def crash_on_the_sixth_update(*args, **kwargs):
+            calls.append(None)
+            if len(calls) == 6:
+                raise RuntimeError("Preempted")
+            reinforce_update(*args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as directory:
+            config = CONFIG.replace(checkpoint_path=os.path.join(directory, 'checkpoint.pt'), resume=True)
+            with mock.patch('agent.reinforce_update', crash_on_the_sixth_update):
+                with self.assertRaises(RuntimeError):
+                    train(config, verbose=False)
+            self.assertEqual(os.listdir(directory), ['checkpoint.pt'])
+            self.assertEqual(torch.load(config.checkpoint_path)['episode'], 1024)
+
+            resumed = train(config, verbose=False)
+            final = torch.load(config.checkpoint_path)
+
+        self.assertEqual(resumed['episodes'], 2048)
+        self.assertEqual(final['episode'], 2048)
+        self.assertEqual(resumed['curve'], uninterrupted['curve'])
+        for name, weights in uninterrupted['policy_net'].state_dict().items():
+            self.assertTrue(torch.equal(weights, resumed['policy_net'].state_dict()[name]), name)
+
+    def test_resume_without_a_checkpoint_starts_over(self):
+        """With nothing to resume from, `resume` trains from scratch."""
+        with tempfile.TemporaryDirectory() as directory:
+            config = CONFIG.replace(num_episodes=512, checkpoint_path=os.path.join(directory, 'run.pt'),
+                                    resume=True)
+            result = train(config, verbose=False)
+            self.assertTrue(os.path.exists(config.checkpoint_path))
+        self.assertEqual(result['episodes'], 512)
+
+
+class TestReinforce(unittest.TestCase):
+    """Tests for the batched REINFORCE update, the reward baseline and the exploration schedule."""
+
+    def test_update_favours_positive_advantages(self):
+        """One update raises the probability of actions with a positive advantage and lowers the others."""
+        torch.manual_seed(0)
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        optimizer = torch.optim.Adam(policy_net.parameters(), lr=1e-2)
+        states = np.tile(np.array([[2.0, 0.5, 10, 0]], dtype=np.float32), (256, 1))
+        actions = np.arange(256, dtype=np.int64) % 2 * (ACTION_SIZE - 1)  # Bets of 1 and 5 units
+        advantages = np.where(actions == ACTION_SIZE - 1, 1.0, -1.0).astype(np.float32)
+        with torch.no_grad():
+            before = policy_net(torch.from_numpy(states[:1]))[0]
+
+        reinforce_update(policy_net, optimizer, states, actions, advantages,
+                         torch.Generator().manual_seed(0), minibatch_size=64)
+
+        with torch.no_grad():
+            after = policy_net(torch.from_numpy(states[:1]))[0]
+        self.assertGreater(after[ACTION_SIZE - 1], before[ACTION_SIZE - 1])
+        self.assertLess(after[0], before[0])
+
+    def test_baseline_and_epsilon(self):
+        """The baseline follows the batch mean reward, and epsilon decays by decay**batch_size per batch."""
+        config = CONFIG.replace(num_episodes=1024, baseline_decay=0.0, epsilon_decay=0.999)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, 'run.pt')
+            train(config.replace(checkpoint_path=checkpoint_path), verbose=False)
+            checkpoint = torch.load(checkpoint_path)
+
+        # Without decay the baseline is the mean reward of the last batch
+        last_batch = checkpoint['recent_rewards'][-config.batch_size:]
+        self.assertAlmostEqual(checkpoint['baseline'], float(np.mean(last_batch)), places=5)
+        self.assertAlmostEqual(checkpoint['epsilon'], (0.999 ** config.batch_size) ** 4, places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
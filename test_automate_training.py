@@ -0,0 +1,112 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import csv
+import json
+import os
+import tempfile
+import unittest
+from agent import TrainingConfig, train
+from automate_training import sweep_configs, run_sweep, halving_budgets, successive_halving
+
+class TestSweep(unittest.TestCase):
+    """Tests for the hyperparameter sweep runner."""
+
+    def test_grid_combinations(self):
+        """Every combination of the grid values is a copy of the base configuration."""
+        base = TrainingConfig(num_episodes=1000, model_path=None)
+        configs = sweep_configs({'learning_rate': [1e-3, 1e-4], 'hidden_size': [16, 32, 64]}, base)
+        self.assertEqual(len(configs), 6)
+        self.assertEqual({(config.learning_rate, config.hidden_size) for config in configs},
+                         {(lr, hidden) for lr in (1e-3, 1e-4) for hidden in (16, 32, 64)})
+        self.assertTrue(all(config.num_episodes == 1000 for config in configs))
+
+    def test_results_are_written(self):
+        """A sweep writes one TSV line and one JSON result with a reward curve per run."""
+        base = TrainingConfig(num_episodes=2048, num_envs=128, batch_size=1024, num_workers=0,
+                              model_path=None)
+        configs = sweep_configs({'hidden_size': [8, 16], 'seed': [0]}, base)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path, tsv_path = os.path.join(directory, 'sweep.json'), os.path.join(directory, 'sweep.tsv')
+            results = run_sweep(configs, num_workers=0, json_path=json_path, tsv_path=tsv_path,
+                                model_dir=os.path.join(directory, 'models'), eval_games=5, eval_rounds=10)
+            with open(json_path, encoding='utf-8') as json_file:
+                written = json.load(json_file)
+            with open(tsv_path, encoding='utf-8') as tsv_file:
+                rows = list(csv.DictReader(tsv_file, delimiter='\t'))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'models', 'run_001.pth')))
+
+        self.assertEqual([result['index'] for result in results], [0, 1])
+        self.assertEqual([result['config']['hidden_size'] for result in written], [8, 16])
+        self.assertEqual(len(written[0]['curve']), 2)
+        self.assertEqual(sorted(row['hidden_size'] for row in rows), ['16', '8'])
+        self.assertTrue(all(float(row['wall_time']) > 0 for row in rows))
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+    """Tests for the successive-halving scheduler and the training checkpoints it resumes from."""
+
+    def test_budgets(self):
+        self.assertEqual(halving_budgets(1000, 27_000, 3), [1000, 3000, 9000, 27_000])
+        self.assertEqual(halving_budgets(1000, 20_000, 3), [1000, 3000, 9000, 20_000])
+        self.assertEqual(halving_budgets(1000, 1000, 3), [1000])
+
+    def test_resume_continues_training(self):
+        """A run resumed from its checkpoint continues the episodes, curve and exploration."""
+        config = TrainingConfig(num_episodes=1024, num_envs=128, batch_size=512, num_workers=0,
+                                model_path=None)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'run.pt')
+            first = train(config.replace(checkpoint_path=checkpoint), verbose=False)
+            resumed = train(config.replace(num_episodes=2048, checkpoint_path=checkpoint), verbose=False,
+                            resume_from=checkpoint)
+
+        self.assertEqual(first['episodes'], 1024)
+        self.assertEqual(resumed['episodes'], 2048)
+        self.assertEqual([episode for episode, _ in resumed['curve']], [1024, 2048])
+        self.assertEqual(resumed['curve'][:1], first['curve'])
+
+    def test_only_the_best_are_promoted(self):
+        """Every run trains in the first rung, and 1/eta of them in each later rung."""
+        base = TrainingConfig(num_envs=128, batch_size=512, num_workers=0, model_path=None)
+        configs = sweep_configs({'hidden_size': [8, 16, 32, 64], 'seed': [0]}, base)
+        with tempfile.TemporaryDirectory() as directory:
+            tsv_path = os.path.join(directory, 'sweep.tsv')
+            results = successive_halving(configs, min_episodes=512, max_episodes=2048, eta=2, num_workers=0,
+                                         json_path=os.path.join(directory, 'sweep.json'), tsv_path=tsv_path,
+                                         model_dir=None, checkpoint_dir=os.path.join(directory, 'checkpoints'),
+                                         eval_games=5, eval_rounds=10)
+            with open(tsv_path, encoding='utf-8') as tsv_file:
+                rows = list(csv.DictReader(tsv_file, delimiter='\t'))
+
+        self.assertEqual(sorted(result['rung'] for result in results), [0, 0, 1, 2])
+        self.assertEqual(len(rows), 4 + 2 + 1)
+        best = max(results, key=lambda result: result['rung'])
+        self.assertEqual(best['config']['num_episodes'], 2048)
+        self.assertEqual(len(best['rung_evaluations']), 3)
+        self.assertEqual(best['curve'][-1][0], 2048)
+
+    def test_identical_runs_train_once(self):
+        """Configurations that differ only in their episode count are one run."""
+        base = TrainingConfig(num_envs=128, batch_size=512, num_workers=0, model_path=None)
+        configs = sweep_configs({'num_episodes': [512, 1024, 2048], 'hidden_size': [8, 16]}, base)
+        with tempfile.TemporaryDirectory() as directory:
+            results = successive_halving(configs, min_episodes=512, max_episodes=1024, eta=2, num_workers=0,
+                                         json_path=os.path.join(directory, 'sweep.json'),
+                                         tsv_path=os.path.join(directory, 'sweep.tsv'), model_dir=None,
+                                         checkpoint_dir=os.path.join(directory, 'checkpoints'),
+                                         eval_games=5, eval_rounds=10)
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(sorted(result['config']['hidden_size'] for result in results), [8, 16])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import os
+import subprocess
+import sys
+import unittest
+from benchmark import compare_results, run_benchmarks
+
+class TestBenchmark(unittest.TestCase):
+    """Tests for the benchmark suite."""
+
+    def test_compare_results(self):
+        """Rates regress when they drop and latencies when they grow beyond the tolerance."""
+        baseline = {'metrics': {'env.scalar': {'value': 100.0, 'unit': 'rounds/s'},
+                                'deck.deal': {'value': 100.0, 'unit': 'ns'},
+                                'strategy.hard': {'value': 100.0, 'unit': 'ns'}}}
+        results = {'metrics': {'env.scalar': {'value': 80.0, 'unit': 'rounds/s'},
+                               'deck.deal': {'value': 50.0, 'unit': 'ns'},
+                               'strategy.hard': {'value': 110.0, 'unit': 'ns'},
+                               'env.vector': {'value': 1.0, 'unit': 'rounds/s'}}}
+        comparison = compare_results(results, baseline, tolerance=0.15)
+
+        self.assertNotIn('env.vector', comparison)
+        self.assertTrue(comparison['env.scalar']['regression'])
+        self.assertAlmostEqual(comparison['deck.deal']['speedup'], 2.0)
+        self.assertFalse(comparison['deck.deal']['regression'])
+        self.assertFalse(comparison['strategy.hard']['regression'])
+
+    def test_run_benchmarks(self):
+        """A quick run reports positive values for every metric it measures."""
+        results = run_benchmarks(['deck', 'strategy'], scale=0.05)
+        self.assertIn('deck.deal', results['metrics'])
+        self.assertTrue(all(entry['value'] > 0 for entry in results['metrics'].values()))
+
+    def test_advisor_starts_without_torch_or_gym(self):
+        """The advisor imports none of the heavy dependencies before its first prompt."""
+        code = ("import sys, intepret_count; "
+                "print(','.join(m for m in ('torch', 'gym', 'pandas') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.stdout.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
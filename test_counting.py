@@ -0,0 +1,52 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import unittest
+import numpy as np
+from cards import ShoeTracker, COUNT_VALUES, RANKS
+from counting import COUNTING_SYSTEMS, get_counting_system, tag_matrix
+from blackjack_env import BlackjackEnv
+
+class TestCountingSystems(unittest.TestCase):
+    """Tests for the counting-system registry."""
+
+    def test_registry(self):
+        """Hi-Lo matches the environment's count, and balance is derived from the tags."""
+        hi_lo = get_counting_system('hi_lo')
+        self.assertEqual(hi_lo.tags.tolist(), [COUNT_VALUES[rank] for rank in RANKS])
+        self.assertFalse(get_counting_system('ko').balanced)
+        self.assertTrue(all(system.balanced for name, system in COUNTING_SYSTEMS.items() if name != 'ko'))
+        with self.assertRaises(ValueError):
+            get_counting_system('red_seven_typo')
+
+    def test_tag_matrix_matches_card_by_card_counts(self):
+        """The rank tag matrix applied to the seen cards equals summing code tags card by card."""
+        names = list(COUNTING_SYSTEMS)
+        by_code = tag_matrix(names, by_code=True)
+        self.assertEqual(tag_matrix(names).shape, (13, len(names)))
+        tracker = ShoeTracker(num_decks=2)
+        codes = np.random.default_rng(0).permutation(np.tile(np.arange(52), 2))[:60]
+        tracker.observe_codes(codes.tolist())
+        np.testing.assert_allclose(tracker.system_counts(tag_matrix(names)), by_code[codes].sum(axis=0))
+        self.assertEqual(tracker.system_counts(tag_matrix(['hi_lo']))[0], tracker.running_count)
+
+    def test_ace_count_is_unseen_ace_surplus(self):
+        """The ace side count measures the unseen aces above their share of the unseen cards."""
+        env = BlackjackEnv(num_decks=2, seed=1, count_systems=['aces'])
+        for _ in range(20):
+            env.reset()
+            observation, _, _, _ = env.step(0)
+            tracker = env.shoe_tracker
+            surplus = tracker.aces_remaining - tracker.remaining / 13
+            self.assertAlmostEqual(observation[4], surplus / max(1, tracker.decks_remaining), places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import unittest
+import numpy as np
+from blackjack_env import Deck
+from ev_engine import (EVEngine, BUST, BLACKJACK, composition_from_codes,
+                       full_shoe_composition)
+from vector_env import VectorBlackjackEnv
+
+class TestEVEngine(unittest.TestCase):
+    """Tests for the EVEngine class."""
+
+    def test_composition_from_codes(self):
+        """A full shoe counts four of each value per deck and sixteen tens."""
+        deck = Deck(num_decks=2)
+        self.assertEqual(composition_from_codes(deck.shoe), full_shoe_composition(2))
+
+    def test_dealer_probabilities(self):
+        """Dealer outcomes form a distribution; only a Ten or Ace upcard can make a blackjack."""
+        engine = EVEngine()
+        composition = full_shoe_composition(8)
+        for upcard in range(2, 12):
+            probabilities = engine.dealer_probabilities(composition, upcard)
+            self.assertAlmostEqual(sum(probabilities), 1.0)
+            if upcard < 10:
+                self.assertEqual(probabilities[BLACKJACK], 0.0)
+        self.assertAlmostEqual(engine.dealer_probabilities(composition, 6)[BUST], 0.42, places=2)
+
+    def test_blackjack_and_stand_values(self):
+        """A natural pays 3:2 unless the dealer has one; a pair of tens stands."""
+        engine = EVEngine()
+        composition = (4, 4, 4, 4, 3, 4, 4, 4, 15, 3)  # one deck without an Ace, a Ten and a 6
+        self.assertAlmostEqual(engine.hand_ev(composition, 11, 10, 6), 1.5)
+        composition = (4, 4, 4, 4, 3, 4, 4, 4, 14, 4)  # one deck without two Tens and a 6
+        self.assertAlmostEqual(engine.hand_ev(composition, 10, 10, 6),
+                               engine.stand_ev(composition, 6, 20))
+
+    def test_matches_simulation(self):
+        """The exact round EV of a fresh single-deck shoe agrees with the simulator."""
+        expected = EVEngine().round_ev(full_shoe_composition(1))
+
+        env = VectorBlackjackEnv(num_envs=8192, num_decks=1, seed=11)
+        actions = np.zeros(env.num_envs, dtype=np.int64)
+        rewards = []
+        for _ in range(50):
+            env.cursors[:] = env.shoe_size  # Force a fresh shoe every round
+            env.reset()
+            rewards.append(env.step(actions)[1])
+        rewards = np.concatenate(rewards)
+        tolerance = 5 * rewards.std() / np.sqrt(rewards.size)
+        self.assertAlmostEqual(rewards.mean(), expected, delta=tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import torch
+from agent import PolicyNetwork, STATE_SIZE, ACTION_SIZE
+from evaluation import (evaluate_policy, sample_actions, summarize, ShoeReplay, replay_policy,
+                        compare_policies)
+
+class TestEvaluation(unittest.TestCase):
+    """Tests for the parallel evaluator."""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+
+    def test_reproducible_for_any_worker_count(self):
+        """The same seed gives the same profits in-process and on a process pool."""
+        in_process = evaluate_policy(self.policy_net, num_games=120, rounds_per_game=20,
+                                     seed=5, num_workers=0)
+        pooled = evaluate_policy(self.policy_net, num_games=120, rounds_per_game=20,
+                                 seed=5, num_workers=2)
+        np.testing.assert_array_equal(in_process, pooled)
+
+        other_seed = evaluate_policy(self.policy_net, num_games=120, rounds_per_game=20,
+                                     seed=6, num_workers=0)
+        self.assertFalse(np.array_equal(in_process, other_seed))
+
+    def test_sample_actions(self):
+        """Inverse-CDF sampling picks the action whose cumulative probability covers the draw."""
+        probs = np.array([[0.2, 0.3, 0.5], [1.0, 0.0, 0.0]])
+        np.testing.assert_array_equal(sample_actions(probs, np.array([0.45, 0.99])), [1, 0])
+        np.testing.assert_array_equal(sample_actions(probs, np.array([0.999999, 0.0])), [2, 0])
+
+    def test_summarize(self):
+        """The summary brackets the mean with its confidence interval."""
+        summary = summarize([10.0, -10.0, 20.0, 0.0], rounds_per_game=10)
+        self.assertEqual(summary['mean'], 5.0)
+        self.assertEqual(summary['per_round'], 0.5)
+        self.assertLess(summary['ci_low'], 5.0)
+        self.assertGreater(summary['ci_high'], 5.0)
+
+    def test_replay_matches_evaluation(self):
+        """Replaying recorded shoes gives the profits of a live evaluation with the same seed."""
+        replay = ShoeReplay.record(num_games=60, rounds_per_game=30, seed=2)
+        live = evaluate_policy(self.policy_net, num_games=60, rounds_per_game=30, seed=2, num_workers=0)
+        np.testing.assert_allclose(replay_policy(self.policy_net, replay), live)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'replay.npz')
+            replay.save(path)
+            np.testing.assert_allclose(replay_policy(self.policy_net, ShoeReplay.load(path)), live)
+
+    def test_compare_policies_is_paired(self):
+        """Policies are compared on the same rounds, so the paired differences add up exactly."""
+        other = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        replay = ShoeReplay.record(num_games=40, rounds_per_game=20, seed=1)
+        results = compare_policies({'a': self.policy_net, 'b': other}, replay)
+        self.assertEqual(results['a']['difference']['std'], 0.0)
+        self.assertAlmostEqual(results['b']['difference']['mean'],
+                               results['b']['profit']['mean'] - results['a']['profit']['mean'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,12 @@
 
 import unittest
 from unittest.mock import patch
-from blackjack_env import Card, Deck  # Update with the actual module import if needed
+import numpy as np
+from blackjack_env import Card, Deck, Hand, ShoeTracker, BlackjackEnv, CODE_COUNTS
+from ev_engine import composition_from_codes, full_shoe_composition
+from basic_strategy import (STAND, HIT, DOUBLE, SPLIT, HARD_TABLE, SOFT_TABLE,
+                            PAIR_TABLE, hard_total_action, soft_total_action,
+                            compile_deviations, true_count_bucket, TRUE_COUNT_MIN)  # Update with the actual module import if needed
 
 class TestCard(unittest.TestCase):
     """Tests for the Card class."""
@@ -79,6 +84,174 @@ class TestDeck(unittest.TestCase):
         # After dealing all cards, the deck should rebuild
         self.assertTrue(len(deck.cards) > 0)
 
+    def test_deck_seeded_shuffle(self):
+        """Two shoes built from the same seed deal the same card sequence."""
+        deck_a = Deck(num_decks=8, seed=42)
+        deck_b = Deck(num_decks=8, seed=42)
+        self.assertEqual(deck_a.shoe.tolist(), deck_b.shoe.tolist())
+        self.assertEqual([deck_a.deal_code() for _ in range(20)],
+                         [deck_b.deal_code() for _ in range(20)])
+
+    def test_deck_reshuffle_restores_full_shoe(self):
+        """reshuffle returns every dealt card to the shoe without rebuilding it."""
+        deck = Deck(num_decks=2, seed=0)
+        shoe = deck.shoe
+        for _ in range(30):
+            deck.deal_code()
+        self.assertEqual(len(deck), 74)
+        deck.reshuffle()
+        self.assertEqual(len(deck), 104)
+        self.assertIs(deck.shoe, shoe)
+        self.assertEqual(sorted(deck.shoe.tolist()), sorted(list(range(52)) * 2))
+
+
+class TestHand(unittest.TestCase):
+    """Tests for the Hand class."""
+
+    def test_hand_values_from_codes(self):
+        """Hand totals and soft aces are tracked from integer card codes."""
+        hand = Hand()
+        hand.add_card(Card('A', '♠'))
+        hand.add_card(Card('6', '♥'))
+        self.assertEqual((hand.value, hand.aces), (17, 1))
+        hand.add_card(Card('9', '♦'))
+        self.assertEqual((hand.value, hand.aces), (16, 0))
+        self.assertEqual(str(hand), "A♠, 6♥, 9♦")
+
+    def test_hand_can_split_ten_values(self):
+        """Any two ten-valued cards form a pair."""
+        hand = Hand()
+        hand.add_card(Card('K', '♣'))
+        hand.add_card(Card('10', '♥'))
+        self.assertTrue(hand.can_split())
+
+
+class TestShoeTracker(unittest.TestCase):
+    """Tests for the ShoeTracker class."""
+
+    def test_tracks_composition_and_counts(self):
+        """Seen cards update the rank counts, running count and true count."""
+        tracker = ShoeTracker(num_decks=2)
+        self.assertEqual(tracker.composition(), full_shoe_composition(2))
+        for rank in ['A', 'K', '5', '5', '10']:
+            tracker.observe_rank(rank)
+        self.assertEqual((tracker.cards_seen, tracker.remaining), (5, 99))
+        self.assertEqual((tracker.running_count, tracker.aces_remaining), (-1, 7))
+        self.assertEqual(tracker.composition()[10 - 2], 30)
+        self.assertAlmostEqual(tracker.true_count, -1 / (99 / 52))
+        tracker.reset()
+        self.assertEqual((tracker.running_count, tracker.remaining), (0, 104))
+
+
+class TestBlackjackEnv(unittest.TestCase):
+    """Tests for the BlackjackEnv class."""
+
+    def rig_shoe(self, env, ranks):
+        """Put the given ranks on top of the shoe, in dealing order."""
+        top = np.array([Card(rank, '♠').code for rank in ranks], dtype=np.int8)
+        env.deck.shoe = np.concatenate([top, env.deck.shoe[len(top):]])
+        env.deck.cursor = 0
+
+    def test_split_hands_are_settled(self):
+        """Both hands of a split are played and paid, including a double after split."""
+        env = BlackjackEnv(num_decks=8)
+        # Player 8 8, dealer 10 7; split hands draw 3 (then doubles on 10) and 10
+        self.rig_shoe(env, ['8', '8', '10', '7', '3', '10', '10'])
+        env.reset()
+        _, reward, done, _ = env.step(0)
+
+        self.assertEqual(len(env.player_hands), 2)
+        self.assertEqual([hand.value for hand in env.player_hands], [21, 18])
+        self.assertTrue(env.player_hands[0].doubled)
+        self.assertEqual(reward, 3)
+        self.assertTrue(done)
+
+    def test_seats_share_the_shoe(self):
+        """Seats are dealt and play in seat order from one shoe; a filler seat bets one unit."""
+        env = BlackjackEnv(num_decks=8, num_seats=2, policy_seats=(1,))
+        # Seat 0: 10 2, seat 1: 10 9, dealer 10 7; seat 0 hits 12 v 10 and draws a 9
+        self.rig_shoe(env, ['10', '2', '10', '9', '10', '7', '9'])
+        env.reset()
+        _, reward, done, _ = env.step(2)
+
+        self.assertEqual([hand.value for hand in env.player_hands], [19])
+        self.assertEqual([hands[0].value for hands in env.seat_hands], [21, 19])
+        self.assertEqual(env.seat_rewards, [1, 3])
+        self.assertEqual(reward, 3)
+
+    def test_seeded_reset_replays_rounds(self):
+        """The same seed deals the same rounds, from the constructor or from reset()."""
+        def play(env, seed=None):
+            rewards = []
+            for round_num in range(30):
+                env.reset(seed=seed if round_num == 0 else None)
+                rewards.append(env.step(round_num % 5)[1])
+            return rewards
+
+        seeded = play(BlackjackEnv(num_decks=1, seed=3))
+        env = BlackjackEnv(num_decks=1, seed=4)
+        play(env)
+        self.assertEqual(play(env, seed=3), seeded)
+        self.assertNotEqual(play(BlackjackEnv(num_decks=1, seed=4)), seeded)
+
+    def test_deviations_follow_true_count(self):
+        """With deviations, 16 v 10 stands at a positive true count and hits at a negative one."""
+        env = BlackjackEnv(num_decks=8, deviations=True)
+        for true_count, expected_cards in ((2.0, 2), (-2.0, 3)):
+            # Player 10 6, dealer 10 7, next card a 2
+            self.rig_shoe(env, ['10', '6', '10', '7', '2'])
+            env.reset()
+            env.true_count = true_count
+            env.step(0)
+            self.assertEqual(len(env.player_hands[0].codes), expected_cards)
+
+    def test_shoe_tracker_matches_shoe(self):
+        """After every round the tracker holds exactly the undealt cards, across reshuffles."""
+        env = BlackjackEnv(num_decks=1, seed=5)
+        for round_num in range(200):
+            env.reset()
+            if round_num % 25 == 0:
+                # Burn all but one card, so the shoe runs out mid-round
+                env.shoe_tracker.observe_codes(env.deck.shoe[env.deck.cursor:-1].tolist())
+                env.deck.cursor = env.deck.shoe.size - 1
+            env.step(0)
+            deck = env.deck
+            self.assertEqual(env.shoe_tracker.composition(), composition_from_codes(deck.shoe[deck.cursor:]))
+            self.assertEqual(env.count, sum(CODE_COUNTS[code] for code in deck.shoe[:deck.cursor].tolist()))
+            self.assertAlmostEqual(env.true_count, env.count / max(1, len(deck) / 52))
+
+
+class TestBasicStrategy(unittest.TestCase):
+    """Tests for the compiled basic strategy tables."""
+
+    def test_tables_match_csv(self):
+        """Spot-check compiled cells against the strategy CSVs."""
+        self.assertEqual(HARD_TABLE[11, 10], DOUBLE)
+        self.assertEqual(HARD_TABLE[12, 4], STAND)
+        self.assertEqual(SOFT_TABLE[18, 3], DOUBLE)
+        self.assertEqual(SOFT_TABLE[18, 9], HIT)
+        self.assertEqual(PAIR_TABLE[11, 11], SPLIT)
+        self.assertEqual(PAIR_TABLE[9, 7], STAND)
+
+    def test_unsupported_and_missing_cells(self):
+        """Surrender cells become stands and totals outside the CSVs use the defaults."""
+        self.assertEqual(hard_total_action(16, 10), STAND)
+        self.assertEqual(hard_total_action(4, 6), STAND)
+        self.assertEqual(soft_total_action(21, 6), STAND)
+        self.assertFalse(HARD_TABLE.flags.writeable)
+
+    def test_deviations_switch_at_index(self):
+        """Index plays take their action from the index up, and leave other cells alone."""
+        hard, soft, pairs = compile_deviations()
+        self.assertEqual(hard[16, 10, true_count_bucket(-0.5)], HIT)
+        self.assertEqual(hard[16, 10, true_count_bucket(0.0)], STAND)
+        self.assertEqual(pairs[10, 6, true_count_bucket(3.9)], STAND)
+        self.assertEqual(pairs[10, 6, true_count_bucket(4.2)], SPLIT)
+        self.assertEqual(hard[12, 2, true_count_bucket(25)], STAND)
+        self.assertEqual(true_count_bucket(-25), 0)
+        np.testing.assert_array_equal(soft[:, :, -TRUE_COUNT_MIN], SOFT_TABLE)
+        np.testing.assert_array_equal(hard[17], np.repeat(HARD_TABLE[17][:, None], hard.shape[2], axis=1))
+
 
 if __name__ == '__main__':
     unittest.main()
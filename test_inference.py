@@ -0,0 +1,64 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import unittest
+import numpy as np
+import torch
+from agent import PolicyNetwork, STATE_SIZE, ACTION_SIZE
+from inference import InferencePolicy, sample_actions, BACKENDS
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(-10, 10, n), rng.random(n), rng.integers(2, 12, n), np.zeros(n)],
+                    axis=1).astype(np.float32)
+
+class TestInferencePolicy(unittest.TestCase):
+    """Tests for the batched inference path."""
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 32).eval()
+        self.states = random_states(256)
+        with torch.no_grad():
+            self.expected = self.policy_net(torch.from_numpy(self.states)).numpy()
+
+    def test_backends_match_the_network(self):
+        for backend in ('numpy', 'torch', 'script'):
+            policy = InferencePolicy(self.policy_net, backend)
+            np.testing.assert_allclose(policy.probabilities(self.states), self.expected, atol=1e-6,
+                                       err_msg=backend)
+            np.testing.assert_allclose(policy.probabilities(self.states[3]), self.expected[3], atol=1e-6,
+                                       err_msg=backend)
+
+    def test_sampling(self):
+        """Batches and single states sample by inverse CDF from the given uniforms."""
+        policy = InferencePolicy(self.policy_net)
+        uniforms = np.random.default_rng(1).random(len(self.states))
+        actions = policy.sample(self.states, uniforms)
+        np.testing.assert_array_equal(actions, sample_actions(self.expected, uniforms))
+        self.assertEqual(int(policy.sample(self.states[5], uniforms[5])), actions[5])
+        np.testing.assert_array_equal(policy.greedy(self.states), self.expected.argmax(axis=1))
+
+    def test_refresh_reads_new_weights(self):
+        policy = InferencePolicy(self.policy_net)
+        with torch.no_grad():
+            self.policy_net.action_head.bias[0] += 100.0
+        self.assertFalse((policy.greedy(self.states) == 0).all())
+        policy.refresh()
+        self.assertTrue((policy.greedy(self.states) == 0).all())
+
+    def test_unknown_backend(self):
+        self.assertNotIn('onnx', BACKENDS)
+        with self.assertRaises(ValueError):
+            InferencePolicy(self.policy_net, 'onnx')
+
+
+if __name__ == '__main__':
+    unittest.main()
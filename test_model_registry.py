@@ -0,0 +1,133 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import json
+import os
+import tempfile
+import unittest
+import torch
+from agent import PolicyNetwork, TrainingConfig, STATE_SIZE, ACTION_SIZE
+from model_registry import ModelRegistry, best_model_path, feature_spec, INDEX_FILE
+from table_rules import DEFAULT_RULES
+
+def network(hidden_size=8, state_size=STATE_SIZE, seed=0):
+    torch.manual_seed(seed)
+    return PolicyNetwork(state_size, ACTION_SIZE, hidden_size)
+
+
+def evaluation(per_round):
+    return {'games': 10, 'mean': per_round * 250, 'per_round': per_round, 'rounds': 250, 'seed': 0}
+
+class TestModelRegistry(unittest.TestCase):
+    """Tests for the model registry."""
+
+    def test_register_and_load(self):
+        """A registered network loads back with its weights, and its sidecar holds the metadata."""
+        policy_net = network()
+        config = TrainingConfig(num_episodes=1000, hidden_size=8, model_path=None)
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root)
+            name = registry.register(policy_net, 'small', config=config, evaluation=evaluation(0.1),
+                                     timings={'wall_time': 1.5, 'episodes': 1000})
+            metadata = ModelRegistry(root).metadata(name)
+            loaded = ModelRegistry(root).load(name)
+
+        self.assertEqual(metadata['architecture'], {'state_size': STATE_SIZE, 'hidden_size': 8,
+                                                    'action_size': ACTION_SIZE})
+        self.assertEqual(metadata['config']['num_episodes'], 1000)
+        self.assertEqual(metadata['rules']['num_decks'], config.table_rules.num_decks)
+        self.assertEqual(metadata['seed'], config.seed)
+        self.assertEqual(metadata['timings']['wall_time'], 1.5)
+        for key, weights in policy_net.state_dict().items():
+            self.assertTrue(torch.equal(weights, loaded.state_dict()[key]), key)
+
+    def test_best_model_per_feature_spec(self):
+        """
+        The index names the best evaluated model of every feature spec; unevaluated models,
+        and models of the same width trained on other features, never win.
+        """
+        hilo = feature_spec(STATE_SIZE, rules=DEFAULT_RULES)
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root)
+            registry.register(network(), 'low', rules=DEFAULT_RULES, evaluation=evaluation(0.1))
+            registry.register(network(), 'high', rules=DEFAULT_RULES, evaluation=evaluation(0.3))
+            registry.register(network(), 'unscored', rules=DEFAULT_RULES)
+            registry.register(network(), 'six_decks', rules=DEFAULT_RULES.replace(num_decks=6),
+                              evaluation=evaluation(0.9))
+            registry.register(network(), 'deviations', rules=DEFAULT_RULES, deviations=True,
+                              evaluation=evaluation(0.8))
+            registry.register(network(state_size=6), 'zen', rules=DEFAULT_RULES, count_systems=('zen', 'aces'),
+                              evaluation=evaluation(0.5))
+            self.assertEqual(registry.best(hilo), 'high')
+            self.assertEqual(registry.best(feature_spec(6, ('zen', 'aces'))), 'zen')
+            self.assertIsNone(registry.best(feature_spec(6, ('ko', 'aces'))))
+            self.assertEqual(registry.best(), 'six_decks')
+            self.assertEqual(registry.features('six_decks')['rules']['num_decks'], 6)
+
+            registry.set_evaluation('low', evaluation(0.4))
+            reopened = ModelRegistry(root)
+            self.assertEqual(reopened.best(hilo), 'low')
+            self.assertEqual(best_model_path(hilo, root), os.path.join(root, 'low.pth'))
+
+            with open(os.path.join(root, INDEX_FILE), encoding='utf-8') as index_file:
+                index = json.load(index_file)
+            os.remove(os.path.join(root, INDEX_FILE))
+            reopened = ModelRegistry(root)
+            reopened.rebuild_index()
+            self.assertEqual(reopened.index, index)
+
+    def test_unknown_features_never_win(self):
+        """A sidecar that does not record its table rules is listed but never the best."""
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root)
+            registry.register(network(), 'unknown', evaluation=evaluation(0.5))
+            self.assertIn('unknown', registry)
+            self.assertIsNone(registry.features('unknown'))
+            self.assertIsNone(registry.best())
+
+    def test_evaluation_uses_the_recorded_features(self):
+        """A model is evaluated under its own rules, and refused when its features cannot be played."""
+        from evaluation import evaluate_policy, summarize
+
+        six_decks = DEFAULT_RULES.replace(num_decks=6)
+        policy_net = network()
+        with tempfile.TemporaryDirectory() as root:
+            registry = ModelRegistry(root)
+            registry.register(policy_net, 'six_decks', rules=six_decks)
+            scored = registry.evaluate('six_decks', num_games=8, rounds_per_game=20, num_workers=0)
+            registry.register(network(state_size=6), 'zen', rules=DEFAULT_RULES, count_systems=('zen', 'aces'))
+            registry.register(network(), 'unknown')
+            for name in ('zen', 'unknown'):
+                with self.assertRaises(ValueError):
+                    registry.evaluate(name, num_games=8, rounds_per_game=20, num_workers=0)
+
+        profits = evaluate_policy(policy_net, 8, 20, seed=0, num_workers=0, rules=six_decks)
+        self.assertEqual(scored['per_round'], summarize(profits, 20)['per_round'])
+
+    def test_existing_file_is_kept_in_place(self):
+        """A weights file already in the registry directory is registered without a copy."""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'legacy.0001pth')
+            torch.save(network().state_dict(), path)
+            registry = ModelRegistry(root)
+            registry.register(path, 'legacy')
+            self.assertEqual(registry.weights_path('legacy'), path)
+            self.assertEqual(sorted(os.listdir(root)), [INDEX_FILE, 'legacy.0001pth', 'legacy.json'])
+
+    def test_empty_registry_falls_back(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.assertEqual(best_model_path(feature_spec(STATE_SIZE), root, default='fallback.pth'),
+                             'fallback.pth')
+            with self.assertRaises(ValueError):
+                ModelRegistry(root).load()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from blackjack_env import BlackjackEnv
+from vector_env import VectorBlackjackEnv
+from profiler import Profiler
+
+class TestProfiler(unittest.TestCase):
+    """Tests for the opt-in profiler."""
+
+    def test_instrumented_env_plays_the_same(self):
+        """Instrumentation records phases and counters without changing the rounds."""
+        plain, instrumented = BlackjackEnv(num_decks=1, seed=5), BlackjackEnv(num_decks=1, seed=5)
+        profiler = Profiler(trace=True)
+        profiler.instrument_env(instrumented)
+        for round_num in range(100):
+            for env in (plain, instrumented):
+                env.reset()
+            self.assertEqual(plain.step(round_num % 5)[1], instrumented.step(round_num % 5)[1])
+
+        self.assertEqual(profiler.counters['rounds'], 100)
+        self.assertGreater(profiler.counters['reshuffles'], 0)
+        self.assertEqual(profiler.timings['step'][0], 100)
+        self.assertGreaterEqual(profiler.counters['cards_dealt'], 400)
+        lookups = sum(value for name, value in profiler.counters.items() if name.startswith('strategy_lookups'))
+        self.assertEqual(lookups, profiler.timings['strategy'][0])
+        self.assertIn('player_play', profiler.summary())
+
+        profiler.uninstrument()
+        self.assertNotIn('step', vars(instrumented))
+        self.assertNotIn('deal_code', vars(instrumented.deck))
+
+    def test_vector_env_and_chrome_trace(self):
+        """A vector env can be instrumented and its calls exported as a Chrome trace."""
+        env = VectorBlackjackEnv(num_envs=16, seed=0)
+        profiler = Profiler(trace=True)
+        profiler.instrument_env(env)
+        with profiler.phase('rollout'):
+            for _ in range(3):
+                env.reset()
+                env.step(np.zeros(16, dtype=np.int64))
+        self.assertEqual(profiler.counters['rounds'], 48)
+        # The rollout phase includes every env call, so it has almost no time of its own
+        calls, inclusive, exclusive = profiler.timings['rollout']
+        self.assertLess(exclusive, inclusive)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'trace.json')
+            profiler.write_chrome_trace(path)
+            with open(path, encoding='utf-8') as trace_file:
+                events = json.load(trace_file)['traceEvents']
+        self.assertIn('step', {event['name'] for event in events if event['ph'] == 'X'})
+        self.assertIn('cards_dealt', {event['name'] for event in events if event['ph'] == 'C'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import unittest
+import numpy as np
+from agent import PolicyNetwork, STATE_SIZE, ACTION_SIZE
+from rollout import RolloutWorkers, collect_rollout
+from vector_env import VectorBlackjackEnv
+
+class TestRollout(unittest.TestCase):
+    """Tests for rollout collection."""
+
+    def test_collect_rollout_fills_buffers(self):
+        """Every round of the rollout lands in the buffers with a valid bet."""
+        env = VectorBlackjackEnv(num_envs=32, seed=0)
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        states = np.zeros((96, STATE_SIZE), dtype=np.float32)
+        actions = np.full(96, -1, dtype=np.int64)
+        rewards = np.zeros(96, dtype=np.float32)
+
+        collect_rollout(env, policy_net, 0.5, states, actions, rewards, np.random.default_rng(0))
+
+        self.assertTrue(((actions >= 0) & (actions < ACTION_SIZE)).all())
+        self.assertTrue((states[:, 2] >= 2).all())  # Dealer upcard value
+        self.assertTrue(np.any(rewards != 0))
+
+    def test_collect_rollout_is_seeded(self):
+        """The same env and rng seeds collect the same rounds and bets."""
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        runs = []
+        for _ in range(2):
+            env = VectorBlackjackEnv(num_envs=32, seed=4)
+            buffers = (np.zeros((64, STATE_SIZE), dtype=np.float32), np.zeros(64, dtype=np.int64),
+                       np.zeros(64, dtype=np.float32))
+            collect_rollout(env, policy_net, 0.2, *buffers, np.random.default_rng(9))
+            runs.append(buffers)
+        for first, second in zip(*runs):
+            np.testing.assert_array_equal(first, second)
+
+    def test_workers_share_buffers(self):
+        """Workers write independent rounds into their own slice of the shared batch."""
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        with RolloutWorkers(policy_net, num_workers=2, num_envs=16, steps_per_rollout=2, seed=3) as workers:
+            workers.publish(policy_net)
+            states, actions, rewards = workers.collect(epsilon=1.0)
+            self.assertEqual(states.shape, (64, STATE_SIZE))
+            self.assertTrue((states[:, 2] >= 2).all())
+            # Independent seeds: the two workers do not deal the same rounds
+            self.assertFalse(np.array_equal(states[:32], states[32:]))
+
+    def test_worker_state_replays_rollouts(self):
+        """Restoring the workers' state deals and samples the same rounds again."""
+        policy_net = PolicyNetwork(STATE_SIZE, ACTION_SIZE, 16)
+        with RolloutWorkers(policy_net, num_workers=2, num_envs=16, steps_per_rollout=2, seed=3) as workers:
+            workers.publish(policy_net)
+            workers.collect(epsilon=0.5)
+            state = workers.get_state()
+            first = [buffer.copy() for buffer in workers.collect(epsilon=0.5)]
+            workers.set_state(state)
+            second = workers.collect(epsilon=0.5)
+            for buffer, replayed in zip(first, second):
+                np.testing.assert_array_equal(buffer, replayed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from blackjack_env import BlackjackEnv
+from sim_log import SimulationLogWriter, read_simulation_log, remaining_shoe, round_rows
+
+class TestSimulationLog(unittest.TestCase):
+    """Tests for the columnar simulation log."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'run.dtlog')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        """Rounds, cards and shoe snapshots read back exactly, across several flushes."""
+        env = BlackjackEnv(num_decks=1)
+        expected_rewards, expected_shoes, expected_players, expected_counts = [], [], [], []
+        with SimulationLogWriter(self.path, flush_every=7) as log:
+            for round_num in range(60):
+                env.reset()
+                log.log_shoe(env.deck)
+                expected_shoes.append(env.deck.shoe[env.deck.cursor:].copy())
+                _, reward, _, _ = env.step(round_num % 5)
+                log.log_round(1, round_num + 1, round_num % 5 + 1, reward, env)
+                expected_rewards.append(reward)
+                expected_counts.append(env.count)
+                expected_players.append("|".join(";".join(str(card) for card in hand.cards)
+                                                 for hand in env.player_hands))
+
+        log = read_simulation_log(self.path)
+        rounds = log['rounds']
+        self.assertEqual(len(rounds['game']), 60)
+        np.testing.assert_allclose(rounds['reward'], expected_rewards)
+        np.testing.assert_array_equal(rounds['round'], np.arange(1, 61))
+        np.testing.assert_array_equal(rounds['running_count'], expected_counts)
+        # A single deck reshuffles several times in 60 rounds; each shoe is stored once
+        self.assertGreater(len(log['shoes']['shoe_id']), 1)
+        self.assertLess(len(log['shoes']['shoe_id']), 60)
+        for i in range(60):
+            np.testing.assert_array_equal(remaining_shoe(log, i), expected_shoes[i])
+
+        rows = round_rows(log)
+        self.assertEqual([row[4] for row in rows], expected_players)
+        self.assertEqual(rows[0][:3], [1, 1, 1])
+
+    def test_split_hands(self):
+        """Every hand of a split round is logged, with its own cards and value."""
+        env = BlackjackEnv(num_decks=1, seed=0)
+        expected_players, expected_values = [], []
+        with SimulationLogWriter(self.path) as log:
+            for round_num in range(400):
+                env.reset()
+                log.log_shoe(env.deck)
+                _, reward, _, _ = env.step(0)
+                log.log_round(1, round_num + 1, 1, reward, env)
+                expected_players.append("|".join(";".join(str(card) for card in hand.cards)
+                                                 for hand in env.player_hands))
+                expected_values.append([hand.value for hand in env.player_hands])
+
+        log = read_simulation_log(self.path)
+        hands = log['rounds']['hands']
+        self.assertGreater((hands > 1).sum(), 0)
+        self.assertEqual(len(log['rounds']['player_value']), hands.sum())
+        rows = round_rows(log)
+        self.assertEqual([row[4] for row in rows], expected_players)
+        split = int(np.argmax(hands > 1))
+        self.assertEqual(rows[split][5], "|".join(map(str, expected_values[split])))
+
+    def test_rejects_other_files(self):
+        """Reading a file that is not a simulation log raises ValueError."""
+        with open(self.path, 'wb') as other:
+            np.lib.format.write_array(other, np.zeros(3))
+        with self.assertRaises(ValueError):
+            read_simulation_log(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
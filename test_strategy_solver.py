@@ -0,0 +1,71 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import os
+import tempfile
+import unittest
+from basic_strategy import STAND, HIT, DOUBLE, SPLIT, compile_table
+from ev_engine import EVEngine, full_shoe_composition
+from strategy_solver import StrategySolver, write_strategy_csvs
+from table_rules import TableRules
+
+SINGLE_DECK = TableRules(num_decks=1)
+
+def without(composition, *values):
+    """A composition with one card of each given value removed."""
+    composition = list(composition)
+    for value in values:
+        composition[value - 2] -= 1
+    return tuple(composition)
+
+
+class TestStrategySolver(unittest.TestCase):
+    """Tests for the StrategySolver class."""
+
+    def test_optimal_play_is_at_least_table_play(self):
+        """Optimal stand/hit values agree with EVEngine on standing and never lose to the tables."""
+        composition = without(full_shoe_composition(1), 10, 6, 10)
+        solver, engine = StrategySolver(SINGLE_DECK), EVEngine(rules=SINGLE_DECK)
+        evs = solver.action_evs(composition, 10, 16, False)
+        self.assertAlmostEqual(evs[STAND], engine.stand_ev(composition, 10, 16))
+        self.assertGreaterEqual(solver.best_ev(composition, 10, 16, False, 2) + 1e-12,
+                                engine._play_ev(composition, 10, 16, False, 2, False))
+        self.assertEqual(max(evs[STAND], evs[HIT]), solver.best_ev(composition, 10, 16, False, 2))
+
+    def test_rules_change_the_values(self):
+        """Eights split against a 6, and the charlie and split-ace rules change the values."""
+        composition = without(full_shoe_composition(1), 8, 8, 6)
+        evs = StrategySolver(SINGLE_DECK).pair_evs(composition, 8, 6)
+        self.assertEqual(max(evs, key=evs.get), SPLIT)
+
+        composition = without(full_shoe_composition(1), 11, 11, 6)
+        one_card = StrategySolver(SINGLE_DECK).pair_evs(composition, 11, 6)[SPLIT]
+        drawing = StrategySolver(SINGLE_DECK.replace(split_aces_one_card=False)).pair_evs(composition, 11, 6)[SPLIT]
+        self.assertGreater(drawing, one_card)
+
+        composition = without(full_shoe_composition(1), 2, 3, 10)
+        charlie = StrategySolver(SINGLE_DECK).best_ev(composition, 10, 12, False, 5)
+        no_charlie = StrategySolver(SINGLE_DECK.replace(charlie_cards=0)).best_ev(composition, 10, 12, False, 5)
+        self.assertGreater(charlie, no_charlie)
+
+    def test_csv_round_trip(self):
+        """Written tables compile back to the solved actions, missing cells as stands."""
+        tables = {'hard': {11: {10: DOUBLE}, 16: {10: HIT}}, 'soft': {18: {9: HIT}}, 'pair': {8: {6: SPLIT}}}
+        with tempfile.TemporaryDirectory() as directory:
+            write_strategy_csvs(tables, directory)
+            hard = compile_table(os.path.join(directory, 'hard_totals.csv'), STAND)
+            soft = compile_table(os.path.join(directory, 'soft_totals.csv'), STAND)
+            pairs = compile_table(os.path.join(directory, 'pairs.csv'), HIT)
+        self.assertEqual((hard[11, 10], hard[16, 10], hard[16, 9]), (DOUBLE, HIT, STAND))
+        self.assertEqual((soft[18, 9], pairs[8, 6], pairs[11, 11]), (HIT, SPLIT, STAND))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import unittest
+import numpy as np
+from blackjack_env import BlackjackEnv, Card
+from ev_engine import EVEngine, full_shoe_composition
+from table_rules import TableRules, DEFAULT_RULES, RULE_SETS
+from vector_env import VectorBlackjackEnv
+
+def rig_shoe(env, ranks):
+    """Put the given ranks on top of the shoe, in dealing order."""
+    top = np.array([Card(rank, '♠').code for rank in ranks], dtype=np.int8)
+    env.deck.shoe = np.concatenate([top, env.deck.shoe[len(top):]])
+    env.deck.cursor = 0
+
+
+class TestTableRules(unittest.TestCase):
+    """Tests for the TableRules class."""
+
+    def test_defaults_and_validation(self):
+        """The defaults are the original house rules; impossible rules are rejected."""
+        self.assertEqual(DEFAULT_RULES.minimum_cards, 104)
+        self.assertEqual(BlackjackEnv().minimum_deck_size(), 104)
+        self.assertEqual(RULE_SETS['double_deck'].minimum_cards, 36)
+        self.assertEqual(TableRules(charlie_cards=0).charlie_limit, 99)
+        self.assertEqual(DEFAULT_RULES.replace(num_decks=8), DEFAULT_RULES)
+        for changes in ({'num_decks': 0}, {'penetration': 1.0}, {'charlie_cards': 2}):
+            with self.assertRaises(ValueError):
+                TableRules(**changes)
+
+    def test_dealer_soft_17_and_payout(self):
+        """The dealer hits soft 17 only under H17, and a blackjack pays the table's payout."""
+        for rules, expected in ((DEFAULT_RULES, 1), (RULE_SETS['h17'], -1)):
+            env = BlackjackEnv(rules=rules)
+            # Player 10 8, dealer 6 A, next card a 4
+            rig_shoe(env, ['10', '8', '6', 'A', '4'])
+            env.reset()
+            self.assertEqual(env.step(0)[1], expected)
+
+        for rules, expected in ((DEFAULT_RULES, 1.5), (RULE_SETS['six_to_five'], 1.2)):
+            env = BlackjackEnv(rules=rules)
+            rig_shoe(env, ['A', 'K', '10', '7'])
+            env.reset()
+            self.assertAlmostEqual(env.step(0)[1], expected)
+
+    def test_vector_env_matches_scalar_env(self):
+        """Under non-default rules every table still plays exactly like a BlackjackEnv."""
+        rules = TableRules(dealer_hits_soft_17=True, blackjack_payout=1.2, charlie_cards=4,
+                           split_aces_one_card=False, double_after_split=False)
+        vector_env = VectorBlackjackEnv(num_envs=200, seed=7, rules=rules)
+        envs = []
+        for i in range(200):
+            env = BlackjackEnv(rules=rules)
+            env.deck.shoe = vector_env.shoes[i].copy()
+            env.deck.cursor = 0
+            envs.append(env)
+
+        rng = np.random.default_rng(0)
+        for _ in range(40):
+            np.testing.assert_allclose(vector_env.reset(), [env.reset() for env in envs])
+            actions = rng.integers(0, 5, size=200)
+            rewards = vector_env.step(actions)[1]
+            np.testing.assert_allclose(rewards, [env.step(int(action))[1]
+                                                 for env, action in zip(envs, actions)])
+
+    def test_ev_engine_matches_simulation(self):
+        """The exact round EV under non-default rules agrees with the simulator."""
+        rules = TableRules(num_decks=1, dealer_hits_soft_17=True, blackjack_payout=1.2,
+                           charlie_cards=3, split_aces_one_card=False, double_after_split=False)
+        expected = EVEngine(rules=rules).round_ev(full_shoe_composition(1))
+
+        env = VectorBlackjackEnv(num_envs=8192, seed=11, rules=rules)
+        actions = np.zeros(env.num_envs, dtype=np.int64)
+        rewards = []
+        for _ in range(50):
+            env.cursors[:] = env.shoe_size  # Force a fresh shoe every round
+            env.reset()
+            rewards.append(env.step(actions)[1])
+        rewards = np.concatenate(rewards)
+        tolerance = 5 * rewards.std() / np.sqrt(rewards.size)
+        self.assertAlmostEqual(rewards.mean(), expected, delta=tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+
+import unittest
+from table_sim import simulate_table
+
+class TestTableSimulation(unittest.TestCase):
+    """Tests for the multi-seat table simulation."""
+
+    def test_more_seats_slow_the_table(self):
+        """Every extra seat deals more cards per round and fewer rounds per hour."""
+        results = [simulate_table(num_seats=num_seats, num_tables=256, num_rounds=40)
+                   for num_seats in (1, 4, 7)]
+        for fewer, more in zip(results, results[1:]):
+            self.assertGreater(more['cards'], fewer['cards'] + 2 * 2)
+            self.assertLess(more['rounds_per_hour'], fewer['rounds_per_hour'])
+        self.assertTrue(150 < results[0]['rounds_per_hour'] < 250)
+        self.assertAlmostEqual(results[0]['mean_bet'], 1.0)
+        self.assertAlmostEqual(results[0]['ev_per_hour'],
+                               results[0]['ev_per_round'] * results[0]['rounds_per_hour'])
+
+
+if __name__ == '__main__':
+    unittest.main()
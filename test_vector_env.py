@@ -0,0 +1,153 @@
+#  ____                   __          ______                 __                                  
+# /\  _`\                /\ \        /\__  _\               /\ \__  __                           
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____  
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\ 
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/ 
+# By Kurizaki & Sprudello
+
+import unittest
+import numpy as np
+from blackjack_env import BlackjackEnv, CODE_COUNTS
+from vector_env import VectorBlackjackEnv
+
+class TestVectorBlackjackEnv(unittest.TestCase):
+    """Tests for the VectorBlackjackEnv class."""
+
+    def test_matches_scalar_env(self):
+        """Every table plays exactly like a BlackjackEnv dealt from the same shoe."""
+        num_envs = 200
+        vector_env = VectorBlackjackEnv(num_envs=num_envs, seed=7)
+        envs = []
+        for i in range(num_envs):
+            env = BlackjackEnv()
+            env.deck.shoe = vector_env.shoes[i].copy()
+            env.deck.cursor = 0
+            envs.append(env)
+
+        rng = np.random.default_rng(0)
+        for _ in range(40):
+            observations = vector_env.reset()
+            np.testing.assert_allclose(observations, [env.reset() for env in envs])
+
+            actions = rng.integers(0, 5, size=num_envs)
+            observations, rewards, dones, _ = vector_env.step(actions)
+            results = [env.step(int(action)) for env, action in zip(envs, actions)]
+            np.testing.assert_allclose(rewards, [result[1] for result in results])
+            np.testing.assert_allclose(observations, [result[0] for result in results])
+            self.assertTrue(dones.all())
+
+    def test_count_systems_match_scalar_env(self):
+        """Extra counting systems are counted like BlackjackEnv counts them and appended in order."""
+        systems = ['ko', 'zen', 'wong_halves']
+        vector_env = VectorBlackjackEnv(num_envs=50, seed=3, count_systems=systems)
+        envs = []
+        for i in range(50):
+            env = BlackjackEnv(count_systems=systems)
+            env.deck.shoe = vector_env.shoes[i].copy()
+            env.deck.cursor = 0
+            envs.append(env)
+
+        for round_num in range(20):
+            np.testing.assert_allclose(vector_env.reset(), [env.reset() for env in envs], rtol=1e-6)
+            actions = np.full(50, round_num % 5)
+            observations = vector_env.step(actions)[0]
+            self.assertEqual(observations.shape, (50, 7))
+            np.testing.assert_allclose(observations, [env.step(int(action))[0]
+                                                      for env, action in zip(envs, actions)], rtol=1e-6)
+
+    def test_deviations_match_scalar_env(self):
+        """Tables playing index plays make the same decisions as BlackjackEnv with deviations."""
+        vector_env = VectorBlackjackEnv(num_envs=100, seed=11, deviations=True)
+        envs = []
+        for i in range(100):
+            env = BlackjackEnv(deviations=True)
+            env.deck.shoe = vector_env.shoes[i].copy()
+            env.deck.cursor = 0
+            envs.append(env)
+
+        for round_num in range(50):
+            vector_env.reset()
+            for env in envs:
+                env.reset()
+            actions = np.full(100, round_num % 5)
+            rewards = vector_env.step(actions)[1]
+            np.testing.assert_allclose(rewards, [env.step(int(action))[1]
+                                                 for env, action in zip(envs, actions)])
+
+    def test_seats_match_scalar_env(self):
+        """Seats sharing a shoe play like a BlackjackEnv with the same seats; fillers bet one unit."""
+        num_envs, policy_seats = 100, (0, 2)
+        vector_env = VectorBlackjackEnv(num_envs=num_envs, seed=5, num_seats=3, policy_seats=policy_seats)
+        envs = []
+        for i in range(num_envs):
+            env = BlackjackEnv(num_seats=3, policy_seats=policy_seats)
+            env.deck.shoe = vector_env.shoes[i].copy()
+            env.deck.cursor = 0
+            envs.append(env)
+
+        rng = np.random.default_rng(1)
+        for _ in range(15):
+            observations = vector_env.reset()
+            self.assertEqual(observations.shape, (2 * num_envs, 4))
+            np.testing.assert_allclose(observations, np.repeat([env.reset() for env in envs], 2, axis=0))
+
+            actions = rng.integers(0, 5, size=2 * num_envs)
+            rewards = vector_env.step(actions)[1]
+            results = [env.step(actions[2 * i:2 * i + 2]) for i, env in enumerate(envs)]
+            np.testing.assert_allclose(rewards, np.concatenate([result[1] for result in results]))
+            np.testing.assert_allclose(vector_env.seat_rewards, [env.seat_rewards for env in envs])
+            np.testing.assert_array_equal(vector_env.cursors, [env.deck.cursor for env in envs])
+
+    def test_reshuffles_at_penetration(self):
+        """Shoes below the minimum size are reshuffled and their count reset on reset()."""
+        vector_env = VectorBlackjackEnv(num_envs=4, num_decks=1, seed=0)
+        vector_env.cursors[:] = 52 - vector_env.minimum_deck_size() + 1
+        vector_env.counts[:] = 5
+        observations = vector_env.reset()
+        self.assertTrue((vector_env.cursors == 4).all())
+        self.assertTrue((observations[:, 0] == 0).all())
+
+    def test_counts_restart_when_shoe_runs_out(self):
+        """A shoe that runs out mid-round is replaced and counted from its new cards only."""
+        vector_env = VectorBlackjackEnv(num_envs=16, num_decks=1, seed=2)
+        vector_env.reset()
+        vector_env.cursors[:] = 52
+        vector_env.step(np.zeros(16, dtype=np.int64))
+        self.assertTrue((vector_env.cursors < 52).all())
+        for table in range(16):
+            cursor = vector_env.cursors[table]
+            expected = sum(CODE_COUNTS[code] for code in vector_env.shoes[table, :cursor].tolist())
+            self.assertEqual(vector_env.counts[table], expected)
+
+    def test_seeded_reset(self):
+        """reset(seed=...) deals exactly like a table constructed with that seed."""
+        seeded = VectorBlackjackEnv(num_envs=8, num_decks=1, seed=[1, 2, 3, 4, 5, 6, 7, 8])
+        reseeded = VectorBlackjackEnv(num_envs=8, num_decks=1, seed=99)
+        reseeded.reset()
+        reseeded.step(np.zeros(8, dtype=np.int64))
+
+        np.testing.assert_array_equal(reseeded.reset(seed=[1, 2, 3, 4, 5, 6, 7, 8]), seeded.reset())
+        actions = np.arange(8) % 5
+        np.testing.assert_array_equal(reseeded.step(actions)[1], seeded.step(actions)[1])
+
+    def test_state_restores_the_shoes(self):
+        """An env restored from `get_state` deals the same rounds, across reshuffles, as the original."""
+        for seed in (5, list(range(8))):
+            env = VectorBlackjackEnv(num_envs=8, num_decks=1, seed=seed)
+            actions = np.arange(8) % 5
+            for _ in range(20):
+                env.reset()
+                env.step(actions)
+            state = env.get_state()
+            restored = VectorBlackjackEnv(num_envs=8, num_decks=1, seed=99)
+            restored.set_state(state)
+            for _ in range(30):
+                np.testing.assert_array_equal(env.reset(), restored.reset())
+                np.testing.assert_array_equal(env.step(actions)[1], restored.step(actions)[1])
+            np.testing.assert_array_equal(env.shuffles, restored.shuffles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,454 @@
+#  ____                   __          ______                 __
+# /\  _`\                /\ \        /\__  _\               /\ \__  __
+# \ \ \/\ \     __    ___\ \ \/'\    \/_/\ \/    __      ___\ \ ,_\/\_\    ___   __  __    ____
+#  \ \ \ \ \  /'__`\ /'___\ \ , <       \ \ \  /'__`\   /'___\ \ \/\/\ \  /'___\/\ \/\ \  /',__\
+#   \ \ \_\ \/\  __//\ \__/\ \ \\`\      \ \ \/\ \L\.\_/\ \__/\ \ \_\ \ \/\ \__/\ \ \_\ \/\__, `\
+#    \ \____/\ \____\ \____\\ \_\ \_\     \ \_\ \__/.\_\ \____\\ \__\\ \_\ \____\\ \____/\/\____/
+#     \/___/  \/____/\/____/ \/_/\/_/      \/_/\/__/\/_/\/____/ \/__/ \/_/\/____/ \/___/  \/___/
+# By Kurizaki & Sprudello
+
+import numpy as np
+from gym import spaces
+from gym.vector import VectorEnv
+from blackjack_env import CODE_VALUES, CODE_COUNTS
+from counting import tag_matrix
+from table_rules import TableRules
+from basic_strategy import STAND, DOUBLE, SPLIT, strategy_tables, deviation_tables, true_count_buckets
+
+# ============================================================
+# Lookup Tables
+# ============================================================
+
+# Card code -> blackjack value / Hi-Lo count, as arrays for fancy indexing
+VALUE_TABLE = np.array(CODE_VALUES, dtype=np.int64)
+COUNT_TABLE = np.array(CODE_COUNTS, dtype=np.int64)
+
+# Hand slots per table: the initial hand and the second hand of a split
+NUM_SLOTS = 2
+
+# Per-table arrays that carry over from one round to the next; the hands are dealt anew by every reset
+SHOE_STATE = ('shoes', 'cursors', 'shuffles', 'counts', 'true_counts', 'refilled',
+              'system_counts', 'system_true_counts')
+
+
+# ============================================================
+# Vectorized Blackjack Environment
+# ============================================================
+
+class VectorBlackjackEnv(VectorEnv):
+    """
+    Plays `num_envs` independent Blackjack tables in lockstep.
+
+    Every table owns its own shoe; the shoes are rows of a 2-D int8 array of
+    card codes with one dealing cursor per row. Dealing, basic-strategy play,
+    the dealer's draw and settlement are resolved for all tables with array
+    operations, following the same `TableRules` as `BlackjackEnv`.
+
+    A table may seat several players who share its shoe. Hand state is kept
+    per seat, in rows ordered table by table (row = table * num_seats + seat);
+    seats are dealt their two cards and play their hands in seat order, before
+    the dealer. The seats in `policy_seats` bet by the actions, every other
+    seat is a filler that bets one unit; all seats play the strategy tables.
+    With one seat, a table plays exactly like `BlackjackEnv`.
+
+    Observation: batch of [True count, Percentage remaining, Dealer's visible card value, 0(no insurance)],
+    each followed by the true count of every extra counting system; one row per
+    policy seat, table by table.
+    Action: batch of discrete values 0-9 indicating the bet amount (bet = action+1), one per
+    policy seat, in the order of the observations.
+    """
+
+    metadata = {'render.modes': []}
+
+    def __init__(self, num_envs=1024, num_decks=8, seed=None, count_systems=(), deviations=False,
+                 rules=None, num_seats=1, policy_seats=(0,)):
+        policy_seats = tuple(policy_seats)
+        if not policy_seats or len(set(policy_seats)) != len(policy_seats) or \
+                not all(0 <= seat < num_seats for seat in policy_seats):
+            raise ValueError(f"policy_seats must be distinct seats of 0..{num_seats - 1}, got {policy_seats}")
+        num_systems = len(count_systems)
+        observation_space = spaces.Box(
+            low=np.array([-10, 0, 1, 0] + [-10] * num_systems, dtype=np.float32),
+            high=np.array([10, 1, 11, 0] + [10] * num_systems, dtype=np.float32),
+            dtype=np.float32
+        )
+        super(VectorBlackjackEnv, self).__init__(num_envs, observation_space, spaces.Discrete(10))
+
+        # Rules: the default rules with `num_decks` unless given, read once into plain values
+        self.rules = rules if rules is not None else TableRules(num_decks=num_decks)
+        self.num_decks = num_decks = self.rules.num_decks
+        self.shoe_size = self.rules.shoe_size
+        self._minimum_cards = self.rules.minimum_cards
+        self._charlie_cards = self.rules.charlie_limit
+        self._blackjack_payout = self.rules.blackjack_payout
+        self._dealer_hits_soft_17 = self.rules.dealer_hits_soft_17
+        self._split_aces_one_card = self.rules.split_aces_one_card
+        self._double_after_split = self.rules.double_after_split
+
+        # Seats: hand state has one row per seat, table-major
+        self.num_seats = num_seats
+        self.policy_seats = policy_seats
+        self.num_rows = num_rows = num_envs * num_seats
+        self.row_tables = np.repeat(np.arange(num_envs), num_seats)
+
+        self.shoes = np.tile(np.arange(52, dtype=np.int8), (num_envs, num_decks))
+        self.cursors = np.zeros(num_envs, dtype=np.int64)
+        self.shuffles = np.zeros(num_envs, dtype=np.int64)  # Like Deck.shuffles, per table
+        self._seed(seed)
+        self._reshuffle(np.ones(num_envs, dtype=bool))
+        self.counts = np.zeros(num_envs, dtype=np.int64)
+        self.true_counts = np.zeros(num_envs, dtype=np.float64)
+        self.refilled = np.zeros(num_envs, dtype=bool)  # Shoe ran out during the current round
+
+        # Extra counting systems: one tag row per card code, added per card dealt
+        self.count_systems = tuple(count_systems)
+        self.system_tags = tag_matrix(self.count_systems, by_code=True)
+        self.system_counts = np.zeros((num_envs, num_systems), dtype=np.float64)
+        self.system_true_counts = np.zeros((num_envs, num_systems), dtype=np.float64)
+
+        # Per-seat, per-slot hand state
+        shape = (num_rows, NUM_SLOTS)
+        self.totals = np.zeros(shape, dtype=np.int64)
+        self.soft_aces = np.zeros(shape, dtype=np.int64)
+        self.num_cards = np.zeros(shape, dtype=np.int64)
+        self.doubled = np.zeros(shape, dtype=bool)
+        self.split = np.zeros(num_rows, dtype=bool)
+        self.split_aces = np.zeros(num_rows, dtype=bool)
+        self.player_codes = np.zeros((num_rows, 2), dtype=np.int64)
+        self.seat_rewards = np.zeros((num_envs, num_seats), dtype=np.float64)
+
+        self.dealer_totals = np.zeros(num_envs, dtype=np.int64)
+        self.dealer_soft_aces = np.zeros(num_envs, dtype=np.int64)
+        self.dealer_upcards = np.zeros(num_envs, dtype=np.int64)
+        self.dealer_hole_cards = np.zeros(num_envs, dtype=np.int64)
+        self.dealer_num_cards = np.zeros(num_envs, dtype=np.int64)
+
+        self._actions = None
+
+        # Strategy tables, shared with BlackjackEnv, with a true-count bucket axis: a single
+        # bucket for basic strategy, one per true count when playing deviations
+        self.deviations = deviations
+        if deviations:
+            self.hard_table, self.soft_table, self.pair_table = deviation_tables(self.rules.strategy_dir)
+        else:
+            self.hard_table, self.soft_table, self.pair_table = (
+                table[:, :, None] for table in strategy_tables(self.rules.strategy_dir))
+        self.count_buckets = np.zeros(num_envs, dtype=np.int64)
+
+    def minimum_deck_size(self):
+        return self._minimum_cards
+
+    def _seed(self, seed):
+        """Set the shuffle streams from an int, SeedSequence, or one seed per table."""
+        # A list of seeds gives every table its own shuffle stream (as in gym's
+        # VectorEnv.reset), so a table deals the same cards whatever batch it is in
+        if isinstance(seed, (list, tuple)):
+            if len(seed) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} table seeds, got {len(seed)}")
+            self.rng = None
+            self.table_rngs = [np.random.default_rng(table_seed) for table_seed in seed]
+        else:
+            self.rng = np.random.default_rng(seed)
+            self.table_rngs = None
+
+    def reset_wait(self, seed=None, options=None):
+        """
+        Reset all tables for a new round and deal the initial cards.
+
+        Passing a seed reseeds the tables and reshuffles every shoe, so the
+        same seed always deals the same sequence of rounds.
+        """
+        if seed is not None:
+            self._seed(seed)
+            self.shoes[:] = np.tile(np.arange(52, dtype=np.int8), self.num_decks)
+            self.cursors[:] = self.shoe_size
+
+        reshuffle = (self.shoe_size - self.cursors) < self.minimum_deck_size()
+        if reshuffle.any():
+            self._reshuffle(reshuffle)
+            self.counts[reshuffle] = 0
+            self.true_counts[reshuffle] = 0
+            self.system_counts[reshuffle] = 0
+            self.system_true_counts[reshuffle] = 0
+
+        tables = np.arange(self.num_envs)
+        self.totals[:] = 0
+        self.soft_aces[:] = 0
+        self.num_cards[:] = 0
+        self.doubled[:] = False
+        self.split[:] = False
+        self.split_aces[:] = False
+
+        # Player, player (seat by seat), dealer up, dealer hole - the same order as BlackjackEnv
+        for seat in range(self.num_seats):
+            rows = tables * self.num_seats + seat
+            for card in range(2):
+                codes = self._draw(tables)
+                self.player_codes[rows, card] = codes
+                self._add_to_slot(rows, 0, codes)
+
+        self.dealer_upcards = self._draw(tables)
+        self.dealer_hole_cards = self._draw(tables, counted=False)
+        self.dealer_totals = VALUE_TABLE[self.dealer_upcards] + VALUE_TABLE[self.dealer_hole_cards]
+        self.dealer_soft_aces = ((VALUE_TABLE[self.dealer_upcards] == 11).astype(np.int64) +
+                                 (VALUE_TABLE[self.dealer_hole_cards] == 11))
+        self._adjust_dealer_aces()
+        self.dealer_num_cards[:] = 2
+
+        return self._get_observations()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions)
+
+    def step_wait(self):
+        """Play out the round on every table and settle the bets."""
+        bets = self._seat_bets(self._actions)
+        tables = np.arange(self.num_envs)
+        if self.deviations:
+            self.count_buckets = true_count_buckets(self.true_counts)
+
+        player_blackjack = self.totals[:, 0] == 21
+
+        # Seat by seat, the first hand (and, after a split, the second) is played to completion in turn
+        for seat in range(self.num_seats):
+            self._play_slot(0, seat)
+            self._play_slot(1, seat)
+
+        # Reveal and count the dealer's hidden card
+        self.counts += COUNT_TABLE[self.dealer_hole_cards]
+        if self.count_systems:
+            self.system_counts += self.system_tags[self.dealer_hole_cards]
+        dealer_blackjack = self.dealer_totals == 21
+
+        # Dealer draws to 17 (and on soft 17 under H17) unless they hold a blackjack
+        drawing = ~dealer_blackjack & self._dealer_draws()
+        while drawing.any():
+            idx = tables[drawing]
+            codes = self._draw(idx)
+            self.dealer_totals[idx] += VALUE_TABLE[codes]
+            self.dealer_soft_aces[idx] += VALUE_TABLE[codes] == 11
+            self.dealer_num_cards[idx] += 1
+            self._adjust_dealer_aces()
+            drawing = self._dealer_draws()
+        dealer_busted = self.dealer_totals > 21
+
+        if self.num_seats > 1:
+            dealer_blackjack = dealer_blackjack[self.row_tables]
+            dealer_busted = dealer_busted[self.row_tables]
+        rewards = self._settle(0, bets, player_blackjack, dealer_blackjack, dealer_busted)
+        rewards += np.where(self.split,
+                            self._settle(1, bets, np.zeros(self.num_rows, dtype=bool),
+                                         dealer_blackjack, dealer_busted),
+                            0.0)
+        self.seat_rewards = rewards.reshape(self.num_envs, self.num_seats)
+
+        # Like BlackjackEnv, a shoe dealt to its last card is replaced right away, and
+        # a replaced shoe is counted from the cards seen of the new one only
+        self.refilled |= self.cursors >= self.shoe_size
+        if self.refilled.any():
+            self._refill_counts()
+
+        decks_remaining = np.maximum(1, (self.shoe_size - self.cursors) / 52)
+        self.true_counts = self.counts / decks_remaining
+        if self.count_systems:
+            self.system_true_counts = self.system_counts / decks_remaining[:, None]
+
+        if self.num_seats > 1 or len(self.policy_seats) > 1:
+            rewards = self.seat_rewards[:, self.policy_seats].reshape(-1)
+        dones = np.ones(rewards.size, dtype=bool)
+        return self._get_observations(), rewards, dones, {}
+
+    def get_state(self):
+        """
+        The shoes, counts and shuffle streams of every table, copied, for `set_state`.
+
+        Between rounds this is everything that decides the rounds to come, so an
+        environment restored from it deals exactly the same cards (training checkpoints).
+        """
+        state = {name: getattr(self, name).copy() for name in SHOE_STATE}
+        if self.table_rngs is None:
+            state['rng'] = self.rng.bit_generator.state
+        else:
+            state['table_rngs'] = [rng.bit_generator.state for rng in self.table_rngs]
+        return state
+
+    def set_state(self, state):
+        """Restores a `get_state` snapshot of an environment with the same tables and counting systems."""
+        for name in SHOE_STATE:
+            array = getattr(self, name)
+            if np.shape(state[name]) != array.shape:
+                raise ValueError(f"State of {name} has shape {np.shape(state[name])}, expected {array.shape}")
+            array[...] = state[name]
+        if 'table_rngs' in state:
+            self._seed([0] * self.num_envs)
+            for rng, rng_state in zip(self.table_rngs, state['table_rngs']):
+                rng.bit_generator.state = rng_state
+        else:
+            self._seed(0)
+            self.rng.bit_generator.state = state['rng']
+
+    # ============================================================
+    # Internal Methods
+    # ============================================================
+
+    def _seat_bets(self, actions):
+        """Bets of every seat row: the policy seats bet by the actions, fillers one unit."""
+        bets = actions.astype(np.float64) + 1
+        if self.num_seats == 1:
+            return bets
+        seat_bets = np.ones((self.num_envs, self.num_seats), dtype=np.float64)
+        seat_bets[:, self.policy_seats] = bets.reshape(self.num_envs, len(self.policy_seats))
+        return seat_bets.reshape(-1)
+
+    def _reshuffle(self, mask):
+        """Return all cards to the masked shoes and permute them, in one call when the tables share a stream."""
+        if self.table_rngs is None:
+            self.shoes[mask] = self.rng.permuted(self.shoes[mask], axis=1)
+        else:
+            for table in np.flatnonzero(mask):
+                self.table_rngs[table].shuffle(self.shoes[table])
+        self.cursors[mask] = 0
+        self.shuffles[mask] += 1
+
+    def _draw(self, idx, counted=True):
+        """Deal the next card from the shoe of every table in `idx`."""
+        exhausted = self.cursors[idx] >= self.shoe_size
+        if exhausted.any():
+            mask = np.zeros(self.num_envs, dtype=bool)
+            mask[idx[exhausted]] = True
+            self._reshuffle(mask)
+            self.refilled |= mask
+        codes = self.shoes[idx, self.cursors[idx]].astype(np.int64)
+        self.cursors[idx] += 1
+        if counted:
+            self.counts[idx] += COUNT_TABLE[codes]
+            if self.count_systems:
+                self.system_counts[idx] += self.system_tags[codes]
+        return codes
+
+    def _refill_counts(self):
+        """Recount the tables whose shoe was replaced during the round."""
+        exhausted = self.refilled & (self.cursors >= self.shoe_size)
+        if exhausted.any():
+            self._reshuffle(exhausted)
+        for table in np.flatnonzero(self.refilled):
+            seen = self.shoes[table, :self.cursors[table]]
+            self.counts[table] = COUNT_TABLE[seen].sum()
+            self.system_counts[table] = self.system_tags[seen].sum(axis=0)
+        self.refilled[:] = False
+
+    def _add_to_slot(self, idx, slot, codes):
+        """Add one card to the given hand slot of every seat row in `idx`."""
+        values = VALUE_TABLE[codes]
+        totals = self.totals[idx, slot] + values
+        soft_aces = self.soft_aces[idx, slot] + (values == 11)
+        # A single card can push a soft hand over 21 only once
+        adjust = (totals > 21) & (soft_aces > 0)
+        self.totals[idx, slot] = totals - 10 * adjust
+        self.soft_aces[idx, slot] = soft_aces - adjust
+        self.num_cards[idx, slot] += 1
+
+    def _dealer_draws(self):
+        if self._dealer_hits_soft_17:
+            return (self.dealer_totals < 17) | ((self.dealer_totals == 17) & (self.dealer_soft_aces > 0))
+        return self.dealer_totals < 17
+
+    def _adjust_dealer_aces(self):
+        adjust = (self.dealer_totals > 21) & (self.dealer_soft_aces > 0)
+        self.dealer_totals -= 10 * adjust
+        self.dealer_soft_aces -= adjust
+        # Two aces in the first two cards need a second adjustment
+        adjust = (self.dealer_totals > 21) & (self.dealer_soft_aces > 0)
+        self.dealer_totals -= 10 * adjust
+        self.dealer_soft_aces -= adjust
+
+    def _play_slot(self, slot, seat=0):
+        """Play one hand slot of one seat on every table by basic strategy until it stands or ends."""
+        tables = np.arange(self.num_envs)
+        seat_rows = slice(seat, None, self.num_seats)  # The seat's rows, as views
+        up_values = VALUE_TABLE[self.dealer_upcards]
+        if slot == 0:
+            active = np.ones(self.num_envs, dtype=bool)
+        else:
+            active = self.split[seat_rows].copy()
+
+        while True:
+            totals = self.totals[seat_rows, slot]
+            num_cards = self.num_cards[seat_rows, slot]
+            active &= (totals <= 21) & (num_cards < self._charlie_cards)
+            active &= ~(self.split_aces[seat_rows] & (num_cards == 2))
+            if not active.any():
+                return
+            idx = tables[active]
+            rows = idx * self.num_seats + seat
+            totals = totals[idx]
+            num_cards = num_cards[idx]
+            up = up_values[idx]
+            buckets = self.count_buckets[idx]
+
+            pair_values = VALUE_TABLE[self.player_codes[rows, 0]]
+            is_pair = ((num_cards == 2) & ~self.split[rows] &
+                       (pair_values == VALUE_TABLE[self.player_codes[rows, 1]]))
+            is_soft = self.soft_aces[rows, slot] > 0
+            actions = np.where(
+                is_pair, self.pair_table[pair_values, up, buckets],
+                np.where(is_soft, self.soft_table[np.minimum(totals, 20), up, buckets],
+                         self.hard_table[totals, up, buckets]))
+
+            stand = actions == STAND
+            active[idx[stand]] = False
+
+            split = is_pair & (actions == SPLIT)
+            if split.any():
+                self._split(idx[split], seat)
+
+            double = (actions == DOUBLE) & (num_cards == 2) & ~self.split_aces[rows]
+            if not self._double_after_split:
+                double &= ~self.split[rows]
+            draw = ~stand & ~split
+            if draw.any():
+                self._add_to_slot(rows[draw], slot, self._draw(idx[draw]))
+                self.doubled[rows[double], slot] = True
+                active[idx[double]] = False
+
+    def _split(self, idx, seat=0):
+        """Split the initial pair of one seat on every table in `idx` into two hands."""
+        rows = idx * self.num_seats + seat
+        self.split[rows] = True
+        self.split_aces[rows] = self._split_aces_one_card & (VALUE_TABLE[self.player_codes[rows, 0]] == 11)
+        for slot in range(NUM_SLOTS):
+            self.totals[rows, slot] = 0
+            self.soft_aces[rows, slot] = 0
+            self.num_cards[rows, slot] = 0
+            self._add_to_slot(rows, slot, self.player_codes[rows, slot])
+        for slot in range(NUM_SLOTS):
+            self._add_to_slot(rows, slot, self._draw(idx))
+
+    def _settle(self, slot, bets, player_blackjack, dealer_blackjack, dealer_busted):
+        """Reward of one hand slot of every seat row, mirroring BlackjackEnv._calculate_reward."""
+        bets = bets * np.where(self.doubled[:, slot], 2, 1)
+        totals = self.totals[:, slot]
+        busted = totals > 21
+        charlie = (self.num_cards[:, slot] == self._charlie_cards) & ~busted
+        dealer_totals = self.dealer_totals if self.num_seats == 1 else self.dealer_totals[self.row_tables]
+
+        outcome = np.sign(totals - dealer_totals).astype(np.float64)
+        outcome = np.where(dealer_busted, 1.0, outcome)
+        outcome = np.where(busted, -1.0, outcome)
+        outcome = np.where(player_blackjack & dealer_blackjack, 0.0, outcome)
+        outcome = np.where(dealer_blackjack & ~player_blackjack, -1.0, outcome)
+        outcome = np.where(player_blackjack & ~dealer_blackjack, self._blackjack_payout, outcome)
+        outcome = np.where(charlie, 1.0, outcome)
+        return outcome * bets
+
+    def _get_observations(self):
+        """Return the current observations as a (num_envs * policy seats, 4 + count systems) array."""
+        observations = np.zeros((self.num_envs, 4 + len(self.count_systems)), dtype=np.float32)
+        observations[:, 0] = self.true_counts
+        observations[:, 1] = (self.shoe_size - self.cursors) / self.shoe_size
+        observations[:, 2] = VALUE_TABLE[self.dealer_upcards]
+        observations[:, 4:] = self.system_true_counts
+        if len(self.policy_seats) > 1:
+            # The seats of a table see the same table; one row each for batched bets
+            observations = np.repeat(observations, len(self.policy_seats), axis=0)
+        return observations